@@ -16,7 +16,9 @@ except Exception as e:
 from flask import Flask
 import config
 from .extensions import db, migrate, bcrypt, jwt, cors, ma
-from .commands import seed_data_command, empty_db_command
+from .commands import (
+    seed_data_command, empty_db_command, bench_login_command, import_data_command, archive_audit_logs_command
+)
 
 # A dictionary to map configuration names (strings) to their corresponding classes.
 # This allows the factory to be called with a string name like 'development'.
@@ -35,6 +37,9 @@ def create_app(config_name='development'):
         config_name (str): The name of the configuration to use (e.g., 'development').
     """
     app = Flask(__name__)
+    # orjson-backed (when installed) but byte-identical JSON encoding for all responses
+    from .utils.json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app)
 
     # --- Step 1: Load Configuration ---
     # Look up the configuration class from the dictionary and load it.
@@ -43,6 +48,12 @@ def create_app(config_name='development'):
     config_object = config_by_name.get(config_name, config.DevelopmentConfig)
     app.config.from_object(config_object)
 
+    # Behind trusted reverse proxies, take the client address from X-Forwarded-For
+    # (the login throttle keys on it when LOGIN_IP_THROTTLE is on).
+    if app.config.get('PROXY_FIX_X_FOR'):
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
+
 
     # --- Step 2: Initialize Extensions ---
     # Pass the fully configured app object to each extension's init_app method.
@@ -53,6 +64,28 @@ def create_app(config_name='development'):
     cors.init_app(app, resources={r"/api/*": {"origins": "*"}})
     ma.init_app(app)
 
+    # In-process caches and the table version counters that invalidate them.
+    from .utils import table_versions
+    from .utils.filtering import scan_guard
+    from .utils.query_cache import query_cache
+    from .utils.id_blocks import id_blocks
+    from .system.audit import audit_writer
+    from .user_management.permissions import permission_cache
+    from .user_management.passwords import password_verifier
+    from .user_management.scope import scope_resolver
+    from .apis.throttle import login_throttle
+    from .apis.revocation import revocation_list
+    table_versions.init_app(app)
+    permission_cache.init_app(app)
+    scope_resolver.init_app(app)
+    login_throttle.init_app(app)
+    revocation_list.init_app(app)
+    password_verifier.init_app(app)
+    scan_guard.init_app(app)
+    query_cache.init_app(app)
+    id_blocks.init_app(app)
+    audit_writer.init_app(app)
+
     # --- Step 3: Register Blueprints ---
     # Import blueprints inside the factory to prevent circular import issues.
     from .apis.auth import bp as auth_bp
@@ -74,5 +107,8 @@ def create_app(config_name='development'):
     # --- Step 4: Register Custom CLI Commands ---
     app.cli.add_command(seed_data_command)
     app.cli.add_command(empty_db_command)
+    app.cli.add_command(bench_login_command)
+    app.cli.add_command(import_data_command)
+    app.cli.add_command(archive_audit_logs_command)
 
     return app
\ No newline at end of file
@@ -1,12 +1,16 @@
 # goji/app/apis/auth.py
 
 from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity, unset_jwt_cookies
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity, unset_jwt_cookies
 from marshmallow import ValidationError
 
 # --- Service Layer Import ---
 from .services import auth_service
+from .throttle import login_throttle
+from .revocation import revocation_list
 from ..user_management.models import User
+from ..user_management.permissions import current_permissions
+from ..user_management.passwords import PasswordPoolBusy
 from ..user_management.schemas import UserSchema
 
 bp = Blueprint('auth', __name__, url_prefix='/api/auth')
@@ -23,9 +27,19 @@ def login():
     if not username or not password:
         return jsonify({"msg": "Missing username or password"}), 400
 
-    result = auth_service.authenticate_user(username, password)
+    # Reject throttled callers before any database lookup or bcrypt work
+    client_ip = request.remote_addr
+    retry_after = login_throttle.check(username, client_ip)
+    if retry_after:
+        return jsonify({"msg": "Too many failed login attempts, try again later"}), 429, {"Retry-After": str(retry_after)}
+
+    try:
+        result = auth_service.authenticate_user(username, password)
+    except PasswordPoolBusy as e:
+        return jsonify({"msg": str(e)}), 503, {"Retry-After": "1"}
     
     if result:
+        login_throttle.record_success(username, client_ip)
         return jsonify({
             "access_token": result["access_token"],
             "user": {
@@ -35,6 +49,7 @@ def login():
             }
         })
 
+    login_throttle.record_failure(username, client_ip)
     return jsonify({"msg": "Bad username or password"}), 401
 
 @bp.route("/register", methods=["POST"])
@@ -57,7 +72,8 @@ def register():
 @bp.route("/logout", methods=["POST"])
 @jwt_required()
 def logout():
-    """Unsets the JWT access token cookie."""
+    """Revokes the current access token server-side and unsets the JWT cookie."""
+    revocation_list.revoke_token(get_jwt())
     response = jsonify({"msg": "Successfully logged out"})
     unset_jwt_cookies(response)
     return response
@@ -82,12 +98,11 @@ def admin_request_password_reset():
     Requests a password reset link (Admin only).
     """
     current_user_id = get_jwt_identity()
-    admin_user = User.query.get(current_user_id)
+    admin_permissions = current_permissions()
 
     # Permission Check (Controller Level Logic)
     # Check if admin has 'admin:all' permission
-    admin_permissions = {perm.name for role in admin_user.roles for perm in role.permissions}
-    if 'admin:all' not in admin_permissions:
+    if admin_permissions is None or not admin_permissions.is_admin:
         return jsonify({"msg": "You don't have permission to perform this action"}), 403
 
     target_user_id = request.json.get("user_id")
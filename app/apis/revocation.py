@@ -0,0 +1,160 @@
+# goji/app/apis/revocation.py
+
+import threading
+import time
+from datetime import datetime, timezone
+from flask import current_app
+from sqlalchemy import delete, event, select
+from sqlalchemy.orm import Session
+from ..extensions import db, jwt
+from ..user_management.models import User, RevokedToken
+
+_PENDING_KEY = '_goji_pending_watermarks'
+
+
+def _to_timestamp(dt):
+    """Naive UTC datetime (as stored by the models) -> POSIX seconds."""
+    return dt.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _from_timestamp(ts):
+    return datetime.fromtimestamp(ts, tz=timezone.utc).replace(tzinfo=None)
+
+
+class TokenRevocationList:
+    """
+    Server-side token revocation without a database query per request.
+
+    Two kinds of entries are mirrored in process memory:
+        * a JTI denylist (gj_revoked_tokens), evicted once the token would have expired anyway;
+        * a per-user watermark (gj_users.tokens_valid_after): tokens issued before it are rejected.
+
+    Both are bulk re-synced from the database every REVOCATION_SYNC_SEC seconds,
+    which bounds how long a revocation made by another worker takes to apply here.
+    Revocations made by this process apply as soon as they are committed; the sync
+    runs on its own connection, never on the request's session.
+    """
+
+    def __init__(self):
+        self.sync_interval = 30
+        self._denylist = {}    # jti -> exp (POSIX seconds)
+        self._watermarks = {}  # user_id -> POSIX seconds
+        self._synced_at = None
+        self._lock = threading.Lock()
+        self._listening = False
+
+    def init_app(self, app):
+        self.sync_interval = app.config.get('REVOCATION_SYNC_SEC', self.sync_interval)
+        self._synced_at = None
+        jwt.token_in_blocklist_loader(self._token_in_blocklist)
+        if not self._listening:
+            event.listen(Session, 'after_commit', self._after_commit)
+            event.listen(Session, 'after_rollback', self._after_rollback)
+            self._listening = True
+
+    # =========================================================
+    # Checks
+    # =========================================================
+
+    def is_revoked(self, jwt_payload) -> bool:
+        self._maybe_sync()
+        if jwt_payload.get('jti') in self._denylist:
+            return True
+        try:
+            watermark = self._watermarks.get(int(jwt_payload.get('sub')))
+        except (TypeError, ValueError):
+            return False
+        return watermark is not None and jwt_payload.get('iat', 0) < watermark
+
+    def _token_in_blocklist(self, jwt_header, jwt_payload):
+        return self.is_revoked(jwt_payload)
+
+    # =========================================================
+    # Revocation
+    # =========================================================
+
+    def revoke_token(self, jwt_payload):
+        """Denylists a single token (e.g. on logout) until its natural expiry."""
+        jti = jwt_payload['jti']
+        exp = jwt_payload.get('exp') or time.time()
+        db.session.add(RevokedToken(
+            jti=jti,
+            user_id=int(jwt_payload['sub']) if jwt_payload.get('sub') is not None else None,
+            expires_at=_from_timestamp(exp),
+        ))
+        db.session.commit()
+        with self._lock:
+            self._denylist[jti] = exp
+
+    def revoke_user_tokens(self, user, commit=True):
+        """
+        Invalidates every token issued to a user so far.
+        Pass commit=False to make it part of the caller's unit of work; the
+        in-memory watermark only applies once that transaction commits.
+        """
+        # 'iat' only has whole-second precision, so a token issued within the
+        # same second *after* this call is rejected too; a re-login fixes that.
+        now = time.time()
+        user.tokens_valid_after = _from_timestamp(now)
+        db.session.info.setdefault(_PENDING_KEY, {})[user.id] = now
+        if commit:
+            db.session.commit()
+
+    def _after_commit(self, session):
+        pending = session.info.pop(_PENDING_KEY, None)
+        if pending:
+            with self._lock:
+                for user_id, ts in pending.items():
+                    self._watermarks[user_id] = max(ts, self._watermarks.get(user_id, ts))
+
+    def _after_rollback(self, session):
+        session.info.pop(_PENDING_KEY, None)
+
+    # =========================================================
+    # Sync & Eviction
+    # =========================================================
+
+    def _maybe_sync(self):
+        now = time.monotonic()
+        if self._synced_at is not None and now - self._synced_at < self.sync_interval:
+            return
+        self._synced_at = now
+        try:
+            self.sync()
+        except Exception as e:
+            # Keep serving from the last good snapshot if the database is unavailable
+            current_app.logger.warning("Failed to sync token revocations: %s", e)
+
+    def sync(self):
+        """
+        Reloads all unexpired revocations in two bulk queries and purges expired rows,
+        in a short transaction of its own (the caller's session is left untouched).
+        """
+        now = datetime.utcnow()
+        with db.engine.begin() as connection:
+            denylist = {
+                jti: _to_timestamp(expires_at)
+                for jti, expires_at in connection.execute(
+                    select(RevokedToken.jti, RevokedToken.expires_at).where(RevokedToken.expires_at > now))
+            }
+            watermarks = {
+                user_id: _to_timestamp(valid_after)
+                for user_id, valid_after in connection.execute(
+                    select(User.id, User.tokens_valid_after).where(User.tokens_valid_after.isnot(None)))
+            }
+            connection.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+
+        with self._lock:
+            # Keep local revocations that raced the snapshot
+            now_ts = _to_timestamp(now)
+            for jti, exp in self._denylist.items():
+                if exp > now_ts:
+                    denylist.setdefault(jti, exp)
+            for user_id, ts in self._watermarks.items():
+                watermarks[user_id] = max(ts, watermarks.get(user_id, ts))
+            self._denylist = denylist
+            self._watermarks = watermarks
+
+
+# Singleton instance
+revocation_list = TokenRevocationList()
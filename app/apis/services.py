@@ -3,6 +3,10 @@
 from ..extensions import db
 from ..user_management.models import User, PasswordResetToken
 from ..user_management.schemas import UserSchema
+from ..user_management.permissions import permission_cache
+from ..user_management.passwords import password_verifier, PasswordPoolBusy
+from .revocation import revocation_list
+from flask import current_app
 from flask_jwt_extended import create_access_token
 from datetime import datetime, timedelta
 import secrets
@@ -18,20 +22,47 @@ class AuthService:
     def authenticate_user(self, username, password):
         """
         Validates credentials and generates a JWT token.
+        The bcrypt check runs on the bounded password pool; a hash made with an
+        outdated cost factor is transparently upgraded after a successful login.
         Returns:
             dict: { "access_token": str, "user": User } or None
+        Raises:
+            PasswordPoolBusy: if the password pool is saturated.
         """
         user = User.query.filter_by(username=username, is_active=True).first()
         
-        if user and user.check_password(password):
-            # Generate JWT Token
-            access_token = create_access_token(identity=str(user.id))
+        if user and password_verifier.verify(user.password_hash, password):
+            self._upgrade_password_hash(user, password)
+
+            # Generate JWT Token, optionally carrying the permission claims
+            additional_claims = None
+            if current_app.config.get('JWT_PERMISSION_CLAIMS'):
+                additional_claims = permission_cache.build_claims(user.id)
+            access_token = create_access_token(identity=str(user.id), additional_claims=additional_claims)
             return {
                 "access_token": access_token,
                 "user": user
             }
         return None
 
+    def _upgrade_password_hash(self, user, password):
+        """
+        Re-hashes the password with the configured BCRYPT_LOG_ROUNDS if the cost differs.
+        The hash runs on the bounded password pool; when it is busy the upgrade waits for a later login.
+        """
+        log_rounds = current_app.config.get('BCRYPT_LOG_ROUNDS', 12)
+        if not user.password_needs_rehash(log_rounds):
+            return
+        try:
+            user.password_hash = password_verifier.hash(password, log_rounds)
+            db.session.commit()
+        except PasswordPoolBusy:
+            return
+        except Exception as e:
+            # A failed upgrade must not block the login itself
+            current_app.logger.warning("Failed to upgrade password hash for user %s: %s", user.id, e)
+            db.session.rollback()
+
     def register_user(self, data: dict) -> User:
         """
         Registers a new user. 
@@ -94,6 +125,8 @@ class AuthService:
 
         user = reset_token_entry.user
         user.set_password(new_password)
+        # Sessions opened with the old password must not survive the reset
+        revocation_list.revoke_user_tokens(user, commit=False)
 
         # Invalidate token after use
         db.session.delete(reset_token_entry)
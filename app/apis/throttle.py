@@ -0,0 +1,130 @@
+# goji/app/apis/throttle.py
+
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+
+
+class AttemptStore(ABC):
+    """
+    Storage interface for failed-attempt tracking.
+    Implement this on top of a shared store (e.g. Redis) to throttle across workers.
+    """
+
+    @abstractmethod
+    def add_failure(self, key, now, limit):
+        """Records a failure; returns the timestamps of the last 'limit' failures (oldest first)."""
+
+    @abstractmethod
+    def lock(self, key, until):
+        """Locks a key out until 'until' (monotonic seconds)."""
+
+    @abstractmethod
+    def locked_until(self, key):
+        """Returns the lockout expiry (monotonic seconds) for a key, or 0."""
+
+    @abstractmethod
+    def reset(self, key):
+        """Forgets a key's failures and lockout."""
+
+
+class InMemoryAttemptStore(AttemptStore):
+    """
+    Process-local AttemptStore with bounded memory: each key keeps at most
+    'limit' timestamps and the least recently used keys are dropped beyond 'max_keys'.
+    """
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._entries = OrderedDict() # key -> [deque(timestamps), locked_until]
+        self._lock = threading.Lock()
+
+    def add_failure(self, key, now, limit):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0].maxlen != limit:
+                entry = [deque(entry[0] if entry else (), maxlen=limit), entry[1] if entry else 0]
+                self._entries[key] = entry
+            entry[0].append(now)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+            return list(entry[0])
+
+    def lock(self, key, until):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[1] = until
+
+    def locked_until(self, key):
+        entry = self._entries.get(key)
+        return entry[1] if entry is not None else 0
+
+    def reset(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class LoginThrottle:
+    """
+    Sliding-window login limiter keyed by username and, optionally, by client IP.
+
+    Once a key collects 'max_attempts' failures within 'window' seconds it is
+    locked out for 'lockout' seconds. Checks happen before any user lookup or
+    bcrypt work, so a locked-out caller costs almost nothing.
+
+    The IP dimension is off by default (LOGIN_IP_THROTTLE): behind a reverse proxy
+    or a shop-floor NAT every operator shares one address, and a shift-start burst
+    would lock out the whole plant. Enable it only where the client address is real,
+    i.e. with PROXY_FIX_X_FOR set to the number of trusted proxies in front of the app.
+    """
+
+    def __init__(self, store=None):
+        self.store = store or InMemoryAttemptStore()
+        self.user_max_attempts = 5
+        self.ip_enabled = False
+        self.ip_max_attempts = 50
+        self.window = 300
+        self.lockout = 900
+
+    def init_app(self, app):
+        self.user_max_attempts = app.config.get('LOGIN_MAX_ATTEMPTS', self.user_max_attempts)
+        self.ip_enabled = app.config.get('LOGIN_IP_THROTTLE', self.ip_enabled)
+        self.ip_max_attempts = app.config.get('LOGIN_IP_MAX_ATTEMPTS', self.ip_max_attempts)
+        self.window = app.config.get('LOGIN_WINDOW_SEC', self.window)
+        self.lockout = app.config.get('LOGIN_LOCKOUT_SEC', self.lockout)
+        if isinstance(self.store, InMemoryAttemptStore):
+            self.store.max_keys = app.config.get('LOGIN_THROTTLE_MAX_KEYS', self.store.max_keys)
+
+    def check(self, username, ip):
+        """Returns the number of seconds the caller must wait, or 0 if the attempt may proceed."""
+        now = time.monotonic()
+        until = max(self.store.locked_until(key) for key, _ in self._keys(username, ip))
+        return math.ceil(until - now) if until > now else 0
+
+    def record_failure(self, username, ip):
+        now = time.monotonic()
+        for key, limit in self._keys(username, ip):
+            attempts = self.store.add_failure(key, now, limit)
+            if len(attempts) >= limit and now - attempts[0] <= self.window:
+                self.store.lock(key, now + self.lockout)
+
+    def record_success(self, username, ip):
+        # Only the account counter is cleared; the IP keeps its history.
+        self.store.reset(self._user_key(username))
+
+    def _user_key(self, username):
+        return f"u:{(username or '').strip().lower()}"
+
+    def _keys(self, username, ip):
+        keys = [(self._user_key(username), self.user_max_attempts)]
+        if self.ip_enabled and ip:
+            keys.append((f"ip:{ip}", self.ip_max_attempts))
+        return keys
+
+
+# Singleton instance
+login_throttle = LoginThrottle()
@@ -7,7 +7,7 @@ import os
 import shutil
 from flask import current_app
 
-from .extensions import db
+from .extensions import db, bcrypt
 
 # Import all necessary models for a complete seed
 from .user_management.models import *
@@ -131,40 +131,115 @@ def empty_db_command():
 
 
 
+@click.command(name='bench-login')
+@click.option('--pool-size', type=int, multiple=True, help='Pool size(s) to measure; defaults to PASSWORD_POOL_SIZE.')
+@click.option('--concurrency', type=int, default=50, show_default=True, help='Simultaneous login threads.')
+@click.option('--logins', type=int, default=500, show_default=True, help='Total verifications per pool size.')
+@with_appcontext
+def bench_login_command(pool_size, concurrency, logins):
+    """
+    Measures bcrypt login throughput of the password pool at the configured cost.
+    Does not touch the database; use it to size PASSWORD_POOL_SIZE.
+    """
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from .user_management.passwords import password_verifier, PasswordPoolBusy
+
+    rounds = current_app.config.get('BCRYPT_LOG_ROUNDS', 12)
+    password = 'bench-password'
+    password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+    pool_sizes = pool_size or (current_app.config.get('PASSWORD_POOL_SIZE'),)
+
+    print(f"bcrypt cost={rounds}, concurrency={concurrency}, logins={logins}")
+    print(f"{'pool':>6} {'logins/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'peak queue':>11} {'rejected':>9}")
+
+    for size in pool_sizes:
+        # Unbounded queue here: the benchmark measures throughput, not rejection.
+        password_verifier.configure(pool_size=size, max_queue=logins)
+
+        def one_login(_):
+            started_at = time.perf_counter()
+            try:
+                password_verifier.verify(password_hash, password)
+            except PasswordPoolBusy:
+                pass
+            return time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as clients:
+            latencies = sorted(clients.map(one_login, range(logins)))
+        elapsed = time.perf_counter() - started_at
+
+        stats = password_verifier.stats()
+        p50 = latencies[len(latencies) // 2] * 1000
+        p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+        print(f"{size:>6} {logins / elapsed:>10.1f} {p50:>8.1f} {p95:>8.1f} {stats['peak_queued']:>11} {stats['rejected']:>9}")
+
+    # Restore the configured pool for the rest of the process
+    password_verifier.init_app(current_app)
+
+
+@click.command(name='import-data')
+@click.argument('entity')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--dry-run', is_flag=True, help='Validate the file without writing anything.')
+@click.option('--batch-size', type=int, help='Rows per batch; defaults to BULK_IMPORT_BATCH_SIZE.')
+@with_appcontext
+def import_data_command(entity, path, dry_run, batch_size):
+    """
+    Bulk-imports a CSV/XLSX file of master data, e.g. 'flask import-data materials plant.xlsx'.
+    ENTITY is one of: materials, customers, suppliers, operations, assets, work-centers.
+    """
+    from .master_data.services import md_service, IMPORTABLE
+    from .utils.bulk_import import BulkImportError
+
+    if entity not in IMPORTABLE:
+        raise click.BadParameter(f"expected one of: {', '.join(IMPORTABLE)}", param_hint='ENTITY')
+    with open(path, 'rb') as stream:
+        try:
+            report = md_service.import_file(entity, stream, path, dry_run=dry_run, batch_size=batch_size)
+        except BulkImportError as e:
+            raise click.ClickException(str(e))
+
+    action = 'validated' if dry_run else 'inserted'
+    print(f"{report['model']}: {report['total']} rows, {report['valid'] if dry_run else report['inserted']} {action}, {report['failed']} failed")
+    for error in report['errors']:
+        print(f"   - row {error['row']}: {error['errors']}")
+    if report['failed'] > len(report['errors']):
+        print(f"   ... {report['failed'] - len(report['errors'])} more")
+
+
+@click.command(name='archive-audit-logs')
+@click.option('--days', type=int, help='Keep this many days in gj_audit_logs; defaults to AUDIT_RETENTION_DAYS.')
+@click.option('--dry-run', is_flag=True, help='Only count the rows that would be moved.')
+@with_appcontext
+def archive_audit_logs_command(days, dry_run):
+    """Moves audit log rows past the retention window into monthly archive tables (run e.g. nightly)."""
+    from datetime import timedelta
+    from .system.services import system_service
+
+    days = days if days is not None else current_app.config.get('AUDIT_RETENTION_DAYS', 180)
+    before = datetime.utcnow() - timedelta(days=days)
+    moved = system_service.archive_audit_logs(before, dry_run=dry_run)
+    action = 'would be moved' if dry_run else 'moved'
+    for month in moved:
+        print(f"   - {month['table']}: {month['rows']} rows {action}")
+    print(f"{sum(month['rows'] for month in moved)} audit log rows older than {before:%Y-%m-%d} {action}.")
+
+
 @click.command(name='seed')
+@click.option('--scale', type=int, default=0, help='Also generate this many synthetic HDI customers with products, routings and demand.')
+@click.option('--random-seed', type=int, default=42, help='Seed of the synthetic data; the same seed and scale give the same rows.')
 @with_appcontext
-def seed_data_command():
+def seed_data_command(scale, random_seed):
     """Seeds the database with a complete initial set of data."""
     
     # --- Step 1: Clean up old data ---
     print("Clearing old data...")
     # Delete data in reverse order of creation to respect foreign key constraints
-    # Note: Relationships are removed, so direct deletion is used.
-    SalesOrderLine.query.delete()
-    SalesOrder.query.delete()
-    BomItem.query.delete()
-    OperationResource.query.delete()
-    RoutingOperation.query.delete()
-    Routing.query.delete()
-    Product.query.delete()
-    Material.query.delete()
-    WorkCenter.query.delete()
-    Operation.query.delete()
-    CustomerLocation.query.delete()
-    Customer.query.delete()
-    SupplierLocation.query.delete()
-    Supplier.query.delete()
-    # For association tables, we need to use delete() directly on the table object
-    db.session.execute(user_roles.delete())
-    db.session.execute(role_permissions.delete())
-    Menu.query.delete()
-    Plant.query.delete()
-    FactoryCluster.query.delete()
-    LegalEntity.query.delete()
-    BusinessUnit.query.delete()
-    Permission.query.delete()
-    Role.query.delete()
-    User.query.delete()
+    # (sorted_tables is in dependency order and includes the association tables).
+    for table in reversed(db.metadata.sorted_tables):
+        db.session.execute(table.delete())
     db.session.commit()
     
     print("Old data cleared. Seeding new data...")
@@ -186,6 +261,7 @@ def seed_data_command():
         {'name': 'user:manage', 'description': 'Manage users and roles'},
         {'name': 'plan:view', 'description': 'View capacity plan'},
         {'name': 'routing:edit', 'description': 'Edit routings'},
+        {'name': 'master_data:import', 'description': 'Bulk import and upsert master data'},
     ]
     permissions = {}
     for p_data in permissions_data:
@@ -213,13 +289,13 @@ def seed_data_command():
     
     cluster_sz1 = FactoryCluster(name='深圳一園區', bu_id=bu_hdi.id, legal_entity_id=le_pengding.id, created_by_id=admin_user.id, updated_by_id=admin_user.id)
     cluster_ha2 = FactoryCluster(name='淮安二園區', bu_id=bu_hdi.id, legal_entity_id=le_qingding.id, created_by_id=admin_user.id, updated_by_id=admin_user.id)
-    db.session.add([cluster_sz1, cluster_ha2])
+    db.session.add_all([cluster_sz1, cluster_ha2])
     db.session.commit()
 
     plant_sa03 = Plant(name='SA03', cluster_id=cluster_sz1.id, created_by_id=admin_user.id, updated_by_id=admin_user.id)
     plant_sa02 = Plant(name='SA02', cluster_id=cluster_sz1.id, created_by_id=admin_user.id, updated_by_id=admin_user.id)
     plant_hb04 = Plant(name='HB04', cluster_id=cluster_sz1.id, created_by_id=admin_user.id, updated_by_id=admin_user.id)
-    db.session.add([plant_sa03, plant_sa02, plant_hb04])
+    db.session.add_all([plant_sa03, plant_sa02, plant_hb04])
     db.session.commit()
 
     # --- Step 4: Create Core Master Data for HDI PCB ---
@@ -227,17 +303,27 @@ def seed_data_command():
     customer_apple = Customer(code='0001', name='H客戶', created_by_id=admin_user.id, updated_by_id=admin_user.id)
     customer_byd = Customer(code='0002', name='比亞迪', created_by_id=admin_user.id, updated_by_id=admin_user.id)
     customer_quanta = Customer(code='0003', name='廣達', created_by_id=admin_user.id, updated_by_id=admin_user.id)
-    db.session.add([customer_apple, customer_byd])
+    db.session.add_all([customer_apple, customer_byd, customer_quanta])
     db.session.commit()
 
     location_byd_sz = CustomerLocation(cust_id=customer_byd.id, loc_name='Shenzhen', is_default=True, created_by_id=admin_user.id, updated_by_id=admin_user.id)
     location_quanta_cq = CustomerLocation(cust_id=customer_quanta.id, loc_name='Chongqing', is_default=True, created_by_id=admin_user.id, updated_by_id=admin_user.id)
-    db.session.add([location_byd_sz, location_quanta_cq])
+    db.session.add_all([location_byd_sz, location_quanta_cq])
     db.session.commit()
 
     # HDI PCB Product
     product_820_03902_A = Product(cust_id=customer_apple.id, end_cust_id = customer_apple.id, cust_part_num='820-03902-A',
                               description='3阶10层板', created_by_id=admin_user.id, updated_by_id=admin_user.id)
+    db.session.add(product_820_03902_A)
+    db.session.commit()
+
+    # --- Synthetic data for volume testing ---
+    if scale > 0:
+        from .utils.synthetic_data import SyntheticDataGenerator
+        print(f"Generating synthetic data for {scale} customers (seed {random_seed})...")
+        counts = SyntheticDataGenerator(scale, random_seed, created_by_id=admin_user.id).run()
+        for table_name, rows in counts.items():
+            print(f"   - {table_name}: {rows} rows")
     
 
     # # layer definition
@@ -5,6 +5,8 @@ from datetime import datetime
 
 class SalesOrder(ModelBase, AuditMixin):
     """Master record for a sales order."""
+    __filterable__ = ('order_num', 'cust_id', 'order_date', 'order_status')
+    __sortable__ = ('order_date', 'order_num')
     id = db.Column(db.Integer, primary_key=True)
     order_num = db.Column(db.String(50), nullable=False, unique=True)
     cust_id = db.Column(db.Integer, db.ForeignKey('gj_customers.id'), nullable=False)
@@ -29,6 +31,8 @@ class SalesOrderLine(ModelBase, AuditMixin):
 
 class ForecastSet(ModelBase, AuditMixin):
     """A set of forecasts, typically from a customer."""
+    __filterable__ = ('cust_id', 'submission_date', 'period_type', 'set_status')
+    __sortable__ = ('submission_date', 'set_name')
     id = db.Column(db.Integer, primary_key=True)
     cust_id = db.Column(db.Integer, db.ForeignKey('gj_customers.id'), nullable=True)
     set_name = db.Column(db.String(100), nullable=False)
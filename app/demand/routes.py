@@ -1,17 +1,18 @@
 # goji/app/demand/routes.py
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from marshmallow import ValidationError
 
 # --- Service Layer Import ---
 from .services import demand_service
+from ..utils.pagination import page_request, paginated_response
+from ..utils.bulk_import import BulkImportError, open_table, read_ndjson, table_records
 from .schemas import SalesOrderSchema, ForecastSetSchema
 
 bp = Blueprint('demand', __name__, url_prefix='/api/demand')
 
 # Instantiate schemas for serialization (Dump only)
 sales_order_schema = SalesOrderSchema()
-sales_orders_schema = SalesOrderSchema(many=True)
 forecast_set_schema = ForecastSetSchema()
 forecast_sets_schema = ForecastSetSchema(many=True)
 
@@ -22,8 +23,8 @@ forecast_sets_schema = ForecastSetSchema(many=True)
 @bp.route('/sales-orders', methods=['GET'])
 def get_sales_orders():
     """Get a list of all sales orders."""
-    all_orders = demand_service.get_all_sales_orders()
-    return jsonify(sales_orders_schema.dump(all_orders))
+    all_orders = demand_service.get_all_sales_orders(page=page_request())
+    return paginated_response(demand_service.sales_order_rows, all_orders)
 
 @bp.route('/sales-orders/<int:id>', methods=['GET'])
 def get_sales_order(id):
@@ -45,6 +46,24 @@ def create_sales_order():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@bp.route('/sales-orders/batch', methods=['POST'])
+def create_sales_orders():
+    """
+    Create many sales orders with nested lines (e.g. an EDI drop) in one request.
+    Returns one result per order; invalid orders are reported without blocking the rest.
+    """
+    json_data = request.get_json()
+    if not isinstance(json_data, list) or not json_data:
+        return jsonify({"error": "Expected a non-empty JSON array of orders"}), 400
+    max_orders = current_app.config.get('SALES_ORDER_BATCH_MAX', 1000)
+    if len(json_data) > max_orders:
+        return jsonify({"error": f"At most {max_orders} orders per batch"}), 400
+    try:
+        result = demand_service.create_sales_orders(json_data)
+        return jsonify(result), 201 if not result["failed"] else 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @bp.route('/sales-orders/<int:id>', methods=['PUT'])
 def update_sales_order(id):
     """Update an existing sales order."""
@@ -75,8 +94,8 @@ def delete_sales_order(id):
 @bp.route('/forecasts', methods=['GET'])
 def get_forecasts():
     """Get a list of all forecast sets."""
-    all_forecasts = demand_service.get_all_forecast_sets()
-    return jsonify(forecast_sets_schema.dump(all_forecasts))
+    all_forecasts = demand_service.get_all_forecast_sets(page=page_request())
+    return paginated_response(forecast_sets_schema, all_forecasts)
 
 @bp.route('/forecasts', methods=['POST'])
 def create_forecast():
@@ -90,4 +109,32 @@ def create_forecast():
     except ValidationError as err:
         return jsonify(err.messages), 400
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/forecasts/upload', methods=['POST'])
+def upload_forecast():
+    """
+    Create a forecast set from a product x week matrix.
+    Accepts a multipart CSV/XLSX 'file' (first column 'cust_part_num', one column per
+    period start date) or a streamed NDJSON body (one such object per line). The set
+    header (set_name, submission_date, period_type, cust_id) comes from form fields
+    or the query string. Either every line is imported or none.
+    """
+    header = request.values.to_dict()
+    header.pop('file', None)
+    try:
+        upload = request.files.get('file')
+        if upload is not None and upload.filename:
+            records = table_records(*open_table(upload.stream, upload.filename))
+        elif request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+            records = read_ndjson(request.stream)
+        else:
+            return jsonify({"error": "Expected a CSV/XLSX 'file' or an application/x-ndjson body"}), 400
+        result = demand_service.upload_forecast(header, records)
+        return jsonify(result), 201
+    except ValidationError as err:
+        return jsonify(err.messages), 400
+    except BulkImportError as e:
+        return jsonify({"error": str(e), "errors": getattr(e, 'errors', [])}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -1,13 +1,90 @@
 # goji/app/demand/services.py
 
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from flask import current_app
+from sqlalchemy import insert, select
 from ..extensions import db
 from .models import SalesOrder, SalesOrderLine, ForecastSet, ForecastLine
 from .schemas import (
     SalesOrderSchema, SalesOrderLineSchema, 
     ForecastSetSchema, ForecastLineSchema
 )
+from ..utils.pagination import paginate
+from ..utils.fast_read import RowEncoder, fast_paginate
+from ..utils.bulk_import import BulkImportError, insert_rows, plain_schema
+from ..utils.id_blocks import id_blocks
+from ..utils.includes import IN_CHUNK_SIZE
+from ..utils.table_versions import table_versions
+from ..master_data.models import Customer, CustomerLocation, Product
 from marshmallow import ValidationError
 
+# Forecast matrix uploads: the product column, and the columns written per line
+FORECAST_KEY = 'cust_part_num'
+FORECAST_LINE_COLUMNS = ('set_id', 'product_id', 'period_start_date', 'quantity', 'created_at', 'updated_at')
+# Batch sales orders: natural-key references resolved before validation
+ORDER_REFS = ('cust_code', 'ship_to_loc_code', 'lines')
+_AMBIGUOUS = object()
+_INVALID = object()
+
+
+def _period(label):
+    """'2025-01-06' -> date, or _INVALID."""
+    try:
+        return date.fromisoformat(str(label).strip())
+    except ValueError:
+        return _INVALID
+
+
+def _quantity(value):
+    """Cell -> non-negative Decimal, or None."""
+    try:
+        quantity = Decimal(str(value).strip())
+    except InvalidOperation:
+        return None
+    return quantity if quantity.is_finite() and quantity >= 0 else None
+
+
+def _lookup(key_columns, value_column, keys):
+    """
+    {key: value} for the 'keys' present in the table, one 'IN (...)' query per IN_CHUNK_SIZE keys.
+    'key_columns' is one column, or a tuple of columns matched against tuple keys (the
+    IN list then filters on the last column and the rest are compared in Python).
+    """
+    composite = isinstance(key_columns, tuple)
+    keys = list(keys)
+    found = {}
+    for start in range(0, len(keys), IN_CHUNK_SIZE):
+        chunk = keys[start:start + IN_CHUNK_SIZE]
+        if composite:
+            query = select(*key_columns, value_column).where(key_columns[-1].in_({key[-1] for key in chunk}))
+            wanted = set(chunk)
+            for *key, value in db.session.execute(query):
+                if tuple(key) in wanted:
+                    found[tuple(key)] = value
+        else:
+            query = select(key_columns, value_column).where(key_columns.in_(chunk))
+            for key, value in db.session.execute(query):
+                found[key] = value
+    return found
+
+
+def _uniform(records, table):
+    """
+    Gives every record the same keys so an executemany runs as one statement: a missing
+    value becomes its column's scalar default, or NULL for columns without defaults.
+    """
+    keys = {key for record in records for key in record}
+    fill = {}
+    for key in keys:
+        column = table.c[key]
+        if column.default is not None and column.default.is_scalar:
+            fill[key] = column.default.arg
+        elif column.default is None and column.server_default is None:
+            fill[key] = None
+    return [dict({key: value for key, value in fill.items() if key not in record}, **record) for record in records]
+
+
 class DemandService:
     """
     Encapsulates business logic for Demand Management 
@@ -17,14 +94,16 @@ class DemandService:
     def __init__(self):
         self.sales_order_schema = SalesOrderSchema()
         self.forecast_set_schema = ForecastSetSchema()
+        # Column-row serializer for the read-only fast list path
+        self.sales_order_rows = RowEncoder(SalesOrder, SalesOrderSchema)
 
     # =========================================================
     # Sales Order Logic
     # =========================================================
 
-    def get_all_sales_orders(self):
-        """Retrieves all sales orders."""
-        return SalesOrder.query.all()
+    def get_all_sales_orders(self, page=None):
+        """Retrieves all sales orders as column rows; serialize them with 'sales_order_rows'."""
+        return fast_paginate(self.sales_order_rows, page, SalesOrder.id)
 
     def get_sales_order_by_id(self, order_id):
         """Retrieves a single sales order by ID."""
@@ -47,6 +126,156 @@ class DemandService:
             db.session.rollback()
             raise e
 
+    def create_sales_orders(self, orders: list) -> dict:
+        """
+        Creates many sales orders with their nested 'lines' in one transaction.
+
+        An order names its customer by 'cust_id' or 'cust_code' and its ship-to by
+        'ship_to_loc_id' or 'ship_to_loc_code'; a line names its product by 'product_id'
+        or by the customer's 'cust_part_num'. Headers and lines are validated in one
+        schema pass each, every reference is resolved with one IN query per kind, and
+        the valid orders are written with one executemany for headers and one for lines.
+        Invalid orders are skipped and reported; they never block the valid ones.
+        Returns:
+            dict: 'created' and 'failed' counts and one result per order, in payload order.
+        """
+        errors = {}
+
+        def fail(index, field, message):
+            errors.setdefault(index, {}).setdefault(field, []).append(message)
+
+        def fail_line(index, line_index, field, message):
+            errors.setdefault(index, {}).setdefault('lines', {}).setdefault(line_index, {}) \
+                .setdefault(field, []).append(message)
+
+        # --- Shape; natural keys are set aside until the ids they stand for are known ---
+        headers, order_lines, refs = {}, {}, {}
+        for index, order in enumerate(orders):
+            lines = order.get('lines') if isinstance(order, dict) else None
+            if not isinstance(order, dict):
+                fail(index, '_schema', "Invalid input type.")
+            elif not isinstance(lines, list) or not lines or not all(isinstance(line, dict) for line in lines):
+                fail(index, 'lines', "Expected a non-empty list of line objects.")
+            else:
+                headers[index] = {key: value for key, value in order.items() if key not in ORDER_REFS}
+                refs[index] = {key: order[key] for key in ORDER_REFS if key in order and key != 'lines'}
+                order_lines[index] = [
+                    dict({key: value for key, value in line.items() if key != 'cust_part_num'},
+                         line_num=line.get('line_num', line_index + 1))
+                    for line_index, line in enumerate(lines)
+                ]
+                refs[index]['part_nums'] = [line.get('cust_part_num') for line in lines]
+
+        # --- Customers by code, then header validation ---
+        codes = {ref['cust_code'] for ref in refs.values() if 'cust_code' in ref}
+        customer_ids = _lookup(Customer.code, Customer.id, codes)
+        for index, ref in refs.items():
+            if 'cust_code' in ref and 'cust_id' not in headers[index]:
+                if ref['cust_code'] in customer_ids:
+                    headers[index]['cust_id'] = customer_ids[ref['cust_code']]
+                else:
+                    fail(index, 'cust_code', f"Unknown customer '{ref['cust_code']}'.")
+
+        # ship_to_loc_id may come as a code; its presence is checked once codes are resolved
+        indexes = list(headers)
+        loaded = self._load_many(plain_schema(SalesOrderSchema), [headers[i] for i in indexes],
+                                 lambda position, messages: errors.setdefault(indexes[position], {}).update(messages),
+                                 partial=('ship_to_loc_id',))
+        headers = {index: header for index, header in zip(indexes, loaded) if index not in errors}
+
+        # --- Customer ids, ship-to locations and duplicate order numbers ---
+        known_customers = _lookup(Customer.id, Customer.id, {h['cust_id'] for h in headers.values()})
+        loc_codes = {(h['cust_id'], refs[i]['ship_to_loc_code']) for i, h in headers.items() if 'ship_to_loc_code' in refs[i]}
+        locations_by_code = _lookup((CustomerLocation.cust_id, CustomerLocation.loc_code), CustomerLocation.id, loc_codes)
+        location_owners = _lookup(CustomerLocation.id, CustomerLocation.cust_id,
+                                  {h['ship_to_loc_id'] for h in headers.values() if 'ship_to_loc_id' in h})
+        taken = _lookup(SalesOrder.order_num, SalesOrder.id, {h['order_num'] for h in headers.values()})
+        seen = set()
+        for index, header in headers.items():
+            if header['cust_id'] not in known_customers:
+                fail(index, 'cust_id', f"No customer with id {header['cust_id']}.")
+            if 'ship_to_loc_id' not in header and 'ship_to_loc_code' in refs[index]:
+                location_id = locations_by_code.get((header['cust_id'], refs[index]['ship_to_loc_code']))
+                if location_id is None:
+                    fail(index, 'ship_to_loc_code', f"Unknown ship-to '{refs[index]['ship_to_loc_code']}' for this customer.")
+                header['ship_to_loc_id'] = location_id
+            elif 'ship_to_loc_id' not in header:
+                fail(index, 'ship_to_loc_id', "Missing data for required field.")
+            elif location_owners.get(header['ship_to_loc_id']) != header['cust_id']:
+                fail(index, 'ship_to_loc_id', "Not a location of this customer.")
+            if header['order_num'] in taken or header['order_num'] in seen:
+                fail(index, 'order_num', f"Order '{header['order_num']}' already exists.")
+            seen.add(header['order_num'])
+
+        # --- Line validation, then products by id or customer part number ---
+        positions = [(index, line_index) for index in headers for line_index in range(len(order_lines[index]))]
+        loaded_lines = self._load_many(
+            plain_schema(SalesOrderLineSchema, exclude=('order_id',)),
+            [order_lines[index][line_index] for index, line_index in positions],
+            lambda position, messages: [fail_line(*positions[position], field, message)
+                                        for field, field_messages in messages.items() for message in field_messages],
+            partial=('product_id',),
+        )
+        part_keys = {(headers[i]['cust_id'], part_num) for i in headers for part_num in refs[i]['part_nums'] if part_num}
+        products_by_part = _lookup((Product.cust_id, Product.cust_part_num), Product.id, part_keys)
+        known_products = _lookup(Product.id, Product.id, {line['product_id'] for line in loaded_lines if 'product_id' in line})
+        for (index, line_index), line in zip(positions, loaded_lines):
+            order_lines[index][line_index] = line
+            part_num = refs[index]['part_nums'][line_index]
+            if 'product_id' in line:
+                if line['product_id'] not in known_products:
+                    fail_line(index, line_index, 'product_id', f"No product with id {line['product_id']}.")
+            elif part_num:
+                line['product_id'] = products_by_part.get((headers[index]['cust_id'], part_num))
+                if line['product_id'] is None:
+                    fail_line(index, line_index, 'cust_part_num', f"Unknown product '{part_num}' for this customer.")
+            else:
+                fail_line(index, line_index, 'product_id', "Missing data for required field.")
+
+        # --- Set-based writes ---
+        valid = [index for index in headers if index not in errors]
+        try:
+            if valid:
+                now = datetime.utcnow()
+                new_orders = id_blocks.assign(db.session, SalesOrder.__table__,
+                                              [dict(headers[i], created_at=now, updated_at=now) for i in valid])
+                # render_nulls: ORM bulk INSERT would otherwise split the batch on None values
+                db.session.execute(insert(SalesOrder).execution_options(render_nulls=True),
+                                   _uniform(new_orders, SalesOrder.__table__))
+                if all('id' in order for order in new_orders):  # ids allocated up front
+                    order_ids = {order['order_num']: order['id'] for order in new_orders}
+                else:
+                    order_ids = _lookup(SalesOrder.order_num, SalesOrder.id, [headers[i]['order_num'] for i in valid])
+                new_lines = id_blocks.assign(db.session, SalesOrderLine.__table__, [
+                    dict(line, order_id=order_ids[headers[index]['order_num']], created_at=now, updated_at=now)
+                    for index in valid for line in order_lines[index]
+                ])
+                db.session.execute(insert(SalesOrderLine).execution_options(render_nulls=True),
+                                   _uniform(new_lines, SalesOrderLine.__table__))
+                db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        results = []
+        for index, order in enumerate(orders):
+            order_num = order.get('order_num') if isinstance(order, dict) else None
+            if index in errors:
+                results.append({"index": index, "order_num": order_num, "status": "failed", "errors": errors[index]})
+            else:
+                results.append({"index": index, "order_num": order_num, "status": "created",
+                                "id": order_ids[headers[index]['order_num']], "lines": len(order_lines[index])})
+        return {"created": len(valid), "failed": len(orders) - len(valid), "results": results}
+
+    def _load_many(self, schema, records, on_error, partial=()):
+        """Loads 'records' in one many=True pass; on_error(position, messages) gets each invalid one."""
+        try:
+            return schema.load(records, partial=partial or None)
+        except ValidationError as err:
+            for position, messages in err.messages.items():
+                on_error(position, messages)
+            return err.valid_data
+
     def update_sales_order(self, order_id: int, data: dict) -> SalesOrder:
         """Updates an existing sales order."""
         order = self.get_sales_order_by_id(order_id)
@@ -74,8 +303,8 @@ class DemandService:
     # Forecast Logic
     # =========================================================
 
-    def get_all_forecast_sets(self):
-        return ForecastSet.query.all()
+    def get_all_forecast_sets(self, page=None):
+        return paginate(ForecastSet.query, page, ForecastSet.id)
 
     def create_forecast_set(self, data: dict) -> ForecastSet:
         try:
@@ -89,5 +318,119 @@ class DemandService:
             db.session.rollback()
             raise e
 
+    def upload_forecast(self, header: dict, records) -> dict:
+        """
+        Ingests a product x period forecast matrix as a new ForecastSet, in one transaction.
+
+        Args:
+            header: ForecastSet fields (set_name, submission_date, period_type, cust_id, ...).
+            records: Iterable of (row number, {'cust_part_num': ..., '<YYYY-MM-DD>': quantity, ...}),
+                     one per product; every other key is the start date of a period.
+        Returns:
+            dict: The created set and the number of products and lines written.
+        Raises:
+            ValidationError: if the header is invalid.
+            BulkImportError: if any row is invalid; nothing is written and the error
+                             carries the per-row report in 'errors'.
+        """
+        try:
+            set_data = plain_schema(ForecastSetSchema).load([header])[0]
+        except ValidationError as err:
+            raise ValidationError(err.messages.get(0, err.messages))
+        forecast_set = ForecastSet(**set_data)
+        max_errors = current_app.config.get('BULK_IMPORT_MAX_ERRORS', 1000)
+        batch_size = current_app.config.get('BULK_IMPORT_BATCH_SIZE', 1000)
+        products, periods, errors = {}, {}, []
+        first_rows = {}  # product id -> row number it was first listed on
+        counts = {"products": 0, "lines": 0}
+        failed = 0
+
+        def fail(number, message):
+            nonlocal failed
+            failed += 1
+            if len(errors) < max_errors:
+                errors.append({"row": number, "errors": message})
+
+        def flush(batch):
+            self._resolve_products([record.get(FORECAST_KEY) for _, record in batch], forecast_set.cust_id, products)
+            now = datetime.utcnow()
+            lines = []
+            for number, record in batch:
+                part_num = record.get(FORECAST_KEY)
+                product_id = products.get(part_num)
+                if product_id is None:
+                    fail(number, {FORECAST_KEY: [f"Unknown product '{part_num}'." if part_num else "Missing."]})
+                    continue
+                if product_id is _AMBIGUOUS:
+                    fail(number, {FORECAST_KEY: [f"'{part_num}' matches several customers' products; set cust_id."]})
+                    continue
+                if product_id in first_rows:
+                    # ForecastLine has no unique key; a repeated product would double its demand
+                    fail(number, {FORECAST_KEY: [f"'{part_num}' is already listed on row {first_rows[product_id]}."]})
+                    continue
+                first_rows[product_id] = number
+                row_lines, cell_errors = [], {}
+                for label, value in record.items():
+                    if label == FORECAST_KEY or value in (None, ''):
+                        continue
+                    period = periods.get(label) or periods.setdefault(label, _period(label))
+                    if period is _INVALID:
+                        cell_errors[label] = ["Not a period start date (YYYY-MM-DD)."]
+                        continue
+                    quantity = _quantity(value)
+                    if quantity is None:
+                        cell_errors[label] = ["Not a valid non-negative number."]
+                        continue
+                    row_lines.append((forecast_set.id, product_id, period, quantity, now, now))
+                if cell_errors:
+                    fail(number, cell_errors)
+                elif not failed:
+                    lines.extend(row_lines)
+                    counts["products"] += 1
+            if not failed:
+                insert_rows(ForecastLine.__table__, FORECAST_LINE_COLUMNS, lines)
+                counts["lines"] += len(lines)
+
+        try:
+            db.session.add(forecast_set)
+            db.session.flush()  # assigns forecast_set.id for the lines
+            batch = []
+            for number, record in records:
+                batch.append((number, record))
+                if len(batch) >= batch_size:
+                    flush(batch)
+                    batch = []
+            if batch:
+                flush(batch)
+            if failed:
+                raise BulkImportError(f"{failed} invalid row(s); nothing was imported")
+            db.session.commit()
+        except BulkImportError as e:
+            db.session.rollback()
+            e.errors = errors
+            raise
+        except Exception:
+            db.session.rollback()
+            raise
+        table_versions.bump(ForecastLine.__table__.name)  # COPY is not seen by the session events
+        return {"forecast_set": self.forecast_set_schema.dump(forecast_set), **counts}
+
+    def _resolve_products(self, part_nums, cust_id, products):
+        """
+        Adds {cust_part_num: product_id} for unseen part numbers, one IN query per chunk.
+        Unknown part numbers are cached as None, so later batches do not look them up again.
+        """
+        missing = list({part_num for part_num in part_nums if part_num and part_num not in products})
+        for start in range(0, len(missing), IN_CHUNK_SIZE):
+            chunk = missing[start:start + IN_CHUNK_SIZE]
+            query = select(Product.cust_part_num, Product.id).where(Product.cust_part_num.in_(chunk))
+            if cust_id is not None:
+                query = query.where(Product.cust_id == cust_id)
+            found = {}
+            for part_num, product_id in db.session.execute(query):
+                found[part_num] = _AMBIGUOUS if part_num in found else product_id
+            for part_num in chunk:
+                products[part_num] = found.get(part_num)
+
 # Singleton instance
 demand_service = DemandService()
\ No newline at end of file
@@ -11,6 +11,9 @@ class Customer(ModelBase, AuditMixin):
     """
     Stores customer's legal/group information (Bill-To).
     """
+    __filterable__ = ('code', 'name')
+    __sortable__ = ('code', 'name')
+    __natural_key__ = 'code'
     id = db.Column(db.Integer, primary_key=True)
     code = db.Column(db.String(50), nullable=False, unique=True, index=True)
     name = db.Column(db.String(255), nullable=False)
@@ -35,6 +38,9 @@ class Supplier(ModelBase, AuditMixin):
     """
     Stores supplier's legal/group information.
     """
+    __filterable__ = ('code', 'name', 'supplier_type')
+    __sortable__ = ('code', 'name')
+    __natural_key__ = 'code'
     id = db.Column(db.Integer, primary_key=True)
     code = db.Column(db.String(50), nullable=False, unique=True, index=True)
     name = db.Column(db.String(255), nullable=False)
@@ -67,6 +73,9 @@ class Product(ModelBase, AuditMixin):
     """
     Defines a product required by a customer. This is the root for a routing.
     """
+    __filterable__ = ('cust_id', 'cust_part_num', 'product_status', 'end_cust_id')
+    __sortable__ = ('cust_part_num',)
+    __includes__ = {'customer': 'cust_id', 'end_customer': 'end_cust_id'}
     id = db.Column(db.Integer, primary_key=True)
     product_status = db.Column(db.String(50), nullable=False, default='ACTIVE') # 'PLANNING', 'ACTIVE', 'EOL'
     ref_product_id = db.Column(db.Integer, db.ForeignKey('gj_products.id'), nullable=True)
@@ -80,6 +89,8 @@ class InternalProduct(ModelBase, AuditMixin):
     """
     Defines a product within the company, linking it to a customer's product.
     """
+    __filterable__ = ('product_id', 'plant_id', 'int_part_num', 'is_active')
+    __sortable__ = ('int_part_num',)
     id = db.Column(db.Integer, primary_key=True)
     product_id = db.Column(db.Integer, db.ForeignKey('gj_products.id'), nullable=False)
     plant_id = db.Column(db.Integer, db.ForeignKey('gj_plants.id'), nullable=False)
@@ -92,6 +103,9 @@ class Material(ModelBase, AuditMixin):
     """
     Master data for all items (raw, semi-finished, finished goods).
     """
+    __filterable__ = ('part_num', 'material_type', 'name', 'uom')
+    __sortable__ = ('part_num', 'material_type')
+    __natural_key__ = 'part_num'
     id = db.Column(db.Integer, primary_key=True)
     part_num = db.Column(db.String(100), nullable=False, unique=True, index=True)
     material_type = db.Column(db.String(50), nullable=False) # 'RAW', 'SEMI', 'FINISHED'
@@ -108,6 +122,8 @@ class Operation(ModelBase, AuditMixin):
     """
     Standard, reusable manufacturing operations.
     """
+    __filterable__ = ('code', 'name')
+    __sortable__ = ('name',)
     id = db.Column(db.Integer, primary_key=True)
     code = db.Column(db.String(50), unique=True)
     name = db.Column(db.String(100), nullable=False)
@@ -118,6 +134,9 @@ class Asset(ModelBase, AuditMixin):
     """
     Master data for physical assets (equipment, tools, etc.).
     """
+    __filterable__ = ('asset_tag', 'serial_num', 'asset_group_id', 'asset_status')
+    __sortable__ = ('asset_tag', 'asset_status')
+    __includes__ = {'asset_group': 'asset_group_id', 'supplier_location': 'sup_loc_id', 'manufacturer': 'mfg_id'}
     id = db.Column(db.Integer, primary_key=True)
     asset_group_id = db.Column(db.Integer, db.ForeignKey('gj_asset_groups.id'), nullable=True)
     asset_tag = db.Column(db.String(100), nullable=False, unique=True)
@@ -135,6 +154,8 @@ class AssetGroup(ModelBase, AuditMixin):
     """
     A logical grouping of assets (e.g., a production line).
     """
+    __filterable__ = ('plant_id', 'name', 'group_status')
+    __sortable__ = ('name',)
     id = db.Column(db.Integer, primary_key=True)
     plant_id = db.Column(db.Integer, db.ForeignKey('gj_plants.id'), nullable=False)
     name = db.Column(db.String(100), nullable=False, unique=True)
@@ -146,6 +167,8 @@ class WorkCenter(ModelBase, AuditMixin):
     """
     A logical scheduling unit for capacity planning.
     """
+    __filterable__ = ('plant_id', 'name')
+    __sortable__ = ('name',)
     id = db.Column(db.Integer, primary_key=True)
     plant_id = db.Column(db.Integer, db.ForeignKey('gj_plants.id'), nullable=False)
     name = db.Column(db.String(100), nullable=False, unique=True)
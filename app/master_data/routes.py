@@ -2,9 +2,16 @@
 
 from flask import Blueprint, request, jsonify
 from marshmallow import ValidationError
+from flask_jwt_extended import jwt_required
 
 # --- Service Layer Import ---
-from .services import md_service
+from .services import md_service, IMPORTABLE, UPSERTABLE
+from .models import Customer, CustomerLocation, WorkCenter, Asset, Operation, work_center_assets
+from ..utils.pagination import page_request, paginated_response
+from ..utils.conditional import conditional_get
+from ..user_management.scope import current_data_scope
+from ..utils.bulk_import import BulkImportError
+from ..user_management.routes import permission_required
 from .schemas import (
     CustomerSchema, SupplierSchema, ProductSchema, InternalProductSchema,
     MaterialSchema, WorkCenterSchema, OperationSchema,
@@ -19,11 +26,9 @@ customers_schema = CustomerSchema(many=True)
 supplier_schema = SupplierSchema()
 suppliers_schema = SupplierSchema(many=True)
 product_schema = ProductSchema()
-products_schema = ProductSchema(many=True)
 internal_product_schema = InternalProductSchema()
 internal_products_schema = InternalProductSchema(many=True)
 material_schema = MaterialSchema()
-materials_schema = MaterialSchema(many=True)
 wc_schema = WorkCenterSchema()
 wcs_schema = WorkCenterSchema(many=True)
 operation_schema = OperationSchema()
@@ -37,9 +42,10 @@ asset_groups_schema = AssetGroupSchema(many=True)
 # Customer API Endpoints
 # =============================================
 @bp.route('/customers', methods=['GET'])
+@conditional_get(Customer, CustomerLocation)
 def get_customers():
-    all_customers = md_service.get_all_customers()
-    return jsonify(customers_schema.dump(all_customers))
+    all_customers = md_service.get_all_customers(page=page_request())
+    return paginated_response(customers_schema, all_customers)
 
 @bp.route('/customers/<int:id>', methods=['GET'])
 def get_customer(id):
@@ -86,8 +92,8 @@ def delete_customer(id):
 
 @bp.route('/products', methods=['GET'])
 def get_products():
-    products = md_service.get_all_products()
-    return jsonify(products_schema.dump(products))
+    products = md_service.get_all_products(page=page_request())
+    return paginated_response(md_service.product_rows, products)
 
 @bp.route('/products', methods=['POST'])
 def create_product():
@@ -103,9 +109,10 @@ def create_product():
         return jsonify({"error": str(e)}), 500
 
 @bp.route('/internal-products', methods=['GET'])
+@jwt_required()
 def get_internal_products():
-    ips = md_service.get_all_internal_products()
-    return jsonify(internal_products_schema.dump(ips))
+    ips = md_service.get_all_internal_products(scope=current_data_scope(), page=page_request())
+    return paginated_response(internal_products_schema, ips)
 
 @bp.route('/internal-products', methods=['POST'])
 def create_internal_product():
@@ -122,8 +129,8 @@ def create_internal_product():
 
 @bp.route('/materials', methods=['GET'])
 def get_materials():
-    materials = md_service.get_all_materials()
-    return jsonify(materials_schema.dump(materials))
+    materials = md_service.get_all_materials(page=page_request())
+    return paginated_response(md_service.material_rows, materials)
 
 @bp.route('/materials', methods=['POST'])
 def create_material():
@@ -144,8 +151,8 @@ def create_material():
 
 @bp.route('/suppliers', methods=['GET'])
 def get_suppliers():
-    suppliers = md_service.get_all_suppliers()
-    return jsonify(suppliers_schema.dump(suppliers))
+    suppliers = md_service.get_all_suppliers(page=page_request())
+    return paginated_response(suppliers_schema, suppliers)
 
 @bp.route('/suppliers', methods=['POST'])
 def create_supplier():
@@ -165,9 +172,11 @@ def create_supplier():
 # =============================================
 
 @bp.route('/work-centers', methods=['GET'])
+@jwt_required()
+@conditional_get(WorkCenter, work_center_assets, Asset, scoped=True)
 def get_work_centers():
-    wcs = md_service.get_all_work_centers()
-    return jsonify(wcs_schema.dump(wcs))
+    wcs = md_service.get_all_work_centers(scope=current_data_scope(), page=page_request())
+    return paginated_response(wcs_schema, wcs)
 
 @bp.route('/work-centers/<int:id>', methods=['GET'])
 def get_work_center(id):
@@ -188,9 +197,10 @@ def create_work_center():
         return jsonify({"error": str(e)}), 500
 
 @bp.route('/operations', methods=['GET'])
+@conditional_get(Operation)
 def get_operations():
-    ops = md_service.get_all_operations()
-    return jsonify(operations_schema.dump(ops))
+    ops = md_service.get_all_operations(page=page_request())
+    return paginated_response(operations_schema, ops)
 
 @bp.route('/operations', methods=['POST'])
 def create_operation():
@@ -207,8 +217,8 @@ def create_operation():
 
 @bp.route('/assets', methods=['GET'])
 def get_assets():
-    assets = md_service.get_all_assets()
-    return jsonify(assets_schema.dump(assets))
+    assets = md_service.get_all_assets(page=page_request())
+    return paginated_response(assets_schema, assets)
 
 @bp.route('/assets', methods=['POST'])
 def create_asset():
@@ -224,9 +234,10 @@ def create_asset():
         return jsonify({"error": str(e)}), 500
 
 @bp.route('/asset-groups', methods=['GET'])
+@jwt_required()
 def get_asset_groups():
-    groups = md_service.get_all_asset_groups()
-    return jsonify(asset_groups_schema.dump(groups))
+    groups = md_service.get_all_asset_groups(scope=current_data_scope(), page=page_request())
+    return paginated_response(asset_groups_schema, groups)
 
 @bp.route('/asset-groups', methods=['POST'])
 def create_asset_group():
@@ -239,4 +250,46 @@ def create_asset_group():
     except ValidationError as err:
         return jsonify(err.messages), 400
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+# =============================================
+# Bulk Import / Upsert API Endpoints
+# =============================================
+
+@bp.route('/<string:entity>/import', methods=['POST'])
+@jwt_required()
+@permission_required('master_data:import')
+def import_master_data(entity):
+    """
+    Bulk-imports a CSV/XLSX upload (multipart field 'file') into materials, customers,
+    suppliers, operations, assets or work-centers. '?dry_run=1' validates only.
+    Returns the import report; rows that failed validation are listed with their errors.
+    """
+    if entity not in IMPORTABLE:
+        return jsonify({"error": f"Bulk import is not supported for '{entity}'"}), 404
+    upload = request.files.get('file')
+    if upload is None or not upload.filename:
+        return jsonify({"error": "No file provided"}), 400
+    dry_run = request.args.get('dry_run', '').lower() in ('1', 'true', 'yes')
+    try:
+        report = md_service.import_file(entity, upload.stream, upload.filename, dry_run=dry_run)
+        return jsonify(report), 200
+    except BulkImportError as e:
+        return jsonify({"error": str(e)}), 400
+
+@bp.route('/<string:entity>/upsert', methods=['POST'])
+@jwt_required()
+@permission_required('master_data:import')
+def upsert_master_data(entity):
+    """
+    Inserts or updates a JSON array of customers, suppliers or materials keyed on their
+    natural key (code / part_num), e.g. the nightly ERP sync.
+    Returns inserted/updated/unchanged counts; invalid rows are listed with their errors.
+    """
+    if entity not in UPSERTABLE:
+        return jsonify({"error": f"Upsert is not supported for '{entity}'"}), 404
+    json_data = request.get_json()
+    if not isinstance(json_data, list):
+        return jsonify({"error": "Expected a JSON array of rows"}), 400
+    report = md_service.upsert(entity, json_data)
+    return jsonify(report), 200
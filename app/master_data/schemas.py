@@ -75,6 +75,7 @@ class MaterialSchema(ma.SQLAlchemyAutoSchema):
 class ProductSchema(ma.SQLAlchemyAutoSchema):
     """Schema for the Product model, with nested customer info."""
     customer = ma.Nested(CustomerSchema, exclude=("locations",), dump_only=True)
+    end_customer = ma.Nested(CustomerSchema, exclude=("locations",), dump_only=True)
 
     class Meta:
         model = Product
@@ -11,8 +11,31 @@ from .schemas import (
     MaterialSchema, WorkCenterSchema, OperationSchema,
     AssetSchema, AssetGroupSchema
 )
+from ..user_management.scope import apply_scope
+from ..utils.pagination import paginate
+from ..utils.query_cache import cached
+from ..utils.fast_read import RowEncoder, fast_paginate
+from ..utils.bulk_import import BulkImporter, open_table
+from ..utils.upsert import BulkUpserter
 from marshmallow import ValidationError
 
+# Entities accepted by the CSV/XLSX bulk import, keyed by their URL name.
+IMPORTABLE = {
+    'materials': (Material, MaterialSchema),
+    'customers': (Customer, CustomerSchema),
+    'suppliers': (Supplier, SupplierSchema),
+    'operations': (Operation, OperationSchema),
+    'assets': (Asset, AssetSchema),
+    'work-centers': (WorkCenter, WorkCenterSchema),
+}
+
+# Entities the ERP sync upserts by natural key ('__natural_key__').
+UPSERTABLE = {
+    'customers': (Customer, CustomerSchema),
+    'suppliers': (Supplier, SupplierSchema),
+    'materials': (Material, MaterialSchema),
+}
+
 class MasterDataService:
     """
     Encapsulates business logic for Master Data entities.
@@ -28,13 +51,16 @@ class MasterDataService:
         self.operation_schema = OperationSchema()
         self.asset_schema = AssetSchema()
         self.asset_group_schema = AssetGroupSchema()
+        # Column-row serializers for the read-only fast list path
+        self.material_rows = RowEncoder(Material, MaterialSchema)
+        self.product_rows = RowEncoder(Product, ProductSchema)
 
     # =========================================================
     # Customer Logic
     # =========================================================
 
-    def get_all_customers(self):
-        return Customer.query.all()
+    def get_all_customers(self, page=None):
+        return paginate(Customer.query, page, Customer.id)
 
     def get_customer_by_id(self, id):
         return Customer.query.get_or_404(id)
@@ -76,8 +102,8 @@ class MasterDataService:
     # Supplier Logic
     # =========================================================
 
-    def get_all_suppliers(self):
-        return Supplier.query.all()
+    def get_all_suppliers(self, page=None):
+        return paginate(Supplier.query, page, Supplier.id)
 
     def create_supplier(self, data: dict) -> Supplier:
         try:
@@ -95,8 +121,9 @@ class MasterDataService:
     # Material & Product Logic
     # =========================================================
 
-    def get_all_materials(self):
-        return Material.query.all()
+    def get_all_materials(self, page=None):
+        """Returns column rows (no ORM instances); serialize them with 'material_rows'."""
+        return fast_paginate(self.material_rows, page, Material.id)
 
     def create_material(self, data: dict) -> Material:
         try:
@@ -110,8 +137,9 @@ class MasterDataService:
             db.session.rollback()
             raise e
 
-    def get_all_products(self):
-        return Product.query.all()
+    def get_all_products(self, page=None):
+        """Returns column rows (no ORM instances); serialize them with 'product_rows'."""
+        return fast_paginate(self.product_rows, page, Product.id)
 
     def create_product(self, data: dict) -> Product:
         try:
@@ -127,8 +155,10 @@ class MasterDataService:
 
     # --- Internal Product (Added) ---
 
-    def get_all_internal_products(self):
-        return InternalProduct.query.all()
+    def get_all_internal_products(self, scope=None, page=None):
+        """'scope' (DataScope) restricts the rows to the user's plants in SQL."""
+        query = apply_scope(InternalProduct.query, scope, plant_column=InternalProduct.plant_id)
+        return paginate(query, page, InternalProduct.id)
 
     def create_internal_product(self, data: dict) -> InternalProduct:
         try:
@@ -147,8 +177,10 @@ class MasterDataService:
     # =========================================================
 
     # --- Work Center ---
-    def get_all_work_centers(self):
-        return WorkCenter.query.all()
+    def get_all_work_centers(self, scope=None, page=None):
+        """'scope' (DataScope) restricts the rows to the user's plants in SQL."""
+        query = apply_scope(cached(WorkCenter.query), scope, plant_column=WorkCenter.plant_id)
+        return paginate(query, page, WorkCenter.id)
 
     def get_work_center_by_id(self, id):
         return WorkCenter.query.get_or_404(id)
@@ -166,8 +198,8 @@ class MasterDataService:
             raise e
 
     # --- Operation ---
-    def get_all_operations(self):
-        return Operation.query.all()
+    def get_all_operations(self, page=None):
+        return paginate(cached(Operation.query), page, Operation.id)
 
     def create_operation(self, data: dict) -> Operation:
         try:
@@ -182,8 +214,8 @@ class MasterDataService:
             raise e
 
     # --- Asset ---
-    def get_all_assets(self):
-        return Asset.query.all()
+    def get_all_assets(self, page=None):
+        return paginate(Asset.query, page, Asset.id)
 
     def create_asset(self, data: dict) -> Asset:
         try:
@@ -198,8 +230,10 @@ class MasterDataService:
             raise e
 
     # --- Asset Group ---
-    def get_all_asset_groups(self):
-        return AssetGroup.query.all()
+    def get_all_asset_groups(self, scope=None, page=None):
+        """'scope' (DataScope) restricts the rows to the user's plants in SQL."""
+        query = apply_scope(AssetGroup.query, scope, plant_column=AssetGroup.plant_id)
+        return paginate(query, page, AssetGroup.id)
 
     def create_asset_group(self, data: dict) -> AssetGroup:
         try:
@@ -213,5 +247,28 @@ class MasterDataService:
             db.session.rollback()
             raise e
 
+    # =========================================================
+    # Bulk Import
+    # =========================================================
+
+    def import_file(self, entity: str, stream, filename: str, dry_run=False, batch_size=None) -> dict:
+        """
+        Streams a CSV/XLSX file into the table of 'entity' (a key of IMPORTABLE).
+        Rows are validated and inserted in batches; invalid rows are reported, not raised.
+        Raises:
+            BulkImportError: if the file itself is unusable (format, unknown columns).
+        """
+        model, schema_cls = IMPORTABLE[entity]
+        header, rows = open_table(stream, filename)
+        return BulkImporter(model, schema_cls, batch_size=batch_size).run(header, rows, dry_run=dry_run)
+
+    def upsert(self, entity: str, records: list, batch_size=None) -> dict:
+        """
+        Inserts or updates 'records' of 'entity' (a key of UPSERTABLE) by natural key.
+        Invalid rows are reported, not raised.
+        """
+        model, schema_cls = UPSERTABLE[entity]
+        return BulkUpserter(model, schema_cls, batch_size=batch_size).run(records)
+
 # Singleton instance
 md_service = MasterDataService()
\ No newline at end of file
@@ -25,6 +25,16 @@ class ModelBase(db.Model):
     """
     __abstract__ = True
 
+    # Columns list endpoints may filter ('?filter=') and sort ('?sort=') on.
+    # Sortable columns must be NOT NULL so keyset pagination stays total.
+    __filterable__ = ()
+    __sortable__ = ()
+    # To-one relations list endpoints may embed ('?include='): {name: foreign key attribute}.
+    # Each name must match a Nested field of the list schema.
+    __includes__ = {}
+    # Unique business key used by bulk upserts (e.g. 'code'); None when the model has none.
+    __natural_key__ = None
+
     @declared_attr
     def __tablename__(cls):
         """
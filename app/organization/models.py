@@ -40,6 +40,9 @@ class Plant(ModelBase, AuditMixin):
     """
     Defines a specific manufacturing plant or facility.
     """
+    __filterable__ = ('cluster_id', 'name')
+    __sortable__ = ('name',)
+    __includes__ = {'factory_cluster': 'cluster_id'}
     id = db.Column(db.Integer, primary_key=True)
     cluster_id = db.Column(db.Integer, db.ForeignKey('gj_factory_clusters.id'), nullable=False)
     name = db.Column(db.String(100), nullable=False)
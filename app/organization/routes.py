@@ -2,7 +2,10 @@
 
 from flask import Blueprint, request, jsonify
 from marshmallow import ValidationError
+from flask_jwt_extended import jwt_required
 from .services import org_service
+from ..utils.pagination import page_request, paginated_response
+from ..user_management.scope import current_data_scope
 from .schemas import (
     BusinessUnitSchema, 
     LegalEntitySchema, 
@@ -28,10 +31,11 @@ plants_schema = PlantSchema(many=True)
 # =============================================
 
 @bp.route('/business-units', methods=['GET'])
+@jwt_required()
 def get_business_units():
     """Get a list of all business units."""
-    all_bus = org_service.get_all_business_units()
-    return jsonify(bus_schema.dump(all_bus))
+    all_bus = org_service.get_all_business_units(scope=current_data_scope(), page=page_request())
+    return paginated_response(bus_schema, all_bus)
 
 @bp.route('/business-units', methods=['POST'])
 def create_business_unit():
@@ -55,8 +59,8 @@ def create_business_unit():
 @bp.route('/legal-entities', methods=['GET'])
 def get_legal_entities():
     """Get a list of all legal entities."""
-    all_les = org_service.get_all_legal_entities()
-    return jsonify(les_schema.dump(all_les))
+    all_les = org_service.get_all_legal_entities(page=page_request())
+    return paginated_response(les_schema, all_les)
 
 @bp.route('/legal-entities', methods=['POST'])
 def create_legal_entity():
@@ -78,10 +82,11 @@ def create_legal_entity():
 # =============================================
 
 @bp.route('/factory-clusters', methods=['GET'])
+@jwt_required()
 def get_factory_clusters():
     """Get a list of all factory clusters."""
-    all_fcs = org_service.get_all_clusters()
-    return jsonify(fcs_schema.dump(all_fcs))
+    all_fcs = org_service.get_all_clusters(scope=current_data_scope(), page=page_request())
+    return paginated_response(fcs_schema, all_fcs)
 
 @bp.route('/factory-clusters', methods=['POST'])
 def create_factory_cluster():
@@ -103,10 +108,11 @@ def create_factory_cluster():
 # =============================================
 
 @bp.route('/plants', methods=['GET'])
+@jwt_required()
 def get_plants():
     """Get a list of all plants."""
-    all_plants = org_service.get_all_plants()
-    return jsonify(plants_schema.dump(all_plants))
+    all_plants = org_service.get_all_plants(scope=current_data_scope(), page=page_request())
+    return paginated_response(plants_schema, all_plants)
 
 @bp.route('/plants', methods=['POST'])
 def create_plant():
@@ -8,6 +8,9 @@ from .schemas import (
     FactoryClusterSchema, 
     PlantSchema
 )
+from ..user_management.scope import apply_scope
+from ..utils.pagination import paginate
+from ..utils.query_cache import cached
 from marshmallow import ValidationError
 
 class OrganizationService:
@@ -27,8 +30,9 @@ class OrganizationService:
     # Business Unit Logic
     # =========================================================
     
-    def get_all_business_units(self):
-        return BusinessUnit.query.all()
+    def get_all_business_units(self, scope=None, page=None):
+        query = apply_scope(BusinessUnit.query, scope, bu_column=BusinessUnit.id)
+        return paginate(query, page, BusinessUnit.id)
 
     def create_business_unit(self, data: dict) -> BusinessUnit:
         try:
@@ -46,8 +50,8 @@ class OrganizationService:
     # Legal Entity Logic
     # =========================================================
 
-    def get_all_legal_entities(self):
-        return LegalEntity.query.all()
+    def get_all_legal_entities(self, page=None):
+        return paginate(LegalEntity.query, page, LegalEntity.id)
 
     def create_legal_entity(self, data: dict) -> LegalEntity:
         try:
@@ -65,8 +69,9 @@ class OrganizationService:
     # Factory Cluster Logic
     # =========================================================
 
-    def get_all_clusters(self):
-        return FactoryCluster.query.all()
+    def get_all_clusters(self, scope=None, page=None):
+        query = apply_scope(FactoryCluster.query, scope, bu_column=FactoryCluster.bu_id)
+        return paginate(query, page, FactoryCluster.id)
 
     def create_cluster(self, data: dict) -> FactoryCluster:
         try:
@@ -84,8 +89,10 @@ class OrganizationService:
     # Plant Logic
     # =========================================================
 
-    def get_all_plants(self):
-        return Plant.query.all()
+    def get_all_plants(self, scope=None, page=None):
+        """'scope' (DataScope) restricts the rows to the user's plants in SQL."""
+        query = apply_scope(cached(Plant.query), scope, plant_column=Plant.id)
+        return paginate(query, page, Plant.id)
     
     def get_plant_by_id(self, plant_id):
         return Plant.query.get_or_404(plant_id)
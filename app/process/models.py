@@ -5,6 +5,8 @@ from datetime import datetime
 
 class Routing(ModelBase, AuditMixin):
     """Defines the master record for a manufacturing process of a product."""
+    __filterable__ = ('int_product_id', 'routing_status', 'is_default', 'is_active')
+    __sortable__ = ('int_product_id',)
     id = db.Column(db.Integer, primary_key=True)
     routing_status = db.Column(db.String(50), nullable=False, default='ACTIVE') # e.g., 'PLANNING', 'ACTIVE'
     int_product_id = db.Column(db.Integer, db.ForeignKey('gj_internal_products.id'), nullable=False)
@@ -13,6 +15,11 @@ class Routing(ModelBase, AuditMixin):
     strip_per_panel = db.Column(db.Integer)
     is_default = db.Column(db.Boolean, nullable=False, default=False)
     is_active = db.Column(db.Boolean, nullable=False, default=True)
+
+    operations = db.relationship(
+        'RoutingOperation', backref='routing', order_by='RoutingOperation.step_num',
+        cascade='all, delete-orphan'
+    )
     
     
 class RoutingOperation(ModelBase, AuditMixin):
@@ -28,6 +35,15 @@ class RoutingOperation(ModelBase, AuditMixin):
     workpiece_len = db.Column(db.Numeric(10, 4))
     workpiece_width = db.Column(db.Numeric(10, 4))
 
+    resources = db.relationship(
+        'OperationResource', backref='routing_operation', order_by='OperationResource.pref_level',
+        cascade='all, delete-orphan'
+    )
+    bom_items = db.relationship(
+        'BomItem', backref='routing_operation', order_by='BomItem.id',
+        cascade='all, delete-orphan'
+    )
+
     
 class LayerDefinition(ModelBase, AuditMixin):
     """Master data for layer definitions (e.g., in PCB manufacturing)."""
@@ -81,6 +97,11 @@ class BomItem(ModelBase, AuditMixin):
     scrap_pct = db.Column(db.Numeric(5, 4), nullable=False, default=0)      # Scrap percentage (0-1 range)
     
     notes = db.Column(db.String(500))
+
+    alternates = db.relationship(
+        'AlternateMaterial', backref='bom_item', order_by='AlternateMaterial.priority',
+        cascade='all, delete-orphan'
+    )
     
     
 class AlternateMaterial(ModelBase, AuditMixin):
@@ -5,6 +5,7 @@ from marshmallow import ValidationError
 
 # --- Service Layer Import ---
 from .services import process_service
+from ..utils.pagination import page_request, paginated_response
 from .schemas import (
     RoutingSchema, 
     LayerDefinitionSchema, 
@@ -15,7 +16,8 @@ bp = Blueprint('process', __name__, url_prefix='/api/process')
 
 # Instantiate schemas for serialization (Dump only)
 routing_schema = RoutingSchema()
-routings_schema = RoutingSchema(many=True)
+# Lists stay flat; the operation tree is only served by the single-routing endpoint
+routings_schema = RoutingSchema(many=True, exclude=('operations',))
 layer_def_schema = LayerDefinitionSchema()
 layer_defs_schema = LayerDefinitionSchema(many=True)
 layer_struct_schema = LayerStructureSchema()
@@ -28,13 +30,13 @@ layer_structs_schema = LayerStructureSchema(many=True)
 @bp.route('/routings', methods=['GET'])
 def get_routings():
     """Get a list of all routings."""
-    all_routings = process_service.get_all_routings()
-    return jsonify(routings_schema.dump(all_routings))
+    all_routings = process_service.get_all_routings(page=page_request())
+    return paginated_response(routings_schema, all_routings)
 
 @bp.route('/routings/<int:id>', methods=['GET'])
 def get_routing(id):
-    """Get a single routing by ID."""
-    routing = process_service.get_routing_by_id(id)
+    """Get a single routing by ID, with its full operation tree."""
+    routing = process_service.get_routing_tree(id)
     return jsonify(routing_schema.dump(routing))
 
 @bp.route('/routings', methods=['POST'])
@@ -65,6 +67,20 @@ def update_routing(id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@bp.route('/routings/<int:id>/clone', methods=['POST'])
+def clone_routing(id):
+    """Copy a routing with its full operation tree into a new version ('int_ver')."""
+    json_data = request.get_json()
+    if not json_data:
+        return jsonify({"error": "No input data provided"}), 400
+    try:
+        new_routing = process_service.clone_routing(id, json_data)
+        return jsonify(routing_schema.dump(new_routing)), 201
+    except ValidationError as err:
+        return jsonify(err.messages), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @bp.route('/routings/<int:id>', methods=['DELETE'])
 def delete_routing(id):
     """Delete a routing."""
@@ -81,8 +97,8 @@ def delete_routing(id):
 @bp.route('/layer-definitions', methods=['GET'])
 def get_layer_definitions():
     """Get all layer definitions."""
-    layers = process_service.get_all_layer_definitions()
-    return jsonify(layer_defs_schema.dump(layers))
+    layers = process_service.get_all_layer_definitions(page=page_request())
+    return paginated_response(layer_defs_schema, layers)
 
 @bp.route('/layer-definitions', methods=['POST'])
 def create_layer_definition():
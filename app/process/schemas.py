@@ -9,18 +9,21 @@ class AlternateMaterialSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = AlternateMaterial
         load_instance = True
+        include_fk = True
 
 class BomItemSchema(ma.SQLAlchemyAutoSchema):
     alternates = ma.Nested(AlternateMaterialSchema, many=True, dump_only=True)
     class Meta:
         model = BomItem
         load_instance = True
+        include_fk = True
         include_relationships = True
 
 class OperationResourceSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = OperationResource
         load_instance = True
+        include_fk = True
         include_relationships = True
 
 class RoutingOperationSchema(ma.SQLAlchemyAutoSchema):
@@ -29,6 +32,7 @@ class RoutingOperationSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = RoutingOperation
         load_instance = True
+        include_fk = True
         include_relationships = True
 
 class RoutingSchema(ma.SQLAlchemyAutoSchema):
@@ -1,5 +1,8 @@
 # goji/app/process/services.py
 
+from datetime import datetime
+from sqlalchemy import case, insert, literal, select
+from sqlalchemy.orm import selectinload
 from ..extensions import db
 from .models import (
     Routing, RoutingOperation, OperationResource, 
@@ -9,6 +12,10 @@ from .schemas import (
     RoutingSchema, RoutingOperationSchema, 
     LayerDefinitionSchema, LayerStructureSchema
 )
+from ..utils.bulk_import import SYSTEM_COLUMNS
+from ..utils.includes import IN_CHUNK_SIZE
+from ..utils.pagination import paginate
+from ..utils.query_cache import cached
 from marshmallow import ValidationError
 
 class ProcessService:
@@ -27,14 +34,32 @@ class ProcessService:
     # Routing Logic (Header & Structure)
     # =========================================================
 
-    def get_all_routings(self):
+    def get_all_routings(self, page=None):
         """Retrieves all routings."""
-        return Routing.query.all()
+        return paginate(Routing.query, page, Routing.id)
 
     def get_routing_by_id(self, routing_id):
         """Retrieves a single routing by ID."""
         return Routing.query.get_or_404(routing_id)
 
+    def get_routing_tree(self, routing_id):
+        """
+        Retrieves a routing with its operations, resources, BOM items and alternates.
+        Each level is loaded with one 'SELECT ... WHERE parent_id IN (...)', so the
+        whole tree costs five queries however many steps the routing has.
+        """
+        return (
+            Routing.query
+            .options(
+                selectinload(Routing.operations).options(
+                    selectinload(RoutingOperation.resources),
+                    selectinload(RoutingOperation.bom_items).selectinload(BomItem.alternates),
+                )
+            )
+            .filter(Routing.id == routing_id)
+            .first_or_404()
+        )
+
     def create_routing(self, data: dict) -> Routing:
         """
         Creates a new routing. 
@@ -78,12 +103,69 @@ class ProcessService:
             db.session.rollback()
             raise e
 
+    def clone_routing(self, routing_id: int, data: dict) -> Routing:
+        """
+        Copies a routing with its whole tree (operations, resources, BOM items,
+        alternates, layer structures) into a new version of the same product.
+
+        Each level is copied with one 'INSERT ... SELECT' per IN_CHUNK_SIZE parents,
+        the parent key re-pointed by a 'CASE old_id WHEN ... THEN new_id' built from
+        the old -> new id map of the level above, so the statement count does not
+        grow with the size of the routing. Everything runs in one transaction.
+
+        Args:
+            data: 'int_ver' (required), optionally 'routing_status', 'is_default', 'is_active'.
+                  With 'is_default' the product's current default routing is unset.
+        Raises:
+            ValidationError: if 'int_ver' is missing or already used for the product.
+        """
+        source = self.get_routing_by_id(routing_id)
+        int_ver = data.get('int_ver')
+        if not int_ver:
+            raise ValidationError({"int_ver": ["Missing data for required field."]})
+        taken = db.session.execute(
+            select(Routing.id).where(Routing.int_product_id == source.int_product_id, Routing.int_ver == int_ver)
+        ).first()
+        if taken:
+            raise ValidationError({"int_ver": [f"Version '{int_ver}' already exists for this product."]})
+
+        try:
+            if data.get('is_default'):
+                # A product has one default routing; unset it through the ORM so the change is audited
+                defaults = Routing.query.filter_by(int_product_id=source.int_product_id, is_default=True)
+                for other in defaults:
+                    other.is_default = False
+            routing = Routing(
+                int_product_id=source.int_product_id,
+                int_ver=int_ver,
+                routing_status=data.get('routing_status', source.routing_status),
+                pcs_per_strip=source.pcs_per_strip,
+                strip_per_panel=source.strip_per_panel,
+                is_default=data.get('is_default', False),
+                is_active=data.get('is_active', source.is_active),
+            )
+            db.session.add(routing)
+            db.session.flush()
+
+            now = datetime.utcnow()
+            routings = {source.id: routing.id}
+            _copy_rows(LayerStructure, 'routing_id', routings, now)
+            operations = _copy_rows(RoutingOperation, 'routing_id', routings, now, id_map=True)
+            _copy_rows(OperationResource, 'routing_op_id', operations, now)
+            bom_items = _copy_rows(BomItem, 'routing_op_id', operations, now, id_map=True)
+            _copy_rows(AlternateMaterial, 'bom_item_id', bom_items, now)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return self.get_routing_tree(routing.id)
+
     # =========================================================
     # Layer Definition Logic
     # =========================================================
 
-    def get_all_layer_definitions(self):
-        return LayerDefinition.query.all()
+    def get_all_layer_definitions(self, page=None):
+        return paginate(cached(LayerDefinition.query), page, LayerDefinition.id)
 
     def create_layer_definition(self, data: dict) -> LayerDefinition:
         try:
@@ -104,6 +186,60 @@ class ProcessService:
     def get_layer_structures_by_routing(self, routing_id):
         return LayerStructure.query.filter_by(routing_id=routing_id).all()
 
+# =========================================================
+# Set-based Copy Helpers
+# =========================================================
+
+def _copied_columns(table, parent_key):
+    """Columns carried over as they are: all but the system columns and the parent key."""
+    return [column for column in table.columns if column.name not in SYSTEM_COLUMNS and column.name != parent_key]
+
+
+def _copy_rows(model, parent_key, parents, now, id_map=False):
+    """
+    Copies the rows of 'model' whose 'parent_key' is one of 'parents' ({old id: new id})
+    under the new parents, with 'INSERT ... SELECT' statements.
+    Returns:
+        dict: {old id: new id} of the copied rows when 'id_map' is set, else None.
+    """
+    table = model.__table__
+    parent = table.c[parent_key]
+    columns = _copied_columns(table, parent_key)
+    stamps = [name for name in ('created_at', 'updated_at') if name in table.c]
+    old_ids = list(parents)
+    for start in range(0, len(old_ids), IN_CHUNK_SIZE):
+        chunk = {old: parents[old] for old in old_ids[start:start + IN_CHUNK_SIZE]}
+        remap = case(chunk, value=parent) if len(chunk) > 1 else literal(next(iter(chunk.values())))
+        rows = select(remap, *columns, *(literal(now, table.c[name].type) for name in stamps)).where(parent.in_(chunk))
+        db.session.execute(
+            insert(table).from_select([parent_key] + [column.name for column in columns] + stamps, rows)
+        )
+    return _id_map(table, parent, columns, parents) if id_map else None
+
+
+def _id_map(table, parent, columns, parents):
+    """
+    Pairs the copied rows with their originals: both sides are read back and sorted
+    by (new parent, every copied column). Rows equal on all of these are
+    interchangeable, so pairing them either way yields the same tree.
+    """
+    def rows(parent_ids, to_new):
+        found = []
+        parent_ids = list(parent_ids)
+        for start in range(0, len(parent_ids), IN_CHUNK_SIZE):
+            query = select(table.c.id, parent, *columns).where(parent.in_(parent_ids[start:start + IN_CHUNK_SIZE]))
+            for row in db.session.execute(query):
+                key = (to_new(row[1]),) + tuple(row[2:])
+                found.append((tuple((value is None, value if value is not None else 0) for value in key), row[0]))
+        return sorted(found)
+
+    old = rows(parents, parents.get)
+    new = rows(parents.values(), lambda value: value)
+    if len(old) != len(new):
+        raise RuntimeError(f"Copy of {table.name} is incomplete ({len(new)} of {len(old)} rows)")
+    return {old_id: new_id for (_, old_id), (_, new_id) in zip(old, new)}
+
+
 # Singleton instance
 process_service = ProcessService()
 
@@ -0,0 +1,318 @@
+# goji/app/system/audit.py
+
+import atexit
+import json
+import queue
+import threading
+import time
+from datetime import datetime
+from flask import has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event, insert, inspect, select
+from sqlalchemy.orm import Session
+from ..extensions import db
+from ..models import AuditMixin
+from ..utils.includes import IN_CHUNK_SIZE
+from .models import AuditLog
+
+_PENDING_KEY = '_goji_pending_audit'
+_STOP = object()
+# Bookkeeping columns left out of UPDATE diffs (an update that only touches these is not logged)
+_UNAUDITED = frozenset(('updated_at', 'updated_by_id'))
+
+
+class AuditWriter:
+    """
+    Captures changes to AuditMixin models from the session and writes them to
+    gj_audit_logs on a background thread.
+
+    Updates and deletes are captured in 'before_flush' (attribute history / the loaded
+    row), inserts in 'after_flush' once their ids are known. The entries of a session
+    are handed to the writer when it commits and dropped when it rolls back, so only
+    committed work is logged and the audit trail never touches the caller's transaction.
+
+    The writer drains a bounded queue into multi-row inserts of up to AUDIT_BATCH_SIZE
+    entries on its own connection, at least every AUDIT_FLUSH_INTERVAL seconds.
+    When the queue is full, a committing thread waits up to AUDIT_ENQUEUE_TIMEOUT and
+    then writes its entries itself (backpressure instead of loss). Pending entries are
+    flushed at interpreter exit.
+
+    Bulk statements that bypass the unit of work (INSERT ... SELECT, COPY, MERGE
+    upserts) are not captured.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.asynchronous = True
+        self.queue_size = 10000
+        self.batch_size = 500
+        self.flush_interval = 1.0
+        self.enqueue_timeout = 0.5
+        self._app = None
+        self._queue = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._listening = False
+        self._reset_metrics()
+
+    def init_app(self, app):
+        with self._lock:
+            self._app = app
+            self.enabled = app.config.get('AUDIT_CAPTURE', self.enabled)
+            self.asynchronous = app.config.get('AUDIT_ASYNC', self.asynchronous)
+            self.queue_size = app.config.get('AUDIT_QUEUE_SIZE', self.queue_size)
+            self.batch_size = app.config.get('AUDIT_BATCH_SIZE', self.batch_size)
+            self.flush_interval = app.config.get('AUDIT_FLUSH_INTERVAL', self.flush_interval)
+            self.enqueue_timeout = app.config.get('AUDIT_ENQUEUE_TIMEOUT', self.enqueue_timeout)
+        self.shutdown()
+        if not self._listening:
+            event.listen(Session, 'before_flush', self._before_flush)
+            event.listen(Session, 'after_flush', self._after_flush)
+            event.listen(Session, 'after_commit', self._after_commit)
+            event.listen(Session, 'after_rollback', self._after_rollback)
+            atexit.register(self.shutdown)
+            self._listening = True
+
+    # =========================================================
+    # Public API
+    # =========================================================
+
+    def record(self, user_id, action_type, table_name, record_id, before_val=None, after_val=None):
+        """Queues one explicit entry (e.g. a login or an export) outside of any session."""
+        entry = _entry(action_type, table_name, record_id, before_val, after_val, user_id)
+        self.submit([entry])
+        return entry
+
+    def submit(self, entries):
+        """Hands entries to the writer; writes them in the calling thread when it is saturated."""
+        if not entries:
+            return
+        if not self.asynchronous:
+            self._write(entries)
+            return
+        entry_queue = self._ensure_worker()
+        deadline = time.monotonic() + self.enqueue_timeout
+        for index, entry in enumerate(entries):
+            try:
+                entry_queue.put(entry, timeout=max(deadline - time.monotonic(), 0))
+            except queue.Full:
+                with self._lock:
+                    self._backpressure += 1
+                self._write(entries[index:])
+                return
+        with self._lock:
+            self._peak_queued = max(self._peak_queued, entry_queue.qsize())
+
+    def flush(self):
+        """Blocks until every queued entry is written."""
+        with self._lock:
+            entry_queue = self._queue
+        if entry_queue is not None:
+            entry_queue.join()
+
+    def shutdown(self):
+        """Writes what is queued and stops the worker (registered with atexit)."""
+        with self._lock:
+            entry_queue, thread = self._queue, self._thread
+            self._queue, self._thread = None, None
+        if thread is not None:
+            entry_queue.put(_STOP)
+            thread.join(timeout=30)
+
+    def stats(self) -> dict:
+        """Returns queue-depth and throughput metrics for monitoring."""
+        with self._lock:
+            return {
+                "queued": self._queue.qsize() if self._queue is not None else 0,
+                "max_queue": self.queue_size,
+                "peak_queued": self._peak_queued,
+                "written": self._written,
+                "batches": self._batches,
+                "backpressure": self._backpressure,
+                "failed": self._failed,
+                "dropped_batches": self._dropped_batches,
+            }
+
+    # =========================================================
+    # Writer
+    # =========================================================
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None:
+                self._queue = queue.Queue(maxsize=self.queue_size)
+                self._thread = threading.Thread(target=self._run, args=(self._queue,),
+                                                name='goji-audit-writer', daemon=True)
+                self._thread.start()
+            return self._queue
+
+    def _run(self, entry_queue):
+        stopping = False
+        while not stopping:
+            try:
+                item = entry_queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch, received = [], 1
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = entry_queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                received += 1
+            while stopping:
+                # Writes what was queued after the stop marker as well
+                try:
+                    item = entry_queue.get_nowait()
+                except queue.Empty:
+                    break
+                received += 1
+                if item is not _STOP:
+                    batch.append(item)
+            try:
+                self._write(batch)
+            finally:
+                for _ in range(received):
+                    entry_queue.task_done()
+
+    def _write(self, entries):
+        if not entries:
+            return
+        try:
+            with self._app.app_context():
+                with db.engine.begin() as connection:
+                    for start in range(0, len(entries), self.batch_size):
+                        connection.execute(insert(AuditLog.__table__), entries[start:start + self.batch_size])
+            with self._lock:
+                self._written += len(entries)
+                self._batches += 1
+        except Exception:
+            # Audit logging failure should not crash the main application
+            self._app.logger.exception("Failed to write %d audit log entries", len(entries))
+            with self._lock:
+                self._failed += len(entries)
+                self._dropped_batches += 1
+
+    def _reset_metrics(self):
+        self._peak_queued = 0
+        self._written = 0
+        self._batches = 0
+        self._backpressure = 0
+        self._failed = 0
+        self._dropped_batches = 0
+
+    # =========================================================
+    # Session Event Handlers
+    # =========================================================
+
+    def _pending(self, session):
+        return session.info.setdefault(_PENDING_KEY, [])
+
+    def _before_flush(self, session, flush_context, instances):
+        if not self.enabled:
+            return
+        updates = []
+        unloaded = {}  # {table: {id: before}} of changes whose old value was never loaded
+        for obj in session.dirty:
+            if not isinstance(obj, AuditMixin):
+                continue
+            before, after = {}, {}
+            for attr in inspect(obj).attrs:
+                if attr.key in _UNAUDITED or attr.key not in obj.__table__.c:
+                    continue
+                history = attr.history
+                if history.added or history.deleted:
+                    before[attr.key] = history.deleted[0] if history.deleted else None
+                    after[attr.key] = history.added[0] if history.added else None
+                    if not history.deleted:
+                        unloaded.setdefault(obj.__table__, {})[obj.id] = before
+            if after:
+                updates.append((obj, before, after))
+        for table, befores in unloaded.items():
+            _load_before(session, table, befores)
+
+        entries = [_entry('UPDATE', obj.__tablename__, obj.id, before, after) for obj, before, after in updates]
+        entries.extend(_entry('DELETE', obj.__tablename__, obj.id, _loaded(obj), None)
+                       for obj in session.deleted if isinstance(obj, AuditMixin))
+        if entries:
+            self._pending(session).extend(entries)
+
+    def _after_flush(self, session, flush_context):
+        if not self.enabled:
+            return
+        created = [obj for obj in session.new if isinstance(obj, AuditMixin)]
+        if created:
+            self._pending(session).extend(
+                _entry('CREATE', obj.__tablename__, obj.id, None, _loaded(obj), obj.created_by_id) for obj in created
+            )
+
+    def _after_commit(self, session):
+        entries = session.info.pop(_PENDING_KEY, None)
+        if entries:
+            self.submit(entries)
+
+    def _after_rollback(self, session):
+        session.info.pop(_PENDING_KEY, None)
+
+
+def _load_before(session, table, befores):
+    """
+    Fills in old values that were expired when the attribute was set (e.g. after a commit),
+    with one 'IN (...)' query per IN_CHUNK_SIZE rows of the table.
+    """
+    ids = list(befores)
+    keys = sorted({key for before in befores.values() for key in before})
+    for start in range(0, len(ids), IN_CHUNK_SIZE):
+        query = select(table.c.id, *(table.c[key] for key in keys)).where(table.c.id.in_(ids[start:start + IN_CHUNK_SIZE]))
+        for row in session.connection().execute(query).mappings():
+            before = befores[row['id']]
+            for key in before:
+                if before[key] is None:
+                    before[key] = row[key]
+
+
+def _loaded(obj):
+    """Column values already loaded on 'obj' (never triggers a query)."""
+    state = inspect(obj)
+    return {column.key: state.dict[column.key] for column in obj.__table__.c if column.key in state.dict}
+
+
+def _entry(action_type, table_name, record_id, before_val, after_val, user_id=None):
+    """An AuditLog row as a dict; the user (unless given) and client address come from the current request."""
+    ip_address = None
+    if has_request_context():
+        ip_address = request.remote_addr
+        if user_id is None:
+            try:
+                user_id = int(get_jwt_identity())
+            except (RuntimeError, TypeError, ValueError):
+                user_id = None
+    return {
+        'user_id': user_id,
+        'action_type': action_type,
+        'table_name': table_name,
+        'record_id': record_id,
+        'before_value': _serialize(before_val),
+        'after_value': _serialize(after_val),
+        'ip_address': ip_address,
+        'timestamp': datetime.utcnow(),
+    }
+
+
+def _serialize(value):
+    if value is None or value == {}:
+        return None
+    if isinstance(value, dict):
+        return json.dumps(value, default=str, sort_keys=True)
+    return str(value)
+
+
+# Singleton instance
+audit_writer = AuditWriter()
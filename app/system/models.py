@@ -6,7 +6,17 @@ from datetime import datetime
 
 class AuditLog(ModelBase):
     """Stores a log of all significant create, update, delete actions."""
-    id = db.Column(db.BigInteger, primary_key=True)
+    __filterable__ = ('user_id', 'action_type', 'table_name', 'record_id', 'timestamp')
+    __sortable__ = ('timestamp',)
+    # Each lookup seeks on its own key and reads the keyset order (timestamp, id) off the index.
+    # Explicit names: the naming convention would exceed Oracle's 30 character limit.
+    __table_args__ = (
+        db.Index('ix_gj_audit_logs_ts', 'timestamp', 'id'),
+        db.Index('ix_gj_audit_logs_user_ts', 'user_id', 'timestamp', 'id'),
+        db.Index('ix_gj_audit_logs_action_ts', 'action_type', 'timestamp', 'id'),
+        db.Index('ix_gj_audit_logs_record_ts', 'table_name', 'record_id', 'timestamp', 'id'),
+    )
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)  # SQLite only autoincrements INTEGER keys
     user_id = db.Column(db.Integer, db.ForeignKey('gj_users.id'))
     action_type = db.Column(db.String(50), nullable=False) # e.g., 'CREATE', 'UPDATE', 'DELETE'
     table_name = db.Column(db.String(100))
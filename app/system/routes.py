@@ -2,6 +2,7 @@
 
 from flask import Blueprint, jsonify
 from .services import system_service
+from ..utils.pagination import page_request, paginated_response
 from .schemas import AuditLogSchema
 from flask_jwt_extended import jwt_required
 
@@ -17,14 +18,32 @@ audit_logs_schema = AuditLogSchema(many=True)
 @jwt_required()
 @permission_required('admin:all') # Strict permission: only super admin can view logs
 def get_audit_logs():
-    """Get all system audit logs."""
-    logs = system_service.get_all_audit_logs()
-    return jsonify(audit_logs_schema.dump(logs))
+    """
+    Get system audit logs, newest first.
+    Narrow with indexed filters, e.g. '?filter=timestamp:gte:2025-01-01&filter=action_type:DELETE'.
+    """
+    logs = system_service.get_all_audit_logs(page=page_request())
+    return paginated_response(audit_logs_schema, logs)
 
 @bp.route('/audit-logs/user/<int:user_id>', methods=['GET'])
 @jwt_required()
 @permission_required('admin:all')
 def get_user_audit_logs(user_id):
     """Get audit logs for a specific user."""
-    logs = system_service.get_audit_logs_by_user(user_id)
-    return jsonify(audit_logs_schema.dump(logs))
\ No newline at end of file
+    logs = system_service.get_audit_logs_by_user(user_id, page=page_request())
+    return paginated_response(audit_logs_schema, logs)
+
+@bp.route('/audit-logs/record/<table_name>/<int:record_id>', methods=['GET'])
+@jwt_required()
+@permission_required('admin:all')
+def get_record_audit_logs(table_name, record_id):
+    """Get the change history of a single row (e.g. /audit-logs/record/gj_customers/42)."""
+    logs = system_service.get_audit_logs_by_record(table_name, record_id, page=page_request())
+    return paginated_response(audit_logs_schema, logs)
+
+@bp.route('/metrics', methods=['GET'])
+@jwt_required()
+@permission_required('admin:all')
+def get_runtime_metrics():
+    """Get in-process cache and worker-pool metrics of this worker."""
+    return jsonify(system_service.get_runtime_metrics())
\ No newline at end of file
@@ -1,10 +1,36 @@
 # goji/app/system/services.py
 
+from datetime import datetime
+from sqlalchemy import Column, Index, MetaData, Table, delete, func, insert, inspect, select
 from ..extensions import db
+from .audit import audit_writer
 from .models import AuditLog
 from .schemas import AuditLogSchema
-from marshmallow import ValidationError
-from datetime import datetime
+from ..utils.pagination import paginate
+
+# Large snapshot columns, only selected on list endpoints when requested via '?fields='
+AUDIT_LOG_DEFERRED = ('before_value', 'after_value')
+
+
+def _month_start(moment):
+    return datetime(moment.year, moment.month, 1)
+
+
+def _next_month(month):
+    return datetime(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def archive_table(month):
+    """
+    The archive table of one month, 'gj_audit_logs_YYYYMM': the audit log columns without
+    foreign keys (archived rows outlive their users) and with a timestamp index.
+    """
+    name = f"{AuditLog.__tablename__}_{month:%Y%m}"
+    columns = [Column(column.name, column.type, primary_key=column.primary_key,
+                      nullable=column.nullable, autoincrement=False)
+               for column in AuditLog.__table__.columns]
+    return Table(name, MetaData(), *columns, Index(f'ix_{name}_ts', 'timestamp'))
+
 
 class SystemService:
     """
@@ -14,37 +40,83 @@ class SystemService:
     def __init__(self):
         self.audit_log_schema = AuditLogSchema()
 
-    def get_all_audit_logs(self):
-        """Retrieves all audit logs, ordered by timestamp desc."""
-        return AuditLog.query.order_by(AuditLog.timestamp.desc()).all()
+    def get_all_audit_logs(self, page=None):
+        """Retrieves audit logs, newest first (keyset on timestamp, id)."""
+        return paginate(AuditLog.query, page, (AuditLog.timestamp, AuditLog.id), descending=True,
+                        deferred=AUDIT_LOG_DEFERRED)
+
+    def get_audit_logs_by_user(self, user_id, page=None):
+        """Retrieves audit logs for a specific user, newest first."""
+        query = AuditLog.query.filter_by(user_id=user_id)
+        return paginate(query, page, (AuditLog.timestamp, AuditLog.id), descending=True,
+                        deferred=AUDIT_LOG_DEFERRED)
+
+    def get_audit_logs_by_record(self, table_name, record_id, page=None):
+        """Retrieves the history of one row (e.g. 'gj_customers', 42), newest first."""
+        query = AuditLog.query.filter_by(table_name=table_name, record_id=record_id)
+        return paginate(query, page, (AuditLog.timestamp, AuditLog.id), descending=True,
+                        deferred=AUDIT_LOG_DEFERRED)
+
+    def archive_audit_logs(self, before: datetime, dry_run=False):
+        """
+        Moves audit log rows older than 'before' into monthly archive tables
+        ('gj_audit_logs_YYYYMM', created on demand), so the hot table only keeps
+        the retention window.
+
+        Each month is moved with one 'INSERT ... SELECT' and one 'DELETE' over the same
+        timestamp range (served by the timestamp index) and committed on its own, so an
+        interrupted run leaves every month either moved or untouched.
+        Returns:
+            list: [{'table': archive table name, 'rows': rows moved}, ...] per month.
+        """
+        source = AuditLog.__table__
+        oldest = db.session.execute(select(func.min(source.c.timestamp)).where(source.c.timestamp < before)).scalar()
+        if oldest is None:
+            return []
+
+        moved = []
+        month = _month_start(oldest)
+        while month < before:
+            until = min(_next_month(month), before)
+            in_range = (source.c.timestamp >= month) & (source.c.timestamp < until)
+            archive = archive_table(month)
+            if dry_run:
+                rows = db.session.execute(select(func.count()).select_from(source).where(in_range)).scalar()
+            else:
+                try:
+                    if not inspect(db.session.connection()).has_table(archive.name):
+                        archive.create(db.session.connection())
+                    names = [column.name for column in source.columns]
+                    db.session.execute(insert(archive).from_select(names, select(*source.columns).where(in_range)))
+                    rows = db.session.execute(delete(source).where(in_range)).rowcount
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    raise
+            if rows:
+                moved.append({"table": archive.name, "rows": rows})
+            month = _next_month(month)
+        return moved
 
-    def get_audit_logs_by_user(self, user_id):
-        """Retrieves audit logs for a specific user."""
-        return AuditLog.query.filter_by(user_id=user_id).order_by(AuditLog.timestamp.desc()).all()
+    def get_runtime_metrics(self):
+        """Collects in-process cache and worker-pool counters for monitoring."""
+        from ..user_management.permissions import permission_cache
+        from ..user_management.passwords import password_verifier
+        from ..utils.query_cache import query_cache
+        return {
+            "permission_cache": permission_cache.stats(),
+            "password_pool": password_verifier.stats(),
+            "query_cache": query_cache.stats(),
+            "audit_writer": audit_writer.stats(),
+        }
 
     def log_action(self, user_id, action_type, table_name, record_id, before_val=None, after_val=None):
         """
-        Records a system action. 
+        Records a system action that is not a row change (those are captured automatically).
         This method is intended to be called by other Services, not via API.
+        The entry is written by the background audit writer; the caller's session is untouched.
         """
-        try:
-            log_entry = AuditLog(
-                user_id=user_id,
-                action_type=action_type,
-                table_name=table_name,
-                record_id=record_id,
-                before_value=str(before_val) if before_val else None,
-                after_value=str(after_val) if after_val else None,
-                timestamp=datetime.utcnow()
-            )
-            db.session.add(log_entry)
-            db.session.commit()
-            return log_entry
-        except Exception as e:
-            # Audit logging failure should not crash the main application
-            print(f"Failed to create audit log: {e}")
-            db.session.rollback()
-            return None
+        return audit_writer.record(user_id, action_type, table_name, record_id, before_val, after_val)
 
 # Singleton instance
 system_service = SystemService()
\ No newline at end of file
@@ -4,5 +4,5 @@
 # It also exposes the module's key components, like the Blueprint and primary models,
 # to make them easily importable from other parts of the application.
 
-from .models import User, Role, Permission, Menu, user_roles, role_permissions, PasswordResetToken
+from .models import User, Role, Permission, Menu, user_roles, role_permissions, PasswordResetToken, RevokedToken
 from .schemas import UserSchema, RoleSchema, RoleSimpleSchema, PermissionSchema, MenuSchema, PasswordResetTokenSchema
@@ -2,6 +2,7 @@
 from ..extensions import db, bcrypt
 from datetime import datetime, timedelta
 from ..models import ModelBase, TimestampMixin
+from .passwords import hash_cost
 
 # --- Association Tables ---
 
@@ -28,12 +29,16 @@ role_permissions = db.Table('gj_role_permissions',
 # --- Main Models ---
 
 class User(ModelBase, TimestampMixin):
+    __filterable__ = ('username', 'email', 'is_active')
+    __sortable__ = ('username',)
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     password_hash = db.Column(db.String(128), nullable=False)
     full_name = db.Column(db.String(120))
     email = db.Column(db.String(120), unique=True)
     is_active = db.Column(db.Boolean, default=True, nullable=False)
+    # Tokens issued before this moment are rejected (set on deactivation / password reset)
+    tokens_valid_after = db.Column(db.DateTime, nullable=True)
     
     roles = db.relationship(
         'Role',
@@ -48,6 +53,10 @@ class User(ModelBase, TimestampMixin):
     def check_password(self, password):
         return bcrypt.check_password_hash(self.password_hash, password)
 
+    def password_needs_rehash(self, log_rounds):
+        """True when the stored hash was generated with a different bcrypt cost."""
+        return hash_cost(self.password_hash) != log_rounds
+
 class Role(ModelBase, TimestampMixin):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(80), unique=True, nullable=False)
@@ -93,4 +102,13 @@ class PasswordResetToken(ModelBase):
 
     def is_expired(self):
         """Checks if the token has expired."""
-        return datetime.utcnow() > self.expiration_date
\ No newline at end of file
+        return datetime.utcnow() > self.expiration_date
+
+
+class RevokedToken(ModelBase):
+    """Denylist entry for an access token revoked before its natural expiry (e.g. logout)."""
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), nullable=False, unique=True, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('gj_users.id'), nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,152 @@
+# goji/app/user_management/passwords.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from ..extensions import bcrypt
+
+
+class PasswordPoolBusy(RuntimeError):
+    """Raised when the verification queue is full and the request should be retried later."""
+
+
+class PasswordVerifier:
+    """
+    Runs bcrypt verifications (and re-hashes) on a small, bounded worker pool.
+
+    bcrypt releases the GIL while hashing, so a pool sized to the CPU count keeps
+    every core busy while request threads simply wait on the result. At most
+    'pool_size + max_queue' verifications may be pending; anything beyond that is
+    rejected immediately with PasswordPoolBusy instead of piling up request threads.
+    """
+
+    def __init__(self):
+        self.pool_size = 4
+        self.max_queue = 64
+        self.timeout = 10
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self._reset_metrics()
+
+    def init_app(self, app):
+        with self._lock:
+            self.pool_size = app.config.get('PASSWORD_POOL_SIZE', self.pool_size)
+            self.max_queue = app.config.get('PASSWORD_POOL_MAX_QUEUE', self.max_queue)
+            self.timeout = app.config.get('PASSWORD_VERIFY_TIMEOUT', self.timeout)
+            self._shutdown()
+
+    def configure(self, pool_size=None, max_queue=None):
+        """Re-sizes the pool at runtime (used by the login benchmark)."""
+        with self._lock:
+            if pool_size is not None:
+                self.pool_size = pool_size
+            if max_queue is not None:
+                self.max_queue = max_queue
+            self._shutdown()
+            self._reset_metrics()
+
+    def verify(self, password_hash, password) -> bool:
+        """
+        Checks a password against a bcrypt hash on the worker pool.
+        Raises:
+            PasswordPoolBusy: if the pool and its queue are saturated, or the check
+                does not finish within PASSWORD_VERIFY_TIMEOUT.
+        """
+        return self._run(bcrypt.check_password_hash, password_hash, password)
+
+    def hash(self, password, log_rounds) -> str:
+        """
+        Hashes a password with the given bcrypt cost on the worker pool.
+        Raises:
+            PasswordPoolBusy: as for 'verify'.
+        """
+        return self._run(lambda: bcrypt.generate_password_hash(password, log_rounds).decode('utf-8'))
+
+    def _run(self, function, *args):
+        executor, slots = self._ensure_pool()
+        if not slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise PasswordPoolBusy("Too many concurrent login attempts, please retry")
+
+        with self._lock:
+            self._queued += 1
+            self._peak_queued = max(self._peak_queued, self._queued)
+        submitted_at = time.monotonic()
+
+        def task():
+            started_at = time.monotonic()
+            with self._lock:
+                self._queued -= 1
+                self._in_flight += 1
+                self._wait_sec += started_at - submitted_at
+            try:
+                return function(*args)
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+                    self._completed += 1
+                    self._busy_sec += time.monotonic() - started_at
+                slots.release()
+
+        try:
+            return executor.submit(task).result(timeout=self.timeout)
+        except FutureTimeout:
+            # The task keeps its slot until it finishes, so the backlog stays bounded.
+            with self._lock:
+                self._timed_out += 1
+            raise PasswordPoolBusy("Password verification timed out, please retry")
+
+    def stats(self) -> dict:
+        """Returns queue-depth and throughput metrics for monitoring."""
+        with self._lock:
+            completed = self._completed
+            return {
+                "pool_size": self.pool_size,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "queued": self._queued,
+                "peak_queued": self._peak_queued,
+                "completed": completed,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                "avg_wait_ms": round(self._wait_sec * 1000 / completed, 2) if completed else 0.0,
+                "avg_hash_ms": round(self._busy_sec * 1000 / completed, 2) if completed else 0.0,
+            }
+
+    def _ensure_pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix='goji-bcrypt')
+                self._slots = threading.BoundedSemaphore(self.pool_size + self.max_queue)
+            return self._executor, self._slots
+
+    def _shutdown(self):
+        # Caller must hold the lock.
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._executor = None
+        self._slots = None
+
+    def _reset_metrics(self):
+        self._in_flight = 0
+        self._queued = 0
+        self._peak_queued = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._wait_sec = 0.0
+        self._busy_sec = 0.0
+
+
+def hash_cost(password_hash):
+    """Extracts the bcrypt cost factor from a '$2b$<cost>$...' hash, or None if unparsable."""
+    try:
+        return int(password_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+# Singleton instance
+password_verifier = PasswordVerifier()
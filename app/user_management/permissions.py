@@ -0,0 +1,239 @@
+# goji/app/user_management/permissions.py
+
+import hashlib
+import time
+from collections import namedtuple
+from flask import current_app
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+from ..extensions import db
+from ..utils import LRUCache, table_versions
+from .models import User, Role, Permission, user_roles, role_permissions
+
+# Tables whose changes can alter any user's effective permission set.
+# gj_users is left out on purpose: logins rehash passwords, revocations stamp
+# 'tokens_valid_after' and registrations insert rows, none of which changes a grant.
+# Changes to one user's own row are invalidated per user instead (see _after_flush).
+PERMISSION_TABLES = ('gj_roles', 'gj_permissions', 'gj_user_roles', 'gj_role_permissions')
+# User columns / relationships whose change drops that user's cache entry
+USER_PERMISSION_ATTRS = ('is_active', 'roles')
+_PENDING_KEY = '_goji_pending_permission_users'
+
+ADMIN_PERMISSION = 'admin:all'
+
+# Compact JWT claim names used when permissions are embedded in access tokens.
+PERMS_CLAIM = 'perms'
+EPOCH_CLAIM = 'pv'
+
+
+class EffectivePermissions(namedtuple('EffectivePermissions', ['user_id', 'ids', 'names'])):
+    """Immutable snapshot of the permissions a user holds through all of their roles."""
+    __slots__ = ()
+
+    @property
+    def is_admin(self):
+        return ADMIN_PERMISSION in self.names
+
+    def allows(self, permission_name):
+        return self.is_admin or permission_name in self.names
+
+
+class PermissionCache:
+    """
+    In-process LRU/TTL cache of each user's effective permission set.
+
+    Every entry remembers the version of the permission tables it was built
+    from; any write to roles, permissions or their association tables bumps
+    that version (see 'table_versions'), so a stale entry is reloaded on its
+    next lookup instead of being served. A user whose own 'is_active' or roles
+    change, or who is deleted, only loses their own entry.
+    """
+
+    def __init__(self):
+        self._cache = LRUCache(maxsize=4096, ttl=300)
+        self._epoch = (None, 0.0, None)  # (local table version, loaded at, epoch)
+        self._epoch_ttl = 30
+        self._names_by_id = (None, {})
+        self._listening = False
+
+    def init_app(self, app):
+        self._cache.configure(
+            maxsize=app.config.get('PERMISSION_CACHE_SIZE'),
+            ttl=app.config.get('PERMISSION_CACHE_TTL'),
+        )
+        self._epoch_ttl = app.config.get('PERMISSION_EPOCH_TTL', self._epoch_ttl)
+        self._epoch = (None, 0.0, None)
+        if not self._listening:
+            event.listen(Session, 'after_flush', self._after_flush)
+            event.listen(Session, 'after_commit', self._after_commit)
+            event.listen(Session, 'after_rollback', self._after_commit)
+            self._listening = True
+
+    @property
+    def version(self):
+        return table_versions.snapshot(*PERMISSION_TABLES)
+
+    @property
+    def epoch(self):
+        """
+        The compact permission epoch stored in tokens. It is derived from the rows
+        of the permission tables, so every worker (and a restarted one) computes the
+        same value for the same grants. Reloaded when this process writes to those
+        tables, and at least every PERMISSION_EPOCH_TTL seconds for other workers' writes.
+        """
+        version = self.version
+        cached_version, loaded_at, epoch = self._epoch
+        if cached_version != version or time.monotonic() - loaded_at > self._epoch_ttl:
+            epoch = self._load_epoch()
+            self._epoch = (version, time.monotonic(), epoch)
+        return epoch
+
+    def get(self, user_id):
+        """
+        Returns the EffectivePermissions for a user, or None if the user does not exist.
+        A warm cache answers without touching the database.
+        """
+        return self._get_versioned(user_id)[1]
+
+    def build_claims(self, user_id):
+        """
+        Returns the additional JWT claims that let later requests authorize from
+        the token alone: the sorted permission id list and the permission epoch.
+        """
+        # Read the epoch *before* the permissions, so a write racing the load
+        # leaves the token outdated rather than silently current.
+        epoch = self.epoch
+        permissions = self.get(user_id)
+        if permissions is None:
+            return {}
+        return {
+            PERMS_CLAIM: sorted(permissions.ids),
+            EPOCH_CLAIM: epoch,
+        }
+
+    def from_claims(self, user_id, claims):
+        """
+        Rebuilds EffectivePermissions from token claims.
+        Returns None when the token carries no permissions or its epoch is stale,
+        in which case the caller must fall back to 'get()'.
+        """
+        perm_ids = claims.get(PERMS_CLAIM)
+        if perm_ids is None or claims.get(EPOCH_CLAIM) != self.epoch:
+            return None
+
+        names_by_id = self._permission_names()
+        ids = frozenset(perm_ids)
+        names = frozenset(names_by_id[perm_id] for perm_id in ids if perm_id in names_by_id)
+        return EffectivePermissions(int(user_id), ids, names)
+
+    def _get_versioned(self, user_id):
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return None, None
+
+        # Read the version *before* loading, so a write racing the load
+        # leaves the entry outdated rather than silently current.
+        version = self.version
+        entry = self._cache.get(user_id)
+        if entry is not None and entry[0] == version:
+            return entry
+
+        permissions = self._load(user_id)
+        if permissions is not None:
+            self._cache.set(user_id, (version, permissions))
+        return version, permissions
+
+    def _permission_names(self):
+        """Maps permission ids to names; reloaded only when the permission tables change."""
+        version = self.version
+        cached_version, names_by_id = self._names_by_id
+        if cached_version != version:
+            names_by_id = dict(db.session.query(Permission.id, Permission.name).all())
+            self._names_by_id = (version, names_by_id)
+        return names_by_id
+
+    def invalidate(self, user_id=None):
+        """Drops one user's entry, or the whole cache when no user is given."""
+        if user_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(int(user_id))
+
+    def stats(self):
+        return self._cache.stats()
+
+    # =========================================================
+    # Session Event Handlers
+    # =========================================================
+
+    def _after_flush(self, session, flush_context):
+        user_ids = {obj.id for obj in session.deleted if isinstance(obj, User)}
+        for obj in session.dirty:
+            if isinstance(obj, User):
+                state = inspect(obj)
+                if any(state.attrs[key].history.has_changes() for key in USER_PERMISSION_ATTRS):
+                    user_ids.add(obj.id)
+        if not user_ids:
+            return
+        # Drop right away, and again once the transaction ends, so an entry reloaded
+        # by another session while the change was uncommitted is not kept.
+        for user_id in user_ids:
+            self.invalidate(user_id)
+        session.info.setdefault(_PENDING_KEY, set()).update(user_ids)
+
+    def _after_commit(self, session):
+        for user_id in session.info.pop(_PENDING_KEY, ()):
+            self.invalidate(user_id)
+
+    def _load_epoch(self):
+        """
+        Fingerprints the permission tables in one round trip: row count, highest id and
+        latest timestamp of each. Any grant or revocation changes one of them (deleting a
+        row lowers the count, inserting one raises the latest 'created_at').
+        """
+        columns = []
+        for table, stamp in ((Role.__table__, 'updated_at'), (Permission.__table__, 'updated_at'),
+                             (user_roles, 'created_at'), (role_permissions, 'created_at')):
+            columns += [select(func.count()).select_from(table).scalar_subquery(),
+                        select(func.max(table.c.id)).scalar_subquery(),
+                        select(func.max(table.c[stamp])).scalar_subquery()]
+        row = db.session.execute(select(*columns)).one()
+        return hashlib.sha1(repr(tuple(row)).encode()).hexdigest()[:12]
+
+    def _load(self, user_id):
+        """Resolves user -> roles -> permissions in a single round trip."""
+        rows = (
+            db.session.query(User.id, Permission.id, Permission.name)
+            .outerjoin(user_roles, user_roles.c.user_id == User.id)
+            .outerjoin(role_permissions, role_permissions.c.role_id == user_roles.c.role_id)
+            .outerjoin(Permission, Permission.id == role_permissions.c.permission_id)
+            .filter(User.id == user_id)
+            .all()
+        )
+        if not rows:
+            return None
+
+        ids = frozenset(perm_id for _, perm_id, _ in rows if perm_id is not None)
+        names = frozenset(name for _, _, name in rows if name is not None)
+        return EffectivePermissions(user_id, ids, names)
+
+
+# Singleton instance
+permission_cache = PermissionCache()
+
+
+def current_permissions():
+    """
+    Resolves the effective permissions of the current JWT identity.
+    Uses the token's embedded claims when their epoch is current, and falls
+    back to the (cached) database lookup otherwise.
+    Must be called inside a request protected by @jwt_required().
+    """
+    user_id = get_jwt_identity()
+    if current_app.config.get('JWT_PERMISSION_CLAIMS'):
+        permissions = permission_cache.from_claims(user_id, get_jwt())
+        if permissions is not None:
+            return permissions
+    return permission_cache.get(user_id)
@@ -7,14 +7,14 @@ from functools import wraps
 
 # --- Service Layer Imports ---
 from .services import user_service, role_service, menu_service
+from ..utils.pagination import page_request, paginated_response
+from .permissions import current_permissions
 
 # --- Model & Schema Imports ---
-from .models import User
 from .schemas import (
     UserSchema, 
     RoleSchema, 
-    PermissionSchema, 
-    MenuSchema
+    PermissionSchema
 )
 
 bp = Blueprint('users', __name__, url_prefix='/api')
@@ -33,19 +33,17 @@ permissions_schema = PermissionSchema(many=True)
 def permission_required(permission_name):
     """
     Custom decorator to check permissions.
+    The effective permission set comes from the token claims or the permission
+    cache, so a warm guarded endpoint does not hit the database at all.
     """
     def decorator(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            current_user_id = get_jwt_identity()
-            # We query User directly here for efficiency in the decorator
-            user = User.query.get(current_user_id)
-            if not user:
+            user_permissions = current_permissions()
+            if user_permissions is None:
                 return jsonify({"msg": "User not found"}), 404
             
-            user_permissions = {perm.name for role in user.roles for perm in role.permissions}
-            
-            if 'admin:all' in user_permissions or permission_name in user_permissions:
+            if user_permissions.allows(permission_name):
                 return fn(*args, **kwargs)
             else:
                 return jsonify({"msg": "Forbidden: You don't have the required permission"}), 403
@@ -61,8 +59,8 @@ def permission_required(permission_name):
 @jwt_required()
 @permission_required('user:manage')
 def get_users():
-    users = user_service.get_all_users()
-    return jsonify(users_schema.dump(users))
+    users = user_service.get_all_users(page=page_request())
+    return paginated_response(users_schema, users)
 
 @bp.route("/users/<int:user_id>", methods=["GET"])
 @jwt_required()
@@ -120,8 +118,8 @@ def delete_user(user_id):
 @jwt_required()
 @permission_required('user:manage')
 def get_roles():
-    roles = role_service.get_all_roles()
-    return jsonify(roles_schema.dump(roles))
+    roles = role_service.get_all_roles(page=page_request())
+    return paginated_response(roles_schema, roles)
 
 @bp.route("/roles/<int:role_id>", methods=["GET"])
 @jwt_required()
@@ -164,8 +162,8 @@ def update_role(role_id):
 @jwt_required()
 @permission_required('user:manage')
 def get_permissions():
-    permissions = role_service.get_all_permissions()
-    return jsonify(permissions_schema.dump(permissions))
+    permissions = role_service.get_all_permissions(page=page_request())
+    return paginated_response(permissions_schema, permissions)
 
 
 # =============================================
@@ -178,13 +176,10 @@ def get_menus():
     """Get the menu tree accessible to the current user."""
     current_user_id = get_jwt_identity()
     
-    # Delegate logic to Service
-    menus, context = menu_service.get_menu_tree_context(current_user_id)
+    # Delegate logic to Service (single query + cached, already serialized tree)
+    menus = menu_service.get_menu_tree(current_user_id, current_permissions())
     
     if menus is None:
         return jsonify({"msg": "User not found"}), 404
 
-    # Inject context into Schema for recursive filtering
-    schema = MenuSchema(many=True, context=context)
-    
-    return jsonify(schema.dump(menus))
\ No newline at end of file
+    return jsonify(menus)
\ No newline at end of file
@@ -57,34 +57,13 @@ class UserSchema(ma.SQLAlchemyAutoSchema):
         return user
 
 class MenuSchema(ma.SQLAlchemyAutoSchema):
-    """Schema for Menu, handling recursive children for tree structures."""
+    """Schema for a single Menu row; MenuService nests the rows into the tree."""
     required_permission = ma.Nested(PermissionSchema, dump_only=True)
-    # This field will call the 'get_accessible_children' method below.
-    children = fields.Method("get_accessible_children")
 
     class Meta:
         model = Menu
         load_instance = True
 
-    
-    def get_accessible_children(self, menu_obj):
-        """
-        This method is called by the 'children' field. It filters the children
-        based on permissions passed in the schema's context.
-        """
-        # Get the permission check function from the context
-        can_access = self.context.get('can_access')
-        if not can_access:
-            return []
-
-        accessible_children = []
-        for child in menu_obj.children:
-            if can_access(child):
-                accessible_children.append(child)
-        
-        # Serialize the filtered children using the same schema instance
-        return MenuSchema(many=True, context=self.context).dump(accessible_children)
-    
 
 class PasswordResetTokenSchema(ma.SQLAlchemyAutoSchema):
     """Schema for the PasswordResetToken model."""
@@ -0,0 +1,125 @@
+# goji/app/user_management/scope.py
+
+from collections import namedtuple
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
+from ..extensions import db
+from ..utils import LRUCache, table_versions
+from ..organization.models import Plant, FactoryCluster
+from .models import user_roles
+from .permissions import permission_cache, PERMISSION_TABLES
+
+# Tables whose changes can alter a user's data scope.
+SCOPE_TABLES = PERMISSION_TABLES + ('gj_plants', 'gj_factory_clusters')
+
+
+class DataScope(namedtuple('DataScope', ['plant_ids', 'bu_ids'])):
+    """
+    The plants and business units a user may see.
+    'None' for both means unrestricted (admin or a role assigned without scope).
+    """
+    __slots__ = ()
+
+    @property
+    def is_unrestricted(self):
+        return self.plant_ids is None
+
+
+UNRESTRICTED = DataScope(None, None)
+
+
+class DataScopeResolver:
+    """
+    Computes a user's allowed plant/BU ids from the 'plant_id'/'bu_id' scope
+    columns of gj_user_roles, once per token (cached by JWT 'jti').
+
+    Scoping rules:
+        * 'admin:all' or any role assignment without plant/BU -> unrestricted.
+        * A BU-scoped assignment grants every plant of that BU's factory clusters.
+        * A plant-scoped assignment grants that plant (and its BU for BU-level data).
+        * A user without any role assignment sees nothing.
+    """
+
+    def __init__(self):
+        self._cache = LRUCache(maxsize=4096, ttl=300)
+
+    def init_app(self, app):
+        self._cache.configure(
+            maxsize=app.config.get('PERMISSION_CACHE_SIZE'),
+            ttl=app.config.get('PERMISSION_CACHE_TTL'),
+        )
+
+    def resolve(self, user_id, cache_key=None):
+        version = table_versions.snapshot(*SCOPE_TABLES)
+        key = cache_key or user_id
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        scope = self._load(user_id)
+        self._cache.set(key, (version, scope))
+        return scope
+
+    def _load(self, user_id):
+        permissions = permission_cache.get(user_id)
+        if permissions is not None and permissions.is_admin:
+            return UNRESTRICTED
+
+        assignments = (
+            db.session.query(user_roles.c.plant_id, user_roles.c.bu_id)
+            .filter(user_roles.c.user_id == int(user_id))
+            .all()
+        )
+        if any(plant_id is None and bu_id is None for plant_id, bu_id in assignments):
+            return UNRESTRICTED
+
+        plant_ids = {plant_id for plant_id, _ in assignments if plant_id is not None}
+        bu_ids = {bu_id for _, bu_id in assignments if bu_id is not None}
+
+        # Expand BUs to their plants and plants to their BUs in one round trip
+        if plant_ids or bu_ids:
+            rows = (
+                db.session.query(Plant.id, FactoryCluster.bu_id)
+                .join(FactoryCluster, Plant.cluster_id == FactoryCluster.id)
+                .filter(db.or_(Plant.id.in_(tuple(plant_ids)), FactoryCluster.bu_id.in_(tuple(bu_ids))))
+                .all()
+            )
+            for plant_id, bu_id in rows:
+                if bu_id in bu_ids:
+                    plant_ids.add(plant_id)
+                if plant_id in plant_ids:
+                    bu_ids.add(bu_id)
+
+        return DataScope(frozenset(plant_ids), frozenset(bu_ids))
+
+
+# Singleton instance
+scope_resolver = DataScopeResolver()
+
+
+def current_data_scope():
+    """
+    Returns the DataScope of the current request's JWT identity.
+    Scoped endpoints must be protected by @jwt_required(); a request without a
+    valid token fails closed (401) instead of being served unscoped.
+    """
+    verify_jwt_in_request()
+    return scope_resolver.resolve(get_jwt_identity(), cache_key=get_jwt().get('jti'))
+
+
+def apply_scope(query, scope, plant_column=None, bu_column=None):
+    """
+    Pushes a DataScope into a query's WHERE clause.
+
+    Args:
+        query: The SQLAlchemy query to restrict.
+        scope (DataScope): The scope to apply; None or unrestricted leaves the query untouched.
+        plant_column: Column holding a plant id (e.g. WorkCenter.plant_id, Plant.id).
+        bu_column: Column holding a business unit id (e.g. FactoryCluster.bu_id).
+    """
+    if scope is None or scope.is_unrestricted:
+        return query
+    if plant_column is not None:
+        query = query.filter(plant_column.in_(tuple(scope.plant_ids)))
+    if bu_column is not None:
+        query = query.filter(bu_column.in_(tuple(scope.bu_ids)))
+    return query
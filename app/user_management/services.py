@@ -1,10 +1,23 @@
 # goji/app/user_management/services.py
 
+from collections import defaultdict, namedtuple
+from sqlalchemy.orm import joinedload
 from ..extensions import db
+from ..utils import LRUCache, table_versions
+from ..utils.pagination import paginate
+from ..utils.query_cache import cached
 from .models import User, Role, Permission, Menu
-from .schemas import UserSchema, RoleSchema
+from .schemas import UserSchema, RoleSchema, MenuSchema
+from .permissions import permission_cache
+from ..apis.revocation import revocation_list
 from marshmallow import ValidationError
 
+# Tables whose changes alter the serialized menu tree.
+MENU_TABLES = ('gj_menus', 'gj_permissions')
+
+# Plain snapshot of a menu row, safe to keep across requests and sessions.
+MenuNode = namedtuple('MenuNode', ['id', 'parent_id', 'required_permission_id', 'data'])
+
 # =========================================================
 # User Service (Existing)
 # =========================================================
@@ -17,9 +30,9 @@ class UserService:
         self.user_schema = UserSchema()
         self.user_schema_partial = UserSchema(partial=True) 
 
-    def get_all_users(self):
+    def get_all_users(self, page=None):
         """Retrieves all users."""
-        return User.query.all()
+        return paginate(User.query, page, User.id)
 
     def get_user_by_id(self, user_id):
         """Retrieves a single user or raises 404."""
@@ -48,12 +61,25 @@ class UserService:
         """Handles user updates."""
         user = self.get_user_by_id(user_id)
         try:
+            was_active = user.is_active
             role_ids = data.get('role_ids')
-            updated_user = self.user_schema_partial.load(data, instance=user)
+            # UserSchema builds a fresh (transient) User in @post_load, so copy
+            # the validated fields onto the persistent instance.
+            loaded = self.user_schema_partial.load(data)
+            for field in data:
+                if field == 'password':
+                    user.password_hash = loaded.password_hash
+                elif field not in ('id', 'role_ids') and hasattr(loaded, field):
+                    setattr(user, field, getattr(loaded, field))
+            updated_user = user
 
             if role_ids is not None:
                 updated_user.roles = Role.query.filter(Role.id.in_(role_ids)).all()
 
+            # Deactivation invalidates every token the user already holds
+            if was_active and not updated_user.is_active:
+                revocation_list.revoke_user_tokens(updated_user, commit=False)
+
             db.session.commit()
             return updated_user
         except ValidationError as err:
@@ -84,9 +110,9 @@ class RoleService:
         self.role_schema = RoleSchema()
         self.role_schema_partial = RoleSchema(partial=True)
 
-    def get_all_roles(self):
+    def get_all_roles(self, page=None):
         """Retrieves all roles."""
-        return Role.query.all()
+        return paginate(Role.query, page, Role.id)
 
     def get_role_by_id(self, role_id):
         """Retrieves a single role or raises 404."""
@@ -134,9 +160,9 @@ class RoleService:
             db.session.rollback()
             raise e
 
-    def get_all_permissions(self):
+    def get_all_permissions(self, page=None):
         """Retrieves all available system permissions."""
-        return Permission.query.all()
+        return paginate(cached(Permission.query), page, Permission.id)
 
 
 # =========================================================
@@ -147,49 +173,87 @@ class MenuService:
     Encapsulates logic for menu retrieval and permission filtering.
     """
 
+    def __init__(self):
+        # Flat node serializer: the tree is assembled by the service, not the schema.
+        self.menu_node_schema = MenuSchema(many=True)
+        self._nodes = (None, [])
+        self._tree_cache = LRUCache(maxsize=256, ttl=300)
+
     @staticmethod
     def can_access(menu, is_admin, user_permission_ids):
         """
-        Static logic to determine if a menu item is accessible.
-        Used by the Schema context during serialization.
+        Static logic to determine if a menu item (or MenuNode) is accessible.
         """
         if is_admin:
             return True
         return menu.required_permission_id is None or menu.required_permission_id in user_permission_ids
 
-    def get_menu_tree_context(self, user_id):
+    def get_menu_tree(self, user_id, permissions=None):
         """
-        Prepares the menu data and the permission context for a specific user.
-        
+        Builds the serialized menu tree accessible to a specific user.
+        'permissions' may be passed in when the caller already resolved them
+        (e.g. from token claims) to skip the lookup.
+
+        All menus are fetched in a single query and the tree is assembled in memory.
+        The serialized tree is cached per permission fingerprint and menu version,
+        so users sharing a role share one cache entry.
+
         Returns:
-            tuple: (top_level_menus, context_dictionary)
+            list: serialized top-level menus with nested 'children', or None if the user does not exist.
+        """
+        if permissions is None:
+            permissions = permission_cache.get(user_id)
+        if permissions is None:
+            return None
+
+        # Admins see everything, so they all share a single fingerprint.
+        fingerprint = '*' if permissions.is_admin else permissions.ids
+        version = table_versions.snapshot(*MENU_TABLES)
+        cache_key = (version, fingerprint)
+
+        tree = self._tree_cache.get(cache_key)
+        if tree is None:
+            tree = self._build_tree(version, permissions.is_admin, permissions.ids)
+            self._tree_cache.set(cache_key, tree)
+        return tree
+
+    def _load_menu_nodes(self, version):
+        """
+        Loads and serializes every menu row once per menu version.
+        Returns a list of detached MenuNode tuples in display order.
         """
-        user = User.query.get(user_id)
-        if not user:
-            return None, None
-
-        # 1. Calculate Permissions
-        user_permission_ids = {perm.id for role in user.roles for perm in role.permissions}
-        is_admin = any('admin:all' in p.name for r in user.roles for p in r.permissions)
-
-        # 2. Fetch Top-Level Menus
-        # We only fetch top-level; children are loaded recursively via relationships in Schema
-        top_level_menus = Menu.query.filter(Menu.parent_id.is_(None)).order_by(Menu.order_num).all()
-
-        # 3. Pre-filter Top-Level Menus (Optimization)
-        # We filter the roots here, and let the Schema handle the children recursion
-        accessible_roots = [
-            m for m in top_level_menus 
-            if self.can_access(m, is_admin, user_permission_ids)
+        cached_version, nodes = self._nodes
+        if cached_version == version:
+            return nodes
+
+        menus = (
+            Menu.query
+            .options(joinedload(Menu.required_permission))
+            .order_by(Menu.order_num, Menu.id)
+            .all()
+        )
+        dumped = self.menu_node_schema.dump(menus)
+        nodes = [
+            MenuNode(menu.id, menu.parent_id, menu.required_permission_id, data)
+            for menu, data in zip(menus, dumped)
         ]
-
-        # 4. Prepare Context for Schema
-        # The schema needs a callable 'can_access' that binds the current user's state
-        context = {
-            'can_access': lambda m: self.can_access(m, is_admin, user_permission_ids)
-        }
-
-        return accessible_roots, context
+        self._nodes = (version, nodes)
+        return nodes
+
+    def _build_tree(self, version, is_admin, user_permission_ids):
+        children_by_parent = defaultdict(list)
+        for node in self._load_menu_nodes(version):
+            if self.can_access(node, is_admin, user_permission_ids):
+                children_by_parent[node.parent_id].append(node.data)
+
+        def attach(parent_id):
+            # Copy the shared node dicts; an inaccessible parent hides its whole subtree.
+            return [
+                dict(data, children=attach(data['id']))
+                for data in children_by_parent.get(parent_id, [])
+            ]
+
+        return attach(None)
 
 
 # Instantiate services for singleton usage
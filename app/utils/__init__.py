@@ -0,0 +1,7 @@
+# goji/app/utils/__init__.py
+
+# Shared, blueprint-agnostic helpers (caching, versioning, query utilities)
+# that are reused across the feature modules.
+
+from .cache import LRUCache
+from .table_versions import table_versions
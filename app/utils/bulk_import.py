@@ -0,0 +1,305 @@
+# goji/app/utils/bulk_import.py
+import csv
+import io
+import json
+from datetime import date, datetime
+from functools import lru_cache
+from flask import current_app
+from marshmallow import ValidationError
+from sqlalchemy import UniqueConstraint, insert, select
+from sqlalchemy.exc import IntegrityError
+from ..extensions import db
+from .id_blocks import id_blocks
+from .includes import IN_CHUNK_SIZE
+
+try:
+    import openpyxl
+except ImportError:  # only needed for .xlsx files
+    openpyxl = None
+
+# Columns the database fills in; ignored when present in a file (e.g. a re-imported export).
+SYSTEM_COLUMNS = ('id', 'created_at', 'updated_at', 'created_by_id', 'updated_by_id')
+
+
+class BulkImportError(ValueError):
+    """The file as a whole cannot be imported (format, header); answered with 400."""
+
+
+# =========================================================
+# File Readers
+# =========================================================
+
+def open_table(stream, filename):
+    """
+    Opens an uploaded CSV or XLSX file for streaming.
+
+    Args:
+        stream: A binary file object.
+        filename: Used to tell the format apart ('.csv' / '.xlsx').
+    Returns:
+        tuple: (header names, iterator of (row number, values)); row 1 is the header.
+    Raises:
+        BulkImportError: for other formats, a missing header, or .xlsx without openpyxl.
+    """
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        rows = csv.reader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    elif name.endswith('.xlsx'):
+        if openpyxl is None:
+            raise BulkImportError("Importing .xlsx files requires the 'openpyxl' package")
+        workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+    else:
+        raise BulkImportError("Unsupported file type, expected .csv or .xlsx")
+
+    header = next(rows, None)
+    if not header or not any(header):
+        raise BulkImportError("The file has no header row")
+    header = [str(name).strip() if name is not None else '' for name in header]
+    return header, ((number, values) for number, values in enumerate(rows, start=2) if any(values))
+
+
+def read_ndjson(stream):
+    """
+    Streams newline-delimited JSON objects from a binary file object.
+    Returns:
+        iterator of (line number, dict)
+    Raises:
+        BulkImportError: (while iterating) on a line that is not a JSON object.
+    """
+    for number, line in enumerate(io.TextIOWrapper(stream, encoding='utf-8-sig'), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise BulkImportError(f"Line {number} is not valid JSON")
+        if not isinstance(record, dict):
+            raise BulkImportError(f"Line {number} is not a JSON object")
+        yield number, record
+
+
+def table_records(header, rows):
+    """(header, rows) from open_table() -> iterator of (row number, {column: cell value})."""
+    for number, values in rows:
+        yield number, {name: _cell(value) for name, value in zip(header, values) if name}
+
+
+def _cell(value):
+    """CSV/XLSX cell -> the string (or None) the load schema expects."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        # Spreadsheets store dates as midnight datetimes
+        return value.date().isoformat() if value.time() == datetime.min.time() else value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    value = str(value).strip()
+    return value or None
+
+
+# =========================================================
+# Importer
+# =========================================================
+
+@lru_cache(maxsize=None)
+def plain_schema(schema_cls, exclude=()):
+    """
+    'schema_cls' (many=True) loading plain dicts (no instances) with foreign keys,
+    without the system columns and 'exclude' (e.g. a parent key filled in later).
+    """
+    meta = type('Meta', (schema_cls.Meta,), {'load_instance': False, 'include_fk': True})
+    import_cls = type(f'{schema_cls.__name__}Import', (schema_cls,), {'Meta': meta})
+    exclude = [name for name in SYSTEM_COLUMNS + tuple(exclude) if name in import_cls._declared_fields]
+    return import_cls(many=True, exclude=exclude)
+
+
+def _existing(column, values):
+    """Which of 'values' are present in 'column', one 'IN (...)' query per IN_CHUNK_SIZE values."""
+    values = list(values)
+    found = set()
+    for start in range(0, len(values), IN_CHUNK_SIZE):
+        chunk = values[start:start + IN_CHUNK_SIZE]
+        found.update(db.session.execute(select(column).where(column.in_(chunk))).scalars())
+    return found
+
+
+class BulkImporter:
+    """
+    Streams rows into one model table in batches of BULK_IMPORT_BATCH_SIZE.
+
+    Per batch, the rows are loaded with the model's schema in a single many=True call,
+    checked against unique columns (database and earlier rows of the file) and foreign
+    keys with one 'IN (...)' query per column, and the valid rows are inserted with a
+    single executemany. Each batch is committed on its own, so a failing row never
+    discards the rest of the file; it is listed in the report instead.
+    """
+
+    def __init__(self, model, schema_cls, batch_size=None, max_errors=None):
+        self.model = model
+        self.schema = plain_schema(schema_cls)
+        self.batch_size = batch_size or current_app.config.get('BULK_IMPORT_BATCH_SIZE', 1000)
+        self.max_errors = max_errors or current_app.config.get('BULK_IMPORT_MAX_ERRORS', 1000)
+        self.fields = {field.data_key or name for name, field in self.schema.load_fields.items()}
+
+        table = model.__table__
+        unique = {column.key: column for column in table.columns if column.unique and not column.primary_key}
+        for constraint in table.constraints:
+            if isinstance(constraint, UniqueConstraint) and len(constraint.columns) == 1:
+                column = next(iter(constraint.columns))
+                unique.setdefault(column.key, column)
+        self._unique = list(unique.values())
+        self._foreign = [(column, fk.column) for column in table.columns for fk in column.foreign_keys]
+        self._seen = {}
+
+    def run(self, header, rows, dry_run=False):
+        """
+        Imports the rows of an opened table (see open_table).
+
+        Args:
+            dry_run (bool): Validate only; nothing is written.
+        Returns:
+            dict: Counts and the per-row errors ({'row': n, 'errors': {...}}).
+        Raises:
+            BulkImportError: if the header names a column the model does not have.
+        """
+        unknown = [name for name in header if name and name not in self.fields and name not in SYSTEM_COLUMNS]
+        if unknown:
+            raise BulkImportError(f"Unknown column(s): {', '.join(unknown)}")
+        positions = [(index, name) for index, name in enumerate(header) if name in self.fields]
+
+        self._seen = {column.key: set() for column in self._unique}
+        report = {"model": self.model.__name__, "dry_run": dry_run,
+                  "total": 0, "valid": 0, "inserted": 0, "failed": 0, "errors": []}
+        batch = []
+        for number, values in rows:
+            record = {}
+            for index, name in positions:
+                value = _cell(values[index]) if index < len(values) else None
+                if value is not None:
+                    record[name] = value
+            batch.append((number, record))
+            if len(batch) >= self.batch_size:
+                self._import_batch(batch, report, dry_run)
+                batch = []
+        if batch:
+            self._import_batch(batch, report, dry_run)
+        return report
+
+    # =========================================================
+    # Batch Steps
+    # =========================================================
+
+    def _fail(self, report, number, errors):
+        report["failed"] += 1
+        if len(report["errors"]) < self.max_errors:
+            report["errors"].append({"row": number, "errors": errors})
+
+    def _import_batch(self, batch, report, dry_run):
+        report["total"] += len(batch)
+        try:
+            loaded, errors = self.schema.load([record for _, record in batch]), {}
+        except ValidationError as err:
+            loaded, errors = err.valid_data, err.messages
+
+        checks = iter(self._check_constraints([loaded[i] for i in range(len(batch)) if i not in errors]))
+        valid = []
+        for index, (number, _) in enumerate(batch):
+            row_errors = errors[index] if index in errors else next(checks)
+            if row_errors:
+                self._fail(report, number, row_errors)
+            else:
+                valid.append((number, loaded[index]))
+        for _, record in valid:
+            for key, seen in self._seen.items():
+                if record.get(key) is not None:
+                    seen.add(record[key])
+
+        report["valid"] += len(valid)
+        if valid and not dry_run:
+            self._insert(valid, report)
+
+    def _check_constraints(self, records):
+        """Unique and foreign key errors of each record ({} when fine), one query per column."""
+        errors = [{} for _ in records]
+        for column in self._unique:
+            values = {record[column.key] for record in records if record.get(column.key) is not None}
+            taken = _existing(column, values) if values else set()
+            seen = self._seen[column.key]
+            in_batch = set()
+            for record, record_errors in zip(records, errors):
+                value = record.get(column.key)
+                if value is None:
+                    continue
+                if value in taken:
+                    record_errors.setdefault(column.key, []).append("Already exists.")
+                elif value in seen or value in in_batch:
+                    record_errors.setdefault(column.key, []).append("Duplicate value in file.")
+                in_batch.add(value)
+        for column, target in self._foreign:
+            values = {record[column.key] for record in records if record.get(column.key) is not None}
+            found = _existing(target, values) if values else set()
+            for record, record_errors in zip(records, errors):
+                value = record.get(column.key)
+                if value is not None and value not in found:
+                    record_errors.setdefault(column.key, []).append(f"No {target.table.name} row with id {value}.")
+        return errors
+
+    def _insert(self, valid, report):
+        id_blocks.assign(db.session, self.model.__table__, [record for _, record in valid])
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(self.model), [record for _, record in valid])
+            report["inserted"] += len(valid)
+        except IntegrityError:
+            # A constraint the batch checks cannot see (e.g. a composite key): isolate the rows
+            for number, record in valid:
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(insert(self.model), [record])
+                    report["inserted"] += 1
+                except IntegrityError as e:
+                    report["valid"] -= 1
+                    self._fail(report, number, {"_schema": [str(e.orig)]})
+        db.session.commit()
+
+
+# =========================================================
+# Raw Inserts
+# =========================================================
+
+def insert_rows(table, columns, rows):
+    """
+    Appends plain tuples to 'table' within the current transaction, as fast as the
+    dialect allows: 'COPY ... FROM STDIN' on PostgreSQL, otherwise one executemany
+    (array DML on Oracle: python-oracledb binds the whole list in one round trip).
+
+    Column defaults are not applied by COPY, so 'columns' must name every value the
+    table needs. Session events do not see COPY either; bump table_versions after commit.
+    With Oracle id blocks active the primary keys are assigned here as well.
+    """
+    if not rows:
+        return
+    connection = db.session.connection()
+    if connection.dialect.name != 'postgresql':
+        records = [dict(zip(columns, row)) for row in rows]
+        db.session.execute(insert(table), id_blocks.assign(db.session, table, records))
+        return
+
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)  # None is written as an unquoted empty field, i.e. NULL
+    quote = connection.dialect.identifier_preparer.quote
+    sql = f"COPY {quote(table.name)} ({', '.join(quote(c) for c in columns)}) FROM STDIN WITH (FORMAT csv)"
+    cursor = connection.connection.cursor()
+    try:
+        if hasattr(cursor, 'copy_expert'):  # psycopg2
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+        else:  # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
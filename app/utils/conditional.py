@@ -0,0 +1,70 @@
+# goji/app/utils/conditional.py
+import hashlib
+from datetime import timezone
+from functools import wraps
+from flask import Response, make_response, request
+from sqlalchemy import func, null, select
+from ..extensions import db
+
+
+def table_state(*tables):
+    """
+    Returns ((max(updated_at), count), ...) for each table in a single round trip.
+    Accepts models or Table objects; tables without 'updated_at' fall back to
+    'created_at' (association tables) or to the row count alone.
+    """
+    columns = []
+    for table in tables:
+        table = getattr(table, '__table__', table)
+        stamp = table.c.get('updated_at', table.c.get('created_at'))
+        columns.append(select(func.max(stamp)).scalar_subquery() if stamp is not None else null())
+        columns.append(select(func.count()).select_from(table).scalar_subquery())
+    row = db.session.execute(select(*columns)).one()
+    return tuple(zip(row[::2], row[1::2]))
+
+
+def conditional_get(*tables, scoped=False):
+    """
+    Decorator answering GET requests with 304 Not Modified when nothing the response
+    depends on has changed, before the view runs its query or serializer.
+
+    The weak ETag hashes the state of 'tables' (see table_state), the request path
+    with its query string and, with 'scoped=True', the caller's DataScope.
+    Last-Modified is the newest 'updated_at' among the tables, sent for information
+    only: a deleted row leaves that timestamp unchanged, so If-Modified-Since is never
+    answered with 304. Only If-None-Match is, since the ETag also covers row counts.
+
+    Args:
+        tables: Every model/table the response is built from (including nested ones).
+        scoped (bool): The view filters rows by the caller's plant/BU scope.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            state = table_state(*tables)
+            stamps = [stamp for stamp, _ in state if stamp is not None]
+            last_modified = max(stamps).replace(tzinfo=timezone.utc, microsecond=0) if stamps else None
+
+            key = [repr(state), request.full_path]
+            if scoped:
+                from ..user_management.scope import current_data_scope
+                scope = current_data_scope()
+                key.append(repr(scope and (sorted(scope.plant_ids or ()), sorted(scope.bu_ids or ()),
+                                           scope.is_unrestricted)))
+            etag = hashlib.sha1('|'.join(key).encode('utf-8')).hexdigest()
+
+            if request.if_none_match and request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            # Clients must revalidate, and shared caches must not mix users' scopes
+            response.headers['Cache-Control'] = 'no-cache'
+            response.vary.add('Authorization')
+            return response
+        return decorated_function
+    return decorator
@@ -0,0 +1,118 @@
+# goji/app/utils/fast_read.py
+import decimal
+from operator import methodcaller
+from marshmallow import fields
+from sqlalchemy import inspect
+from sqlalchemy.orm import ColumnProperty
+from ..extensions import db
+from .filtering import QueryError
+from .includes import include_columns
+from .pagination import paginate
+
+
+def _converter(field):
+    """Returns a callable reproducing 'field._serialize' for a non-null column value."""
+    kind = type(field)
+    if kind is fields.Integer:
+        return int
+    if kind is fields.String:
+        return str
+    if kind is fields.Boolean:
+        return bool
+    if kind is fields.Decimal and not field.as_string and not field.allow_nan:
+        places, rounding = field.places, field.rounding
+        def convert(value):
+            num = decimal.Decimal(str(value))
+            if places is not None and num.is_finite():
+                num = num.quantize(places, rounding=rounding)
+            # Rendered as a string, exactly like Flask's JSON 'default' hook renders Decimal
+            return str(num)
+        return convert
+    if kind in (fields.DateTime, fields.Date) and field.format in (None, 'iso'):
+        return methodcaller('isoformat')
+    return lambda value, field=field: field._serialize(value, None, None)
+
+
+class RowEncoder:
+    """
+    Precompiled serializer for plain column rows, producing the same dicts as
+    'schema_cls(many=True).dump(objects)' without building ORM instances.
+
+    Each dumped field is resolved once to its column and a converter. Nested fields
+    whose attribute is not mapped are omitted (as marshmallow omits them); a field
+    backed by a real relationship cannot be served from a row and raises TypeError.
+    Duck-types the parts of a many=True schema used by paginated_response().
+    """
+
+    many = True
+
+    def __init__(self, model, schema_cls, only=None, exclude=()):
+        schema = schema_cls(many=True, only=only, exclude=exclude)
+        mapper = inspect(model)
+        self.model = model
+        self.schema_cls = schema_cls
+        self.only = only
+        self.exclude = tuple(exclude)
+        self.fields = schema.fields
+        self.columns = []
+        self._encoders = []
+        self._restricted = {}
+
+        for name, field in schema.dump_fields.items():
+            attr = field.attribute or name
+            prop = mapper.attrs.get(attr)
+            if prop is None and not hasattr(model, attr):
+                continue
+            if not isinstance(prop, ColumnProperty):
+                raise TypeError(f"{schema_cls.__name__}.{name} cannot be served from column rows")
+            self.columns.append(getattr(model, attr))
+            self._encoders.append((field.data_key or name, _converter(field)))
+
+    def restrict(self, only=None, exclude=()):
+        """Returns the (cached) encoder for a sparse fieldset. Raises ValueError on unknown fields."""
+        if not only and not exclude:
+            return self
+        key = (frozenset(only) if only else None, tuple(sorted(exclude)))
+        encoder = self._restricted.get(key)
+        if encoder is None:
+            encoder = RowEncoder(self.model, self.schema_cls, only=key[0], exclude=key[1])
+            self._restricted[key] = encoder
+        return encoder
+
+    def dump(self, rows):
+        encoders = self._encoders
+        return [
+            {key: None if value is None else convert(value) for (key, convert), value in zip(encoders, row)}
+            for row in rows
+        ]
+
+
+def fast_paginate(encoder, page, keys, descending=False, where=()):
+    """
+    Keyset-paginates a column-only query for 'encoder' (see paginate()).
+    Only the columns the (sparse) encoder dumps plus the ordering and include keys are selected,
+    and rows come back as plain tuples; serialize them with paginated_response(encoder, ...).
+
+    Args:
+        encoder (RowEncoder): The model's row encoder.
+        where: Extra WHERE clauses (e.g. data scope).
+    """
+    model = encoder.model
+    if page is not None and page.fields:
+        try:
+            encoder = encoder.restrict(page.fields)
+        except ValueError:
+            encoder = encoder.restrict()  # reported as 400 by paginated_response
+
+    extra = list(keys) if isinstance(keys, (list, tuple)) else [keys]
+    if page is not None:
+        extra += [getattr(model, field) for field, _ in page.sort if field in model.__sortable__]
+        try:
+            extra += [column for _, column in include_columns(model, page.include)]
+        except QueryError:
+            pass  # reported as 400 by paginate()
+    columns = list(encoder.columns)
+    columns += [column for column in extra if not any(column is c for c in columns)]
+
+    query = db.session.query(*columns).filter(*where)
+    return paginate(query, page, keys, descending=descending)
@@ -0,0 +1,67 @@
+# goji/app/utils/fieldsets.py
+from functools import lru_cache
+from sqlalchemy import inspect
+from sqlalchemy.orm import ColumnProperty, RelationshipProperty, defer, load_only
+
+
+def parse_fields(raw):
+    """'?fields=id,code, name' -> frozenset of field names, or None when absent/empty."""
+    if not raw:
+        return None
+    fields = frozenset(name.strip() for name in raw.split(',') if name.strip())
+    return fields or None
+
+
+def restrict_columns(query, model, only=None, deferred=(), keep=()):
+    """
+    Pushes a sparse fieldset down into the SQL projection.
+
+    Args:
+        query: The SQLAlchemy query selecting 'model'.
+        model: The mapped class.
+        only: Requested field names; columns outside it are not selected. Relationship
+              names keep the foreign key columns needed to lazy-load them.
+        deferred: Column names left out of the SELECT when no fieldset was requested
+                  (large text columns on list endpoints).
+        keep: Column attributes that must always be loaded (e.g. keyset columns).
+    """
+    if query.column_descriptions[0]['expr'] is not model:
+        return query  # column-only queries already select just what they need
+    mapper = inspect(model)
+    if only:
+        attrs = list(keep)
+        for name in {field.split('.')[0] for field in only}:
+            prop = mapper.attrs.get(name)
+            if isinstance(prop, ColumnProperty):
+                attrs.append(getattr(model, name))
+            elif isinstance(prop, RelationshipProperty):
+                attrs.extend(
+                    getattr(model, mapper.get_property_by_column(column).key)
+                    for column in prop.local_columns if column in mapper.columns.values()
+                )
+        return query.options(load_only(*attrs)) if attrs else query
+    if deferred:
+        return query.options(*(defer(getattr(model, name)) for name in deferred))
+    return query
+
+
+def sparse_schema(schema, only=None, exclude=()):
+    """
+    Returns a schema like 'schema' but dumping only 'only' (minus 'exclude').
+    Derived schemas are built once per combination and reused.
+    Raises:
+        ValueError: if 'only' names a field the schema does not have.
+    """
+    if not only and not exclude:
+        return schema
+    if hasattr(schema, 'restrict'):
+        return schema.restrict(only, exclude)  # utils.fast_read.RowEncoder
+    if schema.only:
+        only = frozenset(only or schema.only) & frozenset(schema.only)
+    exclude = tuple(sorted(set(exclude) | set(schema.exclude)))
+    return _derive_schema(type(schema), schema.many, frozenset(only) if only else None, exclude)
+
+
+@lru_cache(maxsize=256)
+def _derive_schema(schema_cls, many, only, exclude):
+    return schema_cls(many=many, only=only, exclude=exclude)
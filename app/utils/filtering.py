@@ -0,0 +1,172 @@
+# goji/app/utils/filtering.py
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import UniqueConstraint, func, select
+from ..extensions import db
+from .cache import LRUCache
+from .table_versions import table_versions
+
+# ?filter=<field>:<op>:<value>   (repeatable, AND-ed; '<field>:<value>' means 'eq')
+# ?sort=<field>,-<field>         ('-' for descending)
+OPERATORS = ('eq', 'ne', 'lt', 'lte', 'gt', 'gte', 'in', 'startswith', 'contains', 'isnull')
+
+# Operators that cannot use a b-tree index even on an indexed column.
+SCAN_OPERATORS = ('contains',)
+
+_COMPARATORS = {
+    'eq': lambda column, value: column == value,
+    'ne': lambda column, value: column != value,
+    'lt': lambda column, value: column < value,
+    'lte': lambda column, value: column <= value,
+    'gt': lambda column, value: column > value,
+    'gte': lambda column, value: column >= value,
+}
+
+_TRUE = ('1', 'true', 'yes')
+_FALSE = ('0', 'false', 'no')
+
+
+class QueryError(ValueError):
+    """A malformed or disallowed '?filter=' / '?sort=' expression (answered with 400)."""
+
+
+def parse_filters(raw_filters):
+    """['part_num:startswith:CCL', 'material_type:RAW'] -> ((field, op, value), ...)"""
+    filters = []
+    for raw in raw_filters:
+        parts = raw.split(':', 2)
+        if len(parts) == 2:
+            parts = [parts[0], 'eq', parts[1]]
+        if len(parts) != 3 or not parts[0]:
+            raise QueryError(f"Invalid filter '{raw}', expected '<field>:<op>:<value>'")
+        if parts[1] not in OPERATORS:
+            raise QueryError(f"Unknown filter operator '{parts[1]}'")
+        filters.append(tuple(parts))
+    return tuple(filters)
+
+
+def parse_sort(raw):
+    """'-order_date,order_num' -> (('order_date', True), ('order_num', False))"""
+    if not raw:
+        return ()
+    sort = []
+    for name in raw.split(','):
+        name = name.strip()
+        if name:
+            sort.append((name.lstrip('-'), name.startswith('-')))
+    return tuple(sort)
+
+
+def _cast(column, value):
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    try:
+        if python_type is bool:
+            if value.lower() not in _TRUE + _FALSE:
+                raise ValueError(value)
+            return value.lower() in _TRUE
+        if python_type in (int, float, Decimal):
+            return python_type(value)
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is date:
+            return date.fromisoformat(value)
+    except (ValueError, InvalidOperation):
+        raise QueryError(f"Invalid value '{value}' for '{column.key}'")
+    return value
+
+
+def is_indexed(column):
+    """True if 'column' leads the primary key, an index or a unique constraint of its table."""
+    column = column.property.columns[0]
+    table = column.table
+    leading = [list(table.primary_key.columns)[:1]]
+    leading += [list(index.columns)[:1] for index in table.indexes]
+    leading += [list(c.columns)[:1] for c in table.constraints if isinstance(c, UniqueConstraint)]
+    return any(cols and cols[0] is column for cols in leading)
+
+
+def compile_filters(model, filters):
+    """
+    Compiles parsed filters against the model's '__filterable__' whitelist.
+    Returns:
+        (clauses, scanned): the WHERE clauses and the unindexed fields that would force
+        a full scan (empty when at least one other filter can seek on an index).
+    """
+    clauses, scanned, seekable = [], [], False
+    for field, op, value in filters:
+        if field not in model.__filterable__:
+            raise QueryError(f"Filtering on '{field}' is not allowed")
+        column = getattr(model, field)
+
+        if op == 'isnull':
+            if value.lower() not in _TRUE + _FALSE:
+                raise QueryError(f"Invalid value '{value}' for 'isnull'")
+            clauses.append(column.is_(None) if value.lower() in _TRUE else column.isnot(None))
+        elif op == 'in':
+            clauses.append(column.in_([_cast(column, v) for v in value.split(',')]))
+        elif op == 'startswith':
+            clauses.append(column.startswith(value, autoescape=True))
+        elif op == 'contains':
+            clauses.append(column.contains(value, autoescape=True))
+        else:
+            clauses.append(_COMPARATORS[op](column, _cast(column, value)))
+
+        if op in SCAN_OPERATORS or not is_indexed(column):
+            scanned.append(field)
+        else:
+            seekable = True
+    return clauses, ([] if seekable else scanned)
+
+
+def compile_sort(model, sort):
+    """
+    Compiles parsed sort keys against the model's '__sortable__' whitelist.
+    Returns:
+        list of (column, descending) pairs.
+    """
+    keys = []
+    for field, descending in sort:
+        if field not in model.__sortable__:
+            raise QueryError(f"Sorting on '{field}' is not allowed")
+        keys.append((getattr(model, field), descending))
+    return keys
+
+
+class ScanGuard:
+    """
+    Rejects filters that would full-scan a large table.
+    Row counts are cached per table and refreshed when the table's version changes
+    (or after the TTL, for writes made by other processes).
+    """
+
+    def __init__(self):
+        self.max_rows = 10000
+        self._counts = LRUCache(maxsize=256, ttl=300)
+
+    def init_app(self, app):
+        self.max_rows = app.config.get('FILTER_SCAN_MAX_ROWS', self.max_rows)
+
+    def row_count(self, table):
+        version = table_versions.get(table.name)
+        entry = self._counts.get(table.name)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        count = db.session.scalar(select(func.count()).select_from(table))
+        self._counts.set(table.name, (version, count))
+        return count
+
+    def check(self, model, scanned):
+        if not scanned or self.max_rows is None:
+            return
+        if self.row_count(model.__table__) > self.max_rows:
+            raise QueryError(
+                f"Filter on unindexed field(s) {', '.join(sorted(set(scanned)))} is not allowed "
+                f"on tables with more than {self.max_rows} rows; add an indexed filter"
+            )
+
+
+# Singleton instance
+scan_guard = ScanGuard()
@@ -0,0 +1,132 @@
+# goji/app/utils/id_blocks.py
+import threading
+from collections import deque
+from sqlalchemy import event, func, select, text
+from sqlalchemy.orm import Session
+
+class IdBlockAllocator:
+    """
+    Client-side primary key allocation from Oracle sequences (hi/lo).
+
+    A sequence switched to 'INCREMENT BY n' (see utils/oracle_utils.generate_id_block_sql)
+    reserves ids [v, v + n) with every nextval v. The allocator keeps these blocks per
+    table in process memory, so new rows get their ids without a per-row trigger or a
+    round trip for each id, and SQLAlchemy can flush them as one executemany.
+
+    Block sizes are read from USER_SEQUENCES, so a sequence still at 'INCREMENT BY 1'
+    is served correctly, just one id per nextval. Several blocks are fetched in a
+    single 'CONNECT BY LEVEL' query. Ids skipped when a process exits are never reused.
+
+    Only active with ORACLE_ID_BLOCKS on an Oracle bind; other dialects keep their
+    own identity handling.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._blocks = {}       # {table name: deque of [next id, end]}
+        self._block_sizes = {}  # {table name: sequence increment}
+        self._lock = threading.Lock()
+        self._listening = False
+
+    def init_app(self, app):
+        self.enabled = app.config.get('ORACLE_ID_BLOCKS', False)
+        with self._lock:
+            self._blocks.clear()
+            self._block_sizes.clear()
+        if not self._listening:
+            event.listen(Session, 'before_flush', self._before_flush)
+            self._listening = True
+
+    # =========================================================
+    # Public API
+    # =========================================================
+
+    def active(self, session) -> bool:
+        return self.enabled and session.get_bind().dialect.name == 'oracle'
+
+    def assign(self, session, table, records):
+        """
+        Fills in the 'id' of dicts about to be inserted into 'table' (those without one),
+        when active. Returns 'records'.
+        """
+        if not self.active(session) or 'id' not in table.c:
+            return records
+        missing = [record for record in records if record.get('id') is None]
+        for record, new_id in zip(missing, self.allocate(session, table.name, len(missing))):
+            record['id'] = new_id
+        return records
+
+    def allocate(self, session, table_name, count):
+        """Returns 'count' unused ids of 'table_name', fetching new blocks as needed."""
+        ids = []
+        with self._lock:
+            blocks = self._blocks.setdefault(table_name, deque())
+            available = sum(end - start for start, end in blocks)
+            if available < count:
+                self._fetch(session, table_name, count - available, blocks)
+            while len(ids) < count:
+                block = blocks[0]
+                take = min(count - len(ids), block[1] - block[0])
+                ids.extend(range(block[0], block[0] + take))
+                block[0] += take
+                if block[0] == block[1]:
+                    blocks.popleft()
+        return ids
+
+    # =========================================================
+    # Internals
+    # =========================================================
+
+    def _fetch(self, session, table_name, needed, blocks):
+        # Imported here: 'goji' is only importable once commands.py has extended sys.path
+        from goji.utils.oracle_utils import sequence_name
+        connection = session.connection()
+        name = sequence_name(table_name)
+        size = self._block_sizes.get(table_name)
+        if size is None:
+            size = connection.execute(
+                text("SELECT increment_by FROM user_sequences WHERE sequence_name = :name"), {"name": name}
+            ).scalar_one()
+            self._block_sizes[table_name] = size
+        starts = connection.execute(
+            text(f'SELECT "{name}".nextval FROM dual CONNECT BY LEVEL <= :blocks'),
+            {"blocks": -(-needed // size)},
+        ).scalars()
+        blocks.extend([start, start + size] for start in sorted(starts))
+
+    def _before_flush(self, session, flush_context, instances):
+        """Gives pending objects their ids up front, one allocation per table."""
+        if not self.enabled or not session.new or not self.active(session):
+            return
+        pending = {}
+        for obj in session.new:
+            table = getattr(type(obj), '__table__', None)
+            if table is not None and 'id' in table.c and getattr(obj, 'id', None) is None:
+                pending.setdefault(table.name, []).append(obj)
+        for table_name, objects in pending.items():
+            for obj, new_id in zip(objects, self.allocate(session, table_name, len(objects))):
+                obj.id = new_id
+
+# Singleton instance
+id_blocks = IdBlockAllocator()
+
+
+def reserve_ids(session, table, count):
+    """
+    Reserves 'count' primary keys of 'table' for rows inserted with explicit ids (so
+    children can reference them before anything is written): from the sequence blocks
+    on Oracle, the serial sequence on PostgreSQL (one round trip each), otherwise past
+    MAX(id), which assumes a single writer that inserts before reserving again.
+    """
+    if not count:
+        return []
+    dialect = session.get_bind().dialect.name
+    if dialect == 'oracle':
+        return id_blocks.allocate(session, table.name, count)
+    if dialect == 'postgresql':
+        return list(session.execute(
+            text("SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :count)"),
+            {"table": table.name, "count": count},
+        ).scalars())
+    start = (session.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+    return list(range(start, start + count))
@@ -0,0 +1,114 @@
+# goji/app/utils/includes.py
+from flask import g
+from marshmallow import fields
+from ..extensions import db
+from .filtering import QueryError
+
+# ?include=customer,end_customer
+# Expands to-one relations declared in the model's '__includes__' ({name: foreign key attribute}).
+# The related objects are dumped with the schema's Nested field of the same name.
+
+# Oracle rejects more than 1000 expressions in an IN list.
+IN_CHUNK_SIZE = 1000
+
+
+def parse_includes(raw):
+    """'customer, end_customer' -> ('customer', 'end_customer'), or () when absent/empty."""
+    if not raw:
+        return ()
+    return tuple(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+
+
+def include_columns(model, names):
+    """
+    Resolves include names to ((name, foreign key attribute), ...).
+    Raises:
+        QueryError: if a name is not declared in 'model.__includes__'.
+    """
+    declared = getattr(model, '__includes__', {})
+    include = []
+    for name in names:
+        if name not in declared:
+            raise QueryError(f"Unknown include '{name}'")
+        include.append((name, getattr(model, declared[name])))
+    return tuple(include)
+
+
+def _target(column_attr):
+    """Foreign key attribute -> (related model, name of the attribute it references)."""
+    fk = next(iter(column_attr.property.columns[0].foreign_keys))
+    for mapper in db.Model.registry.mappers:
+        if mapper.local_table is fk.column.table:
+            return mapper.class_, mapper.get_property_by_column(fk.column).key
+    raise LookupError(f"No mapped class for table '{fk.column.table.name}'")
+
+
+def _memo():
+    """Per-request identity map of related objects: {(model, key): instance or None}."""
+    if '_include_memo' not in g:
+        g._include_memo = {}
+    return g._include_memo
+
+
+def load_related(model, attr, keys):
+    """
+    Resolves 'model.<attr>' values to objects with one 'IN (...)' query per IN_CHUNK_SIZE
+    keys. Objects already loaded during this request are not fetched again.
+    Returns:
+        dict: {key: instance}; keys without a matching row are left out.
+    """
+    memo = _memo()
+    target = getattr(model, attr)
+    missing = [key for key in set(keys) if key is not None and (model, key) not in memo]
+    for start in range(0, len(missing), IN_CHUNK_SIZE):
+        chunk = missing[start:start + IN_CHUNK_SIZE]
+        for obj in db.session.query(model).filter(target.in_(chunk)):
+            memo[(model, getattr(obj, attr))] = obj
+        for key in chunk:
+            memo.setdefault((model, key), None)
+    return {key: memo[(model, key)] for key in keys if key is not None and memo[(model, key)] is not None}
+
+
+def nested_includes(schema, include):
+    """
+    Pairs each requested include with the schema's Nested field used to dump it.
+
+    Args:
+        schema: The list schema (or RowEncoder).
+        include: ((name, foreign key attribute), ...) as carried by Page.include.
+    Raises:
+        QueryError: if the schema has no Nested field for an include.
+    """
+    resolved = []
+    for name, column_attr in include:
+        field = schema.fields.get(name)
+        if not isinstance(field, fields.Nested):
+            raise QueryError(f"Include '{name}' is not available on this endpoint")
+        resolved.append((name, column_attr, field.schema))
+    return resolved
+
+
+def expand(resolved, items, data):
+    """
+    Adds the includes (from nested_includes()) to already dumped rows, in place.
+    Relations to the same model (e.g. customer and end_customer) share their query,
+    and each related object is dumped once however many rows reference it.
+
+    Args:
+        items: The source instances or column rows (they carry the foreign keys).
+        data: The dumped items, one dict per item.
+    """
+    if not resolved:
+        return data
+    keys, targets = {}, {}
+    for name, column_attr, _ in resolved:
+        keys[name] = [getattr(item, column_attr.key) for item in items]
+        targets.setdefault(_target(column_attr), []).extend(keys[name])
+    related = {target: load_related(*target, target_keys) for target, target_keys in targets.items()}
+
+    for name, column_attr, nested in resolved:
+        objects = related[_target(column_attr)]
+        dumped = {key: nested.dump(objects[key]) for key in set(keys[name]) if key in objects}
+        for row, key in zip(data, keys[name]):
+            row[name] = dumped.get(key)
+    return data
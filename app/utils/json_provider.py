@@ -0,0 +1,40 @@
+# goji/app/utils/json_provider.py
+import re
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+_COMPACT = (',', ':')
+
+# orjson formats very large/small floats differently from the stdlib ('1e16' vs '1e+16',
+# '0.00001' vs '1e-05') and does not escape DEL; such output is re-encoded with the stdlib.
+# The pattern may also match inside strings, which only costs the (correct) slow path.
+_UNSAFE = re.compile(rb'[0-9][eE]|0\.0000|\x7f')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Drop-in replacement for Flask's default provider that encodes compact responses
+    with orjson when it is installed.
+
+    Output is byte-identical to DefaultJSONProvider: keys are sorted, the Flask
+    'default' hook still handles Decimal/date/UUID/dataclasses, and anything orjson
+    would render differently (non-ASCII text, non-string keys, huge ints, exotic
+    floats) falls back to the stdlib encoder.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs and kwargs != {'separators': _COMPACT}:
+            return super().dumps(obj, **kwargs)
+        try:
+            out = orjson.dumps(obj, default=self.default, option=(
+                orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+            ))
+        except (TypeError, orjson.JSONEncodeError):
+            return super().dumps(obj, **kwargs)
+        if not out.isascii() or _UNSAFE.search(out):
+            return super().dumps(obj, **kwargs)
+        return out.decode('ascii')
@@ -0,0 +1,254 @@
+# goji/app/utils/pagination.py
+import base64
+import json
+from collections import namedtuple
+from datetime import date, datetime
+from decimal import Decimal
+from urllib.parse import urlencode
+from flask import Response, abort, current_app, jsonify, make_response, request, stream_with_context
+from sqlalchemy import and_, inspect, or_
+from .fieldsets import parse_fields, restrict_columns, sparse_schema
+from .filtering import QueryError, compile_filters, compile_sort, parse_filters, parse_sort, scan_guard
+from .includes import expand, include_columns, nested_includes, parse_includes
+
+
+class PageRequest(namedtuple('PageRequest', ['limit', 'cursor', 'stream', 'fields', 'filters', 'sort', 'include'],
+                               defaults=(False, None, (), (), ()))):
+    """
+    Requested page: at most 'limit' rows after the (decoded) keyset 'cursor';
+    'limit' None means every row (no '?limit=' or '?cursor=' given). With 'stream' set, every remaining row is returned as a streamed response instead.
+    'fields' is the requested sparse fieldset (None for every field); 'filters' and
+    'sort' are the parsed '?filter=' / '?sort=' expressions (see utils/filtering.py);
+    'include' names the related objects to embed (see utils/includes.py).
+    """
+    __slots__ = ()
+
+
+class Page(namedtuple('Page', ['items', 'next_cursor', 'only', 'exclude', 'include'], defaults=(None, (), ()))):
+    """
+    One page of results; 'next_cursor' is None on the last page.
+    'only'/'exclude' tell the serializer which fields were actually loaded;
+    'include' holds the (name, foreign key attribute) pairs to expand.
+    """
+    __slots__ = ()
+
+
+def encode_cursor(values):
+    """Key values of the last row -> opaque, URL-safe cursor string."""
+    raw = json.dumps([
+        v.isoformat() if isinstance(v, (date, datetime)) else str(v) if isinstance(v, Decimal) else v
+        for v in values
+    ])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, keys):
+    """Opaque cursor -> key values typed after the key columns. Raises ValueError if malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise ValueError("Invalid cursor")
+
+    typed = []
+    for (column, _), value in zip(keys, values):
+        python_type = column.type.python_type
+        if value is not None and python_type is datetime:
+            value = datetime.fromisoformat(value)
+        elif value is not None and python_type is date:
+            value = date.fromisoformat(value)
+        elif value is not None and python_type is Decimal:
+            value = Decimal(value)
+        typed.append(value)
+    return typed
+
+
+def page_request():
+    """
+    Reads '?limit=', '?cursor=', '?stream=', '?fields=', '?filter=', '?sort=' and
+    '?include=' from the current request.
+    Without '?limit=' and '?cursor=' the whole list is returned, as before pagination
+    existed; a '?cursor=' alone pages by PAGINATION_DEFAULT_LIMIT, and 'limit' is capped at
+    PAGINATION_MAX_LIMIT;
+    '?stream=1' asks for a full dump (from the cursor on) and ignores the limit;
+    '?fields=id,code' restricts both the output and the selected columns;
+    '?filter=part_num:startswith:CCL&sort=-id' filters and orders by whitelisted columns;
+    '?include=customer' embeds related objects, loaded in one batch per relation.
+    A malformed value aborts the request with 400.
+    """
+    default_limit = current_app.config.get('PAGINATION_DEFAULT_LIMIT', 100)
+    max_limit = current_app.config.get('PAGINATION_MAX_LIMIT', 1000)
+
+    cursor = request.args.get('cursor') or None
+    raw_limit = request.args.get('limit')
+    if raw_limit is None:
+        limit = default_limit if cursor else None
+    else:
+        try:
+            limit = int(raw_limit)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            abort(make_response(jsonify({"error": "'limit' must be a positive integer"}), 400))
+        limit = min(limit, max_limit)
+    stream = request.args.get('stream', '').lower() in ('1', 'true', 'yes')
+    fields = parse_fields(request.args.get('fields'))
+    include = parse_includes(request.args.get('include'))
+    try:
+        filters = parse_filters(request.args.getlist('filter'))
+        sort = parse_sort(request.args.get('sort'))
+    except QueryError as e:
+        abort(make_response(jsonify({"error": str(e)}), 400))
+    return PageRequest(limit, cursor, stream, fields, filters, sort, include)
+
+
+def _normalize_keys(keys, descending):
+    if not isinstance(keys, (list, tuple)):
+        keys = (keys,)
+    return [(column, descending) for column in keys]
+
+
+def _sort_keys(model, sort):
+    """'?sort=' keys, completed with the primary key so the keyset order stays total."""
+    keys = compile_sort(model, sort)
+    pk = getattr(model, inspect(model).primary_key[0].key)
+    if not any(column is pk for column, _ in keys):
+        keys.append((pk, False))
+    return keys
+
+
+def _after(keys, values):
+    """
+    Builds the keyset predicate '(k1, k2, ...) > (v1, v2, ...)' (or '<' for descending keys)
+    expanded into AND/OR form, which every dialect (including Oracle) can use with an index.
+    """
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        equal_prefix = [keys[j][0] == values[j] for j in range(i)]
+        step = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal_prefix, step))
+    return or_(*clauses)
+
+
+def _ordered(query, keys):
+    return query.order_by(*(column.desc() if desc else column.asc() for column, desc in keys))
+
+
+def paginate(query, page, keys, descending=False, deferred=()):
+    """
+    Applies keyset pagination to a query.
+
+    Args:
+        query: The (already filtered) SQLAlchemy query.
+        page (PageRequest): The requested page, usually from page_request(); None returns everything.
+        keys: Unique ordering column, or tuple of columns ending with a unique one,
+              e.g. Material.id or (AuditLog.timestamp, AuditLog.id). A '?sort=' in the
+              request replaces them (the model's primary key is appended as tie-breaker).
+        descending (bool): Walk the keys from newest to oldest.
+        deferred: Large columns neither selected nor serialized unless named in '?fields='.
+    Returns:
+        Page: the rows and the cursor of the next page. For a streamed request 'items'
+              is the lazily evaluated query itself (see paginated_response).
+    """
+    keys = _normalize_keys(keys, descending)
+    if page is None:
+        return Page(_ordered(query, keys).all(), None)
+
+    model = keys[0][0].class_
+    try:
+        include = include_columns(model, page.include)
+        if page.filters:
+            clauses, scanned = compile_filters(model, page.filters)
+            scan_guard.check(model, scanned)
+            query = query.filter(*clauses)
+        if page.sort:
+            keys = _sort_keys(model, page.sort)
+    except QueryError as e:
+        abort(make_response(jsonify({"error": str(e)}), 400))
+    query = _ordered(query, keys)
+
+    only = page.fields
+    exclude = () if only else tuple(deferred)
+    query = restrict_columns(query, model, only=only, deferred=deferred,
+                             keep=[column for column, _ in keys] + [column for _, column in include])
+
+    if page.cursor:
+        try:
+            values = decode_cursor(page.cursor, keys)
+        except ValueError as e:
+            abort(make_response(jsonify({"error": str(e)}), 400))
+        query = query.filter(_after(keys, values))
+
+    if page.stream:
+        # Rows are fetched STREAM_CHUNK_SIZE at a time while the response is written
+        return Page(query.yield_per(current_app.config.get('STREAM_CHUNK_SIZE', 1000)), None, only, exclude, include)
+
+    if page.limit is None:
+        return Page(query.all(), None, only, exclude, include)
+
+    # Fetch one extra row to learn whether another page exists
+    rows = query.limit(page.limit + 1).all()
+    if len(rows) <= page.limit:
+        return Page(rows, None, only, exclude, include)
+
+    rows = rows[:page.limit]
+    last = rows[-1]
+    return Page(rows, encode_cursor([getattr(last, column.key) for column, _ in keys]), only, exclude, include)
+
+
+def paginated_response(schema, page):
+    """
+    Serializes a Page as a plain JSON array (unchanged body shape) and exposes the
+    next cursor through the 'X-Next-Cursor' and RFC 8288 'Link' headers.
+    Requested includes are dumped with the schema's Nested field of the same name.
+    """
+    try:
+        includes = nested_includes(schema, page.include)
+        schema = sparse_schema(schema, only=page.only, exclude=page.exclude)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if not isinstance(page.items, list):
+        return stream_response(schema, page.items, includes=includes)
+
+    response = jsonify(expand(includes, page.items, schema.dump(page.items)))
+    if page.next_cursor:
+        response.headers['X-Next-Cursor'] = page.next_cursor
+        args = request.args.to_dict()
+        args['cursor'] = page.next_cursor
+        response.headers['Link'] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+    return response
+
+
+def stream_response(schema, rows, chunk_size=None, includes=()):
+    """
+    Writes 'rows' as a JSON array incrementally: rows are serialized 'chunk_size' at a
+    time and dropped once written, so memory stays flat regardless of the row count.
+
+    Args:
+        schema: A many=True marshmallow schema.
+        rows: Any iterable of model instances, ideally a query with yield_per().
+        includes: Resolved includes (utils.includes.nested_includes), expanded per chunk.
+    """
+    chunk_size = chunk_size or current_app.config.get('STREAM_CHUNK_SIZE', 1000)
+    dumps = current_app.json.dumps
+
+    def encode(chunk):
+        data = expand(includes, chunk, schema.dump(chunk))
+        return ','.join(dumps(item, separators=(',', ':')) for item in data)
+
+    def generate():
+        yield '['
+        chunk, written = [], False
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield (',' if written else '') + encode(chunk)
+                chunk, written = [], True
+        if chunk:
+            yield (',' if written else '') + encode(chunk)
+        yield ']'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
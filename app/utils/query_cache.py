@@ -0,0 +1,129 @@
+# goji/app/utils/query_cache.py
+import threading
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.loading import merge_frozen_result
+from .cache import LRUCache
+from .table_versions import table_versions
+
+CACHE_OPTION = 'query_cache'
+
+
+def cached(query, *extra_tables):
+    """
+    Opts a Query/select() into the second-level cache.
+
+    Args:
+        query: The ORM query or statement to cache.
+        extra_tables: Names of tables the result also depends on that are not among
+                      the queried entities (e.g. joined-eager relationships).
+    """
+    return query.execution_options(**{CACHE_OPTION: tuple(extra_tables) or True})
+
+
+class QueryCache:
+    """
+    Opt-in second-level cache for ORM SELECTs (see 'cached').
+
+    Results are stored frozen, keyed by the compiled SQL and its parameters, and
+    merged into the caller's session on a hit. Every entry remembers the versions
+    of the tables it was read from (utils.table_versions) and is discarded as soon
+    as one of them changes; size and TTL are bounded by QUERY_CACHE_SIZE and
+    QUERY_CACHE_TTL (the TTL also bounds staleness from writes by other workers).
+
+    Streaming queries (yield_per) and sessions with uncommitted writes to the
+    queried tables always go to the database.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self._cache = LRUCache(maxsize=1024, ttl=300)
+        self._lock = threading.Lock()
+        self._listening = False
+        self._reset_metrics()
+
+    def init_app(self, app):
+        self.enabled = app.config.get('QUERY_CACHE_ENABLED', self.enabled)
+        self._cache.configure(
+            maxsize=app.config.get('QUERY_CACHE_SIZE'),
+            ttl=app.config.get('QUERY_CACHE_TTL'),
+        )
+        if not self._listening:
+            event.listen(Session, 'do_orm_execute', self._do_orm_execute)
+            self._listening = True
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        """Returns hit-rate, invalidation and eviction counters for monitoring."""
+        cache_stats = self._cache.stats()
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "size": cache_stats["size"],
+                "maxsize": cache_stats["maxsize"],
+                "ttl": cache_stats["ttl"],
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self._invalidations,
+                "bypassed": self._bypassed,
+                "evictions": cache_stats["evictions"],
+                "expirations": cache_stats["expirations"],
+            }
+
+    # =========================================================
+    # Session Event Handler
+    # =========================================================
+
+    def _do_orm_execute(self, orm_execute_state):
+        option = orm_execute_state.execution_options.get(CACHE_OPTION)
+        if not option or not self.enabled or not orm_execute_state.is_select:
+            return None
+
+        tables = {table.name for mapper in orm_execute_state.all_mappers for table in mapper.tables}
+        if isinstance(option, tuple):
+            tables.update(option)
+        session = orm_execute_state.session
+        if orm_execute_state.execution_options.get('yield_per') or table_versions.has_pending(session, tables):
+            self._count('_bypassed')
+            return None
+
+        key = self._key(orm_execute_state)
+        tables = tuple(sorted(tables))
+        version = table_versions.snapshot(*tables)
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] == version:
+            self._count('_hits')
+            frozen = entry[1]
+        else:
+            self._count('_misses')
+            if entry is not None:
+                self._count('_invalidations')
+            frozen = orm_execute_state.invoke_statement().freeze()
+            self._cache.set(key, (version, frozen))
+        return merge_frozen_result(session, orm_execute_state.statement, frozen, load=False)()
+
+    def _key(self, orm_execute_state):
+        statement = orm_execute_state.statement
+        compiled = statement.compile(dialect=orm_execute_state.session.get_bind().dialect)
+        params = dict(compiled.params)
+        if isinstance(orm_execute_state.parameters, dict):
+            params.update(orm_execute_state.parameters)
+        return compiled.string, repr(sorted(params.items()))
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _reset_metrics(self):
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._bypassed = 0
+
+
+# Singleton instance
+query_cache = QueryCache()
@@ -0,0 +1,338 @@
+# goji/app/utils/synthetic_data.py
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import select
+from ..extensions import db
+from ..organization.models import BusinessUnit, LegalEntity, FactoryCluster, Plant
+from ..master_data.models import Customer, CustomerLocation, Product, InternalProduct, Material, Operation, WorkCenter
+from ..process.models import (
+    Routing, RoutingOperation, OperationResource, BomItem, AlternateMaterial, LayerDefinition, LayerStructure
+)
+from ..demand.models import SalesOrder, SalesOrderLine, ForecastSet, ForecastLine
+from .bulk_import import insert_rows
+from .id_blocks import reserve_ids
+from .table_versions import table_versions
+
+# Synthetic HDI PCB data for 'flask seed --scale N' (N customers).
+# Everything is drawn from one seeded random.Random, so a scale and seed always give
+# the same rows. Rows are written with explicit ids (reserved up front) through
+# insert_rows(): COPY on PostgreSQL, one executemany per table elsewhere.
+
+PRODUCTS_PER_CUSTOMER = 20
+ORDERS_PER_CUSTOMER = 50
+FORECAST_WEEKS = 26
+CUSTOMERS_PER_CHUNK = 50   # customers generated and committed together
+BASE_DATE = date(2025, 1, 6)  # a Monday; order and forecast dates are relative to it
+
+# (code, name, minutes per panel)
+OPERATIONS = [
+    ('0001', '裁板', 0.5), ('0002', '线路前处理', 0.8), ('0003', 'LDI', 2.0), ('0004', 'DES', 1.2),
+    ('0005', 'AOI', 1.5), ('0006', 'VRS', 1.0), ('0007', '棕化', 0.8), ('0008', '叠板', 1.5),
+    ('0009', '压合', 15.0), ('0010', 'X-Ray钻靶', 0.6), ('0011', '压合后处理', 0.8), ('0012', '黑化', 0.8),
+    ('0013', '镭射钻孔', 5.0), ('0014', 'Plasma', 2.5), ('0015', '机械钻孔', 4.0), ('0016', '电镀前处理', 0.8),
+    ('0017', '水平电镀', 3.0), ('0018', 'VCP电镀', 8.0), ('0019', '防焊前处理', 0.8), ('0020', '印刷', 1.5),
+    ('0021', 'DI曝光', 2.0), ('0022', '防焊显影', 1.0), ('0023', '防焊后烤', 6.0), ('0024', '化金前处理', 0.8),
+    ('0025', '化金压膜', 1.0), ('0026', '化金曝光', 1.5), ('0027', '浸镍金', 10.0), ('0028', '化金显影', 1.0),
+    ('0029', '化金去膜', 0.8), ('0030', '捞型', 3.0), ('0031', '四线测试', 4.0), ('0032', 'AVI检查', 2.0),
+    ('0033', '包装', 0.5),
+]
+# Operations with two parallel work centers per plant
+TWIN_OPERATIONS = ('0003', '0009', '0013', '0015', '0018', '0031')
+
+# Route template: cutting and inner layer, one block per lamination stage, then finishing.
+# 2-4 stages with or without ENIG give 43-77 steps.
+CUTTING = ['0001']
+INNER_LAYER = ['0002', '0003', '0004', '0005', '0006']
+STAGE = ['0007', '0008', '0009', '0010', '0011', '0013', '0014', '0016', '0017', '0018', '0002', '0003', '0004', '0005']
+SOLDER_MASK = ['0019', '0020', '0021', '0022', '0023']
+ENIG = ['0024', '0025', '0026', '0027', '0028', '0029']
+FINISHING = ['0030', '0031', '0032', '0033']
+
+CCL_THICKNESS = ('0.050', '0.075', '0.100', '0.130')
+PREPREG_STYLES = ('106', '1078', '1080', '2116')
+COPPER_FOILS = ('12UM', '18UM')
+LAMINATE_VENDORS = ('ITEQ', 'TUC', 'EMC')
+FOIL_VENDORS = ('NANYA', 'CCP')
+# (part number, name, uom) of single-source consumables
+CONSUMABLES = [
+    ('RAW-DF-30UM', 'Dry Film 30um', 'SQMT'),
+    ('RAW-SM-GREEN', 'Solder Mask Ink Green', 'KG'),
+    ('RAW-AU-SALT', 'Potassium Gold Cyanide', 'G'),
+    ('RAW-CU-ANODE', 'Phosphorized Copper Anode', 'KG'),
+]
+PANEL_SQMT = Decimal('0.3111')  # 510 x 610 mm working panel
+
+CITIES = ('Shenzhen', 'Chongqing', 'Zhengzhou', 'Chengdu', 'Suzhou', 'Kunshan', 'Huai\'an', 'Taipei', 'Penang', 'Guadalajara')
+ORDER_STATUSES = ('Confirmed',) * 8 + ('Shipped', 'Cancelled')
+AUDIT_COLUMNS = ['created_at', 'updated_at', 'created_by_id', 'updated_by_id']
+
+
+def layer_stack(stages, layers):
+    """
+    Lamination build-up of a 'stages'-step HDI board with 'layers' layers.
+    Returns:
+        (cores, outputs): the 2-layer cores ('L04~05', ...) and the layer pair each
+        lamination stage produces, innermost first; the last stage yields the outer layers '0'.
+    """
+    inner_top, inner_bottom = stages + 1, layers - stages
+    cores = [f"L{top:02d}~{top + 1:02d}" for top in range(inner_top, inner_bottom, 2)]
+    outputs = [f"L{stages + 1 - stage:02d}~{layers - stages + stage:02d}" for stage in range(1, stages)] + ['0']
+    return cores, outputs
+
+
+class SyntheticDataGenerator:
+    """Generates 'scale' customers with products, routings, BOMs and demand (see module comment)."""
+
+    def __init__(self, scale, random_seed=42, created_by_id=None):
+        self.scale = scale
+        self.rng = random.Random(random_seed)
+        self.user_id = created_by_id
+        self.now = datetime.utcnow()
+        self.counts = {}
+
+    def run(self):
+        """Writes all rows. Returns: dict of rows inserted per table."""
+        self._reference_data()
+        for first in range(0, self.scale, CUSTOMERS_PER_CHUNK):
+            self._customers(range(first, min(first + CUSTOMERS_PER_CHUNK, self.scale)))
+            db.session.commit()
+        table_versions.bump(*self.counts)  # COPY is not seen by the session events
+        return self.counts
+
+    # =========================================================
+    # Writing
+    # =========================================================
+
+    def _write(self, model, columns, rows):
+        """Inserts tuples of 'columns' (the audit columns are appended) with their reserved ids."""
+        if not rows:
+            return
+        stamps = (self.now, self.now, self.user_id, self.user_id)
+        insert_rows(model.__table__, columns + AUDIT_COLUMNS, [row + stamps for row in rows])
+        self.counts[model.__tablename__] = self.counts.get(model.__tablename__, 0) + len(rows)
+
+    def _ids(self, model, count):
+        return reserve_ids(db.session, model.__table__, count)
+
+    def _ensure(self, model, key, columns, rows):
+        """Inserts the reference rows whose 'key' (first of 'columns') is missing. Returns {key: id}."""
+        key_column = getattr(model, key)
+        existing = dict(db.session.execute(select(key_column, model.id).where(key_column.in_([row[0] for row in rows]))).all())
+        missing = [row for row in rows if row[0] not in existing]
+        ids = self._ids(model, len(missing))
+        self._write(model, ['id'] + columns, [(new_id,) + row for new_id, row in zip(ids, missing)])
+        existing.update((row[0], new_id) for new_id, row in zip(ids, missing))
+        return existing
+
+    # =========================================================
+    # Reference Data
+    # =========================================================
+
+    def _reference_data(self):
+        plants = db.session.execute(select(Plant.id, Plant.name).order_by(Plant.id)).all()
+        if not plants:
+            plants = [self._plant()]
+        self.plants = plants
+
+        self.operations = self._ensure(Operation, 'code', ['code', 'name'], [(code, name) for code, name, _ in OPERATIONS])
+        self.minutes = {code: Decimal(str(minutes)) for code, _, minutes in OPERATIONS}
+
+        work_centers, names = [], {}  # names: {(plant id, operation code): [work center name, ...]}
+        for plant_id, plant_name in plants:
+            for code, name, _ in OPERATIONS:
+                for suffix in ('', '-2') if code in TWIN_OPERATIONS else ('',):
+                    oee = Decimal(self.rng.randint(70, 92)) / 100
+                    work_centers.append((f"{plant_name}-{code}{suffix}", plant_id, f"{name} line", 79200, oee))
+                    names.setdefault((plant_id, code), []).append(work_centers[-1][0])
+        wc_ids = self._ensure(WorkCenter, 'name', ['name', 'plant_id', 'description', 'daily_avail_sec', 'oee_pct'], work_centers)
+        self.work_centers = {key: [wc_ids[name] for name in wc_names] for key, wc_names in names.items()}
+
+        materials = []
+        for thickness in CCL_THICKNESS:
+            for vendor in LAMINATE_VENDORS:
+                materials.append((f"CCL-{vendor}-{thickness}", 'RAW', f"{vendor} CCL core {thickness}mm", 'SQMT'))
+        for style in PREPREG_STYLES:
+            for vendor in LAMINATE_VENDORS:
+                materials.append((f"PP-{vendor}-{style}", 'RAW', f"{vendor} prepreg {style}", 'SQMT'))
+        for foil in COPPER_FOILS:
+            for vendor in FOIL_VENDORS:
+                materials.append((f"CU-{vendor}-{foil}", 'RAW', f"{vendor} copper foil {foil}", 'SQMT'))
+        materials += [(part_num, 'RAW', name, uom) for part_num, name, uom in CONSUMABLES]
+        self.materials = self._ensure(Material, 'part_num', ['part_num', 'material_type', 'name', 'uom'], materials)
+
+        codes = {'0': '外层'}
+        for stages in (2, 3, 4):
+            for layers in (2 * stages + 2, 2 * stages + 4):
+                cores, outputs = layer_stack(stages, layers)
+                codes.update((code, code) for code in cores + outputs if code != '0')
+        self.layers = self._ensure(LayerDefinition, 'layer_code', ['layer_code', 'layer_name'], sorted(codes.items()))
+
+    def _plant(self):
+        """A minimal organization for an empty database. Returns: (plant id, name)."""
+        bu_id, le_id, cluster_id, plant_id = (self._ids(model, 1)[0] for model in (BusinessUnit, LegalEntity, FactoryCluster, Plant))
+        self._write(BusinessUnit, ['id', 'name'], [(bu_id, 'HDI')])
+        self._write(LegalEntity, ['id', 'name'], [(le_id, 'HDI Synthetic Ltd.')])
+        self._write(FactoryCluster, ['id', 'bu_id', 'legal_entity_id', 'name'], [(cluster_id, bu_id, le_id, 'HDI Park')])
+        self._write(Plant, ['id', 'cluster_id', 'name'], [(plant_id, cluster_id, 'SYN01')])
+        return plant_id, 'SYN01'
+
+    # =========================================================
+    # Customers, Products and Routings
+    # =========================================================
+
+    def _alternates(self, part_num):
+        """Same material from the other vendors, e.g. CCL-ITEQ-0.100 -> CCL-TUC-0.100, CCL-EMC-0.100."""
+        kind, vendor, spec = part_num.split('-', 2)
+        vendors = FOIL_VENDORS if kind == 'CU' else LAMINATE_VENDORS
+        return [self.materials[f"{kind}-{other}-{spec}"] for other in vendors if other != vendor]
+
+    def _customers(self, numbers):
+        rng = self.rng
+        customers, locations, products, internals = [], [], [], []
+        customer_ids = self._ids(Customer, len(numbers))
+        location_ids = iter(self._ids(CustomerLocation, 2 * len(numbers)))
+        product_ids = iter(self._ids(Product, PRODUCTS_PER_CUSTOMER * len(numbers)))
+        internal_ids = iter(self._ids(InternalProduct, PRODUCTS_PER_CUSTOMER * len(numbers)))
+        plans = []  # (customer id, [location ids], [(product id, internal product id, int part num, plant id, stages, layers)])
+        for customer_id, number in zip(customer_ids, numbers):
+            code = f"S{number + 1:05d}"
+            customers.append((customer_id, code, f"HDI Customer {number + 1:05d}"))
+            cities = rng.sample(CITIES, 2)
+            customer_locations = []
+            for index, city in enumerate(cities):
+                location_id = next(location_ids)
+                customer_locations.append(location_id)
+                locations.append((location_id, customer_id, city, f"{code}-{index + 1}", index == 0))
+            customer_products = []
+            for index in range(PRODUCTS_PER_CUSTOMER):
+                product_id, internal_id = next(product_ids), next(internal_ids)
+                stages = rng.choice((2, 2, 3, 3, 3, 4))
+                layers = 2 * stages + rng.choice((2, 4))
+                end_customer = rng.choice(customer_ids) if rng.random() < 0.1 else None
+                plant_id, _ = rng.choice(self.plants)
+                int_part_num = f"H{layers:02d}{stages}-{number + 1:05d}-{index + 1:02d}"
+                products.append((product_id, 'ACTIVE', customer_id, f"{code}-{index + 1:04d}-{rng.choice('ABC')}",
+                                 f"{stages}阶{layers}层板", end_customer))
+                internals.append((internal_id, product_id, plant_id, int_part_num, f"{stages}-stage {layers}-layer HDI", True))
+                customer_products.append((product_id, internal_id, int_part_num, plant_id, stages, layers))
+            plans.append((customer_id, customer_locations, customer_products))
+
+        self._write(Customer, ['id', 'code', 'name'], customers)
+        self._write(CustomerLocation, ['id', 'cust_id', 'loc_name', 'loc_code', 'is_default'], locations)
+        self._write(Product, ['id', 'product_status', 'cust_id', 'cust_part_num', 'description', 'end_cust_id'], products)
+        self._write(InternalProduct, ['id', 'product_id', 'plant_id', 'int_part_num', 'description', 'is_active'], internals)
+        self._routings([product for _, _, customer_products in plans for product in customer_products])
+        self._demand(plans)
+
+    def _routings(self, products):
+        rng = self.rng
+        routings, operations, structures, resources, bom_items, alternates = [], [], [], [], [], []
+        routing_ids = self._ids(Routing, len(products))
+        steps = []  # (routing id, product, [(operation code, layer code, semi part num)])
+        for routing_id, product in zip(routing_ids, products):
+            _, internal_id, int_part_num, plant_id, stages, layers = product
+            pcs_per_strip, strip_per_panel = rng.choice((4, 6, 8, 10)), rng.choice((2, 4, 6))
+            routings.append((routing_id, 'ACTIVE', internal_id, 'A', pcs_per_strip, strip_per_panel, True, True))
+
+            cores, outputs = layer_stack(stages, layers)
+            route = [(code, cores[0], None) for code in CUTTING + INNER_LAYER]
+            route[-1] = route[-1][:2] + (f"{int_part_num}-{cores[0]}",)
+            for output in outputs:
+                route += [(code, output, None) for code in STAGE]
+                if output != '0':
+                    route[-1] = route[-1][:2] + (f"{int_part_num}-{output}",)
+            finish = SOLDER_MASK + (ENIG if rng.random() < 0.6 else []) + FINISHING
+            route += [(code, '0', None) for code in finish]
+            steps.append((routing_id, product, pcs_per_strip * strip_per_panel, route))
+
+            level = 0
+            for index, core in enumerate(cores):
+                structures.append((routing_id, None, self.layers[core], index == 0, level))
+            for current, following in zip(cores[:1] + outputs, outputs):
+                level += 1
+                structures.append((routing_id, self.layers[current], self.layers[following], True, level))
+            for core in cores[1:]:
+                structures.append((routing_id, self.layers[core], self.layers[outputs[0]], False, 1))
+
+        op_ids = iter(self._ids(RoutingOperation, sum(len(route) for *_, route in steps)))
+        for routing_id, product, panel_pcs, route in steps:
+            plant_id, layers = product[3], product[5]
+            cores = len(layer_stack(product[4], layers)[0])
+            core_ccl = f"CCL-{rng.choice(LAMINATE_VENDORS)}-{rng.choice(CCL_THICKNESS)}"
+            prepreg = f"PP-{rng.choice(LAMINATE_VENDORS)}-{rng.choice(PREPREG_STYLES)}"
+            foil = f"CU-{rng.choice(FOIL_VENDORS)}-{rng.choice(COPPER_FOILS)}"
+            usage = {  # operation code -> [(part number, quantity per panel, scrap)]
+                '0001': [(core_ccl, PANEL_SQMT * cores, '0.03')],
+                '0003': [('RAW-DF-30UM', PANEL_SQMT * 2, '0.05')],
+                '0008': [(prepreg, PANEL_SQMT * 2, '0.02'), (foil, PANEL_SQMT * 2, '0.02')],
+                '0017': [('RAW-CU-ANODE', Decimal('0.0450'), '0.00')],
+                '0020': [('RAW-SM-GREEN', Decimal('0.0600'), '0.08')],
+                '0027': [('RAW-AU-SALT', Decimal('0.0120'), '0.00')],
+            }
+            for step_num, (code, layer_code, semi_part_num) in enumerate(route, start=1):
+                op_id = next(op_ids)
+                operations.append((op_id, routing_id, self.operations[code], step_num * 10, self.layers[layer_code],
+                                   semi_part_num, panel_pcs, Decimal('610'), Decimal('510')))
+                for pref_level, wc_id in enumerate(self.work_centers[(plant_id, code)], start=1):
+                    raw = (self.minutes[code] * Decimal(rng.randint(80, 120)) / 100).quantize(Decimal('0.01'))
+                    resources.append((op_id, wc_id, rng.choice((0, 600, 1200, 1800)), raw, 'min/panel', panel_pcs,
+                                      (raw * 60 / panel_pcs).quantize(Decimal('0.000001')), pref_level, True))
+                for part_num, quantity, scrap in usage.get(code, ()):
+                    bom_items.append((op_id, part_num, quantity.quantize(Decimal('0.0001')), scrap))
+
+        bom_ids = self._ids(BomItem, len(bom_items))
+        bom_rows = []
+        for bom_id, (op_id, part_num, quantity, scrap) in zip(bom_ids, bom_items):
+            uom = 'G' if part_num == 'RAW-AU-SALT' else 'KG' if part_num in ('RAW-CU-ANODE', 'RAW-SM-GREEN') else 'SQMT'
+            bom_rows.append((bom_id, op_id, self.materials[part_num], quantity, uom, Decimal(1), 'panel', Decimal(1), Decimal(scrap)))
+            if not part_num.startswith('RAW-'):
+                alternates += [(bom_id, alt_id, priority) for priority, alt_id in enumerate(self._alternates(part_num), start=1)]
+
+        self._write(Routing, ['id', 'routing_status', 'int_product_id', 'int_ver', 'pcs_per_strip', 'strip_per_panel',
+                              'is_default', 'is_active'], routings)
+        self._write(LayerStructure, ['routing_id', 'current_layer_id', 'next_layer_id', 'is_primary_branch', 'hierarchy_level'],
+                    structures)
+        self._write(RoutingOperation, ['id', 'routing_id', 'operation_id', 'step_num', 'layer_def_id', 'semi_part_num',
+                                       'workpiece_pcs', 'workpiece_len', 'workpiece_width'], operations)
+        self._write(OperationResource, ['routing_op_id', 'wc_id', 'setup_time_sec', 'raw_run_time_val', 'raw_run_time_uom',
+                                        'items_per_raw_uom', 'run_time_sec_per_pc', 'pref_level', 'is_active'], resources)
+        self._write(BomItem, ['id', 'routing_op_id', 'material_id', 'quantity', 'uom', 'base_qty', 'base_uom',
+                              'multiplier', 'scrap_pct'], bom_rows)
+        self._write(AlternateMaterial, ['bom_item_id', 'alt_material_id', 'priority'], alternates)
+
+    # =========================================================
+    # Demand
+    # =========================================================
+
+    def _demand(self, plans):
+        rng = self.rng
+        orders, lines, sets, forecast_lines = [], [], [], []
+        order_ids = iter(self._ids(SalesOrder, ORDERS_PER_CUSTOMER * len(plans)))
+        set_ids = self._ids(ForecastSet, len(plans))
+        for set_id, (customer_id, location_ids, products) in zip(set_ids, plans):
+            code = f"S{customer_id}"
+            for number in range(ORDERS_PER_CUSTOMER):
+                order_id = next(order_ids)
+                order_date = BASE_DATE - timedelta(days=rng.randint(0, 180))
+                orders.append((order_id, f"SO-{customer_id}-{number + 1:04d}", customer_id, rng.choice(location_ids),
+                               order_date, rng.choice(ORDER_STATUSES)))
+                for line_num in range(1, rng.randint(1, 4) + 1):
+                    requested = order_date + timedelta(days=rng.randint(14, 42))
+                    promised = requested + timedelta(days=rng.randint(0, 7)) if rng.random() < 0.7 else None
+                    lines.append((order_id, line_num, rng.choice(products)[0], Decimal(rng.choice((500, 1000, 2000, 5000, 10000))),
+                                  Decimal(rng.randint(50, 800)) / 100, requested, promised))
+
+            sets.append((set_id, customer_id, f"{code} weekly {BASE_DATE:%Y-%m-%d}", BASE_DATE, 'Weekly', 'Active'))
+            for product in products:
+                weekly = rng.randint(1, 50) * 100
+                for week in range(FORECAST_WEEKS):
+                    quantity = int(weekly * rng.uniform(0.6, 1.4)) // 100 * 100
+                    if quantity:
+                        forecast_lines.append((set_id, product[0], BASE_DATE + timedelta(weeks=week), Decimal(quantity)))
+
+        self._write(SalesOrder, ['id', 'order_num', 'cust_id', 'ship_to_loc_id', 'order_date', 'order_status'], orders)
+        self._write(SalesOrderLine, ['order_id', 'line_num', 'product_id', 'quantity', 'unit_price', 'req_ship_date',
+                                     'promised_ship_date'], lines)
+        self._write(ForecastSet, ['id', 'cust_id', 'set_name', 'submission_date', 'period_type', 'set_status'], sets)
+        self._write(ForecastLine, ['set_id', 'product_id', 'period_start_date', 'quantity'], forecast_lines)
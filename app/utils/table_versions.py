@@ -0,0 +1,107 @@
+# goji/app/utils/table_versions.py
+import threading
+from collections import defaultdict
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+_PENDING_KEY = '_goji_pending_table_bumps'
+
+class TableVersionRegistry:
+    """
+    Keeps a monotonically increasing version counter per database table.
+
+    Counters are bumped automatically from SQLAlchemy session events whenever
+    a flush or a DML statement touches a table, so in-process caches can key
+    their entries on the version of the tables they were built from and never
+    serve data that was changed in this process.
+
+    Note: The counters live in process memory. Multi-worker deployments should
+    pair them with a TTL on the cache side to bound cross-worker staleness.
+    """
+
+    def __init__(self):
+        self._versions = defaultdict(int)
+        self._lock = threading.Lock()
+        self._listening = False
+
+    def init_app(self, app):
+        """Registers the session listeners (once per process)."""
+        if self._listening:
+            return
+        event.listen(Session, 'after_flush', self._after_flush)
+        event.listen(Session, 'after_commit', self._after_commit)
+        event.listen(Session, 'after_rollback', self._after_rollback)
+        event.listen(Session, 'do_orm_execute', self._do_orm_execute)
+        self._listening = True
+
+    # =========================================================
+    # Public API
+    # =========================================================
+
+    def get(self, table_name) -> int:
+        return self._versions.get(table_name, 0)
+
+    def snapshot(self, *table_names) -> tuple:
+        """Returns the current versions of the given tables as a hashable key."""
+        return tuple(self._versions.get(name, 0) for name in table_names)
+
+    def has_pending(self, session, table_names) -> bool:
+        """True if 'session' has flushed but uncommitted writes to any of the tables."""
+        pending = session.info.get(_PENDING_KEY)
+        return bool(pending) and not pending.isdisjoint(table_names)
+
+    def bump(self, *table_names):
+        with self._lock:
+            for name in table_names:
+                self._versions[name] += 1
+
+    # =========================================================
+    # Session Event Handlers
+    # =========================================================
+
+    def _mark(self, session, tables):
+        if not tables:
+            return
+        # Bump right away so readers in this process stop trusting their caches,
+        # and again on commit so a reload that raced the transaction is discarded.
+        self.bump(*tables)
+        session.info.setdefault(_PENDING_KEY, set()).update(tables)
+
+    def _after_flush(self, session, flush_context):
+        tables = set()
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            state = inspect(obj)
+            mapper = state.mapper
+            tables.update(table.name for table in mapper.tables)
+
+            # Many-to-many collection changes are written to the secondary table.
+            for rel in mapper.relationships:
+                if rel.secondary is None:
+                    continue
+                if obj in session.deleted or state.attrs[rel.key].history.has_changes():
+                    tables.add(rel.secondary.name)
+        self._mark(session, tables)
+
+    def _after_commit(self, session):
+        pending = session.info.pop(_PENDING_KEY, None)
+        if pending:
+            self.bump(*pending)
+
+    def _after_rollback(self, session):
+        # Anything cached while the rolled-back writes were visible is stale too.
+        pending = session.info.pop(_PENDING_KEY, None)
+        if pending:
+            self.bump(*pending)
+
+    def _do_orm_execute(self, orm_execute_state):
+        # Covers Query.delete()/update() and Core DML such as user_roles.insert().
+        if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+            return
+        table = getattr(orm_execute_state.statement, 'table', None)
+        name = getattr(table, 'name', None)
+        if name:
+            self._mark(orm_execute_state.session, {name})
+
+
+# Singleton instance
+table_versions = TableVersionRegistry()
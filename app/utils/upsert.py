@@ -0,0 +1,171 @@
+# goji/app/utils/upsert.py
+from datetime import datetime
+from flask import current_app
+from marshmallow import ValidationError
+from sqlalchemy import bindparam, insert, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from ..extensions import db
+from .bulk_import import plain_schema
+from .includes import IN_CHUNK_SIZE
+from .table_versions import table_versions
+
+
+def _merge_sql(table, key, columns, update_columns, preparer):
+    """
+    Oracle 'MERGE' of one row of binds (:b0, :b1, ...) keyed on 'key'; run with executemany.
+    Returns:
+        tuple: (SQL string, {column: bind name})
+    """
+    quote = preparer.quote
+    binds = {column: f'b{index}' for index, column in enumerate(columns)}
+    source = ', '.join(f':{binds[column]} AS {quote(column)}' for column in columns)
+    assignments = ', '.join(f't.{quote(column)} = s.{quote(column)}' for column in update_columns)
+    sql = (
+        f"MERGE INTO {quote(table.name)} t "
+        f"USING (SELECT {source} FROM dual) s "
+        f"ON (t.{quote(key)} = s.{quote(key)}) "
+        f"WHEN MATCHED THEN UPDATE SET {assignments} "
+        f"WHEN NOT MATCHED THEN INSERT ({', '.join(quote(column) for column in columns)}) "
+        f"VALUES ({', '.join(f's.{quote(column)}' for column in columns)})"
+    )
+    return sql, binds
+
+
+class BulkUpserter:
+    """
+    Inserts or updates rows of one model by its natural key ('model.__natural_key__').
+
+    Rows are validated with the model's schema and processed UPSERT_BATCH_SIZE at a time:
+    the stored versions of the batch are read with one 'IN (...)' query per IN_CHUNK_SIZE
+    keys to tell inserted / updated / unchanged rows apart, and the new and changed rows
+    are written with a single executemany of
+        - 'MERGE INTO ... USING (SELECT ... FROM dual)' on Oracle,
+        - 'INSERT ... ON CONFLICT (key) DO UPDATE' on PostgreSQL and SQLite,
+        - plain INSERT / UPDATE statements on other dialects.
+    Unchanged rows are not written at all. Each batch is committed on its own.
+    """
+
+    def __init__(self, model, schema_cls, batch_size=None):
+        if not model.__natural_key__:
+            raise ValueError(f"{model.__name__} declares no natural key")
+        self.model = model
+        self.table = model.__table__
+        self.key = model.__natural_key__
+        self.schema = plain_schema(schema_cls)
+        self.batch_size = batch_size or current_app.config.get('UPSERT_BATCH_SIZE', 2000)
+        self.stamps = [name for name in ('created_at', 'updated_at') if name in self.table.c]
+
+    def run(self, records):
+        """
+        Upserts a list of dicts (as posted, before validation).
+        Returns:
+            dict: inserted/updated/unchanged/failed counts and per-row errors
+                  ({'index': position in 'records', 'errors': {...}}).
+        """
+        report = {"model": self.model.__name__, "total": len(records),
+                  "inserted": 0, "updated": 0, "unchanged": 0, "failed": 0, "errors": []}
+        seen = set()
+        for start in range(0, len(records), self.batch_size):
+            self._upsert_batch(records[start:start + self.batch_size], start, seen, report)
+        return report
+
+    # =========================================================
+    # Batch Steps
+    # =========================================================
+
+    def _fail(self, report, index, errors):
+        report["failed"] += 1
+        report["errors"].append({"index": index, "errors": errors})
+
+    def _upsert_batch(self, batch, offset, seen, report):
+        try:
+            loaded, errors = self.schema.load(batch), {}
+        except ValidationError as err:
+            loaded, errors = err.valid_data, err.messages
+
+        rows = []
+        for index, record in enumerate(loaded):
+            if index in errors:
+                self._fail(report, offset + index, errors[index])
+            elif record[self.key] in seen:
+                # One statement may not touch the same row twice (ORA-30926 / ON CONFLICT)
+                self._fail(report, offset + index, {self.key: ["Duplicate key in payload."]})
+            else:
+                seen.add(record[self.key])
+                rows.append(record)
+
+        stored = self._stored(rows)
+        now = datetime.utcnow()
+        inserts, updates = [], []
+        for record in rows:
+            current = stored.get(record[self.key])
+            if current is None:
+                inserts.append(record)
+            elif any(current[column] != value for column, value in record.items()):
+                updates.append(record)
+            else:
+                report["unchanged"] += 1
+        if not inserts and not updates:
+            return
+
+        # Every row carries both stamps so inserts and updates share one statement;
+        # created_at is only written by the insert branch.
+        self._write(
+            [dict(record, **{name: now for name in self.stamps}) for record in inserts],
+            [dict(record, **{name: now for name in self.stamps}) for record in updates],
+        )
+        db.session.commit()
+        table_versions.bump(self.table.name)  # MERGE text is not seen by the session events
+        report["inserted"] += len(inserts)
+        report["updated"] += len(updates)
+
+    def _stored(self, rows):
+        """{key: {column: value}} of the batch's rows already in the table."""
+        columns = sorted({column for record in rows for column in record})
+        key = self.table.c[self.key]
+        keys = [record[self.key] for record in rows]
+        stored = {}
+        for start in range(0, len(keys), IN_CHUNK_SIZE):
+            query = select(*(self.table.c[column] for column in columns)).where(key.in_(keys[start:start + IN_CHUNK_SIZE]))
+            for row in db.session.execute(query).mappings():
+                stored[row[self.key]] = row
+        return stored
+
+    def _write(self, inserts, updates):
+        dialect = db.session.get_bind().dialect
+        if dialect.name not in ('oracle', 'postgresql', 'sqlite'):
+            for columns, records in _by_columns(inserts):
+                db.session.execute(insert(self.table), records)
+            for columns, records in _by_columns(updates):
+                statement = (
+                    update(self.table)
+                    .where(self.table.c[self.key] == bindparam('_key'))
+                    .values({column: bindparam(f'_{column}') for column in columns if column not in (self.key, 'created_at')})
+                )
+                db.session.execute(statement, [
+                    {'_key': record[self.key], **{f'_{column}': value for column, value in record.items()}}
+                    for record in records
+                ])
+            return
+
+        for columns, records in _by_columns(inserts + updates):
+            update_columns = [column for column in columns if column not in (self.key, 'created_at')]
+            if dialect.name == 'oracle':
+                sql, binds = _merge_sql(self.table, self.key, columns, update_columns, dialect.identifier_preparer)
+                db.session.execute(text(sql), [{binds[column]: record[column] for column in columns} for record in records])
+                continue
+            dialect_insert = postgresql.insert if dialect.name == 'postgresql' else sqlite.insert
+            statement = dialect_insert(self.table)
+            statement = statement.on_conflict_do_update(
+                index_elements=[self.table.c[self.key]],
+                set_={column: statement.excluded[column] for column in update_columns},
+            )
+            db.session.execute(statement, records)
+
+
+def _by_columns(records):
+    """Groups dicts by their key set; an executemany needs the same columns in every row."""
+    groups = {}
+    for record in records:
+        groups.setdefault(tuple(sorted(record)), []).append(record)
+    return groups.items()
@@ -10,6 +10,72 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'a-very-secure-and-long-secret-key-that-you-must-change')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=8)
 
+    # Effective permission cache used by 'permission_required'.
+    # Entries are invalidated in-process on any role/permission write; the TTL
+    # bounds how long another worker process may serve an outdated grant.
+    PERMISSION_CACHE_SIZE = 4096
+    PERMISSION_CACHE_TTL = 300 # seconds
+    # Embed the permission id list and a permission epoch in access tokens so
+    # guarded requests authorize from the claims alone. The epoch fingerprints the
+    # role/permission tables, so it is shared by all workers and survives restarts;
+    # tokens whose epoch is stale (permissions changed since) fall back to the cache.
+    JWT_PERMISSION_CLAIMS = os.environ.get('JWT_PERMISSION_CLAIMS', 'false').lower() == 'true'
+    PERMISSION_EPOCH_TTL = 30 # seconds until writes by another worker retire old epochs here
+
+    # bcrypt cost factor; stored hashes with a different cost are upgraded on the next login.
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+    # Bounded worker pool for password verification (size it with 'flask bench-login').
+    PASSWORD_POOL_SIZE = int(os.environ.get('PASSWORD_POOL_SIZE', os.cpu_count() or 4))
+    PASSWORD_POOL_MAX_QUEUE = int(os.environ.get('PASSWORD_POOL_MAX_QUEUE', 64))
+    PASSWORD_VERIFY_TIMEOUT = 10 # seconds
+
+    # Login brute-force throttling (sliding window per username and, optionally, per client IP)
+    LOGIN_MAX_ATTEMPTS = 5
+    # The per-IP limit is off by default: behind a proxy or NAT all clients share one address.
+    LOGIN_IP_THROTTLE = os.environ.get('LOGIN_IP_THROTTLE', 'false').lower() == 'true'
+    LOGIN_IP_MAX_ATTEMPTS = 50
+    # Number of trusted reverse proxies setting X-Forwarded-For (0 = use the socket address)
+    PROXY_FIX_X_FOR = int(os.environ.get('PROXY_FIX_X_FOR', 0))
+    LOGIN_WINDOW_SEC = 300
+    LOGIN_LOCKOUT_SEC = 900
+    LOGIN_THROTTLE_MAX_KEYS = 100000
+
+    # Token revocation: revocations from other workers apply within this many seconds
+    REVOCATION_SYNC_SEC = 30
+    # Keyset pagination for list endpoints, opt-in through '?limit=' or '?cursor=' (without
+    # either the full list is returned). '?limit=' is capped at the maximum; the default
+    # applies to a '?cursor=' without '?limit='.
+    PAGINATION_DEFAULT_LIMIT = 100
+    PAGINATION_MAX_LIMIT = 1000
+    # '?stream=1' full dumps: rows fetched and serialized per chunk
+    STREAM_CHUNK_SIZE = 1000
+    # '?filter=' on unindexed columns only (or 'contains') is rejected above this many rows
+    FILTER_SCAN_MAX_ROWS = 10000
+    # Opt-in second-level cache for reference data queries (see utils/query_cache.py)
+    QUERY_CACHE_ENABLED = True
+    QUERY_CACHE_SIZE = 1024
+    QUERY_CACHE_TTL = 60 # seconds; bounds staleness from writes by other workers
+    # CSV/XLSX bulk import: rows validated and inserted per batch (one commit each)
+    BULK_IMPORT_BATCH_SIZE = 1000
+    BULK_IMPORT_MAX_ERRORS = 1000 # row errors listed in the report; 'failed' still counts all
+    # Natural-key upserts (ERP sync): rows per MERGE / ON CONFLICT executemany
+    UPSERT_BATCH_SIZE = 2000
+    # POST /api/demand/sales-orders/batch: orders accepted per request
+    SALES_ORDER_BATCH_MAX = 1000
+    # Oracle: assign primary keys from sequence blocks in the application (hi/lo) instead of
+    # the per-row triggers. Switch the sequences first (utils/oracle11g_switch_to_id_blocks_template.py).
+    ORACLE_ID_BLOCKS = os.environ.get('ORACLE_ID_BLOCKS', 'false').lower() == 'true'
+    # Audit log: changes to AuditMixin models are captured at flush and written on commit
+    # by a background writer in multi-row inserts (see app/system/audit.py)
+    AUDIT_CAPTURE = True
+    AUDIT_ASYNC = True
+    AUDIT_QUEUE_SIZE = 10000
+    AUDIT_BATCH_SIZE = 500
+    AUDIT_FLUSH_INTERVAL = 1.0 # seconds
+    AUDIT_ENQUEUE_TIMEOUT = 0.5 # seconds a committing request waits on a full queue before writing itself
+    # 'flask archive-audit-logs' moves older rows into monthly gj_audit_logs_YYYYMM tables
+    AUDIT_RETENTION_DAYS = 180
+
     # Set a unique name for the migration version table for this project.
     MIGRATE_VERSION_TABLE = 'gj_alembic_version'
 
@@ -53,6 +119,8 @@ class TestingConfig(Config):
     SQLALCHEMY_TRACK_MODIFICATIONS = False # Ensure this is also False for tests
     JWT_SECRET_KEY = 'a-test-secret-key-that-is-not-secure' # Test JWT key
     FRONTEND_URL = 'http://localhost:3000'
+    BCRYPT_LOG_ROUNDS = 4 # Minimum cost keeps the test suite fast
+    AUDIT_ASYNC = False # Audit entries are written at commit, so tests can assert on them
     # You might want to disable other features that are not needed for tests
     # DEBUG = False # Usually False for tests, though not strictly necessary
 
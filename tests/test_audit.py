@@ -0,0 +1,55 @@
+# goji/tests/test_audit.py
+
+import json
+import logging
+from app.system.audit import audit_writer
+from app.extensions import db as app_db
+
+# --- Test Audit Capture ---
+
+def test_audit_log_captures_committed_changes(client, db_session):
+    """Changes to audited models are logged on commit with their diff; rolled back changes are not."""
+    from app.master_data.models import Customer
+    from app.system.models import AuditLog
+    customer = Customer(code='AUDIT', name='Before')
+    app_db.session.add(customer)
+    app_db.session.commit()
+    customer.name = 'After'
+    app_db.session.commit()
+    customer.name = 'Discarded'
+    app_db.session.flush()
+    app_db.session.rollback()
+
+    logs = AuditLog.query.filter_by(table_name='gj_customers', record_id=customer.id).order_by(AuditLog.id).all()
+    assert [log.action_type for log in logs] == ['CREATE', 'UPDATE']
+    assert json.loads(logs[1].before_value) == {'name': 'Before'}
+    assert json.loads(logs[1].after_value) == {'name': 'After'}
+
+# --- Test Audit Writer ---
+
+def test_audit_writer_logs_and_counts_dropped_batches(app, caplog):
+    """A batch that cannot be written is logged through the app logger and counted, not raised."""
+    before = audit_writer.stats()
+    with caplog.at_level(logging.ERROR, logger=app.logger.name):
+        audit_writer._write([{'no_such_column': 1}])
+    after = audit_writer.stats()
+    assert after['dropped_batches'] == before['dropped_batches'] + 1
+    assert after['failed'] == before['failed'] + 1
+    assert "Failed to write 1 audit log entries" in caplog.text
+
+# --- Test Audit Archive ---
+
+def test_archive_audit_logs_by_month(client, db_session):
+    """Rows past the cutoff move into monthly archive tables; newer rows stay in the hot table."""
+    from datetime import datetime
+    from sqlalchemy import text
+    from app.system.models import AuditLog
+    from app.system.services import system_service
+    app_db.session.add_all([AuditLog(action_type='ARCHIVE', table_name='gj_test', record_id=day, timestamp=datetime(2023, 5, day))
+                            for day in (1, 2, 30)] + [AuditLog(action_type='ARCHIVE', table_name='gj_test', record_id=0, timestamp=datetime(2023, 6, 20))])
+    app_db.session.commit()
+
+    moved = system_service.archive_audit_logs(datetime(2023, 6, 15))
+    assert moved == [{"table": "gj_audit_logs_202305", "rows": 3}]
+    assert AuditLog.query.filter_by(action_type='ARCHIVE').count() == 1
+    assert app_db.session.execute(text("SELECT COUNT(*) FROM gj_audit_logs_202305")).scalar() == 3
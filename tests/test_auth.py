@@ -375,4 +375,161 @@ def test_confirm_password_reset_expired_token(client, db_session):
 
     # 3. Verify that the expired token was deleted
     expired_token_entry = PasswordResetToken.query.filter_by(token=expired_token).first()
-    assert expired_token_entry is None
\ No newline at end of file
+    assert expired_token_entry is None
+
+# --- Test Permission Claims ---
+
+def test_login_embeds_permission_claims(app, client, db_session):
+    """With JWT_PERMISSION_CLAIMS enabled, tokens carry the permission ids and epoch."""
+    from flask_jwt_extended import decode_token
+    from app.user_management.permissions import permission_cache, PermissionCache
+
+    target_user = User(username='claimtarget', full_name='Claim Target', email='claimtarget@test.com')
+    target_user.set_password('targetpass')
+    db_session.add(target_user)
+    db_session.commit()
+
+    app.config['JWT_PERMISSION_CLAIMS'] = True
+    try:
+        login_payload = {"username": "testadmin", "password": "testpassword"}
+        login_response = client.post(f"{BASE_URL}/login", json=login_payload)
+        assert login_response.status_code == 200
+        access_token = json.loads(login_response.data)["access_token"]
+
+        claims = decode_token(access_token)
+        assert claims["pv"] == permission_cache.epoch
+        assert len(claims["perms"]) >= 1
+        # Another worker (a fresh cache) derives the same epoch from the database
+        assert PermissionCache().epoch == claims["pv"]
+
+        # Claims alone authorize the admin-only endpoint (epoch still current)
+        headers = {"Authorization": f"Bearer {access_token}"}
+        response = client.post(f"{BASE_URL}/admin/password/reset/request", json={"user_id": target_user.id}, headers=headers)
+        assert response.status_code == 200
+    finally:
+        app.config['JWT_PERMISSION_CLAIMS'] = False
+
+
+# --- Test Password Hash Upgrade ---
+
+def test_login_upgrades_outdated_password_hash(app, client, db_session):
+    """A hash made with a different bcrypt cost is re-hashed on successful login."""
+    from app.extensions import bcrypt
+    from app.user_management.passwords import hash_cost
+
+    legacy_user = User(username='legacyhash', full_name='Legacy Hash', email='legacyhash@test.com')
+    legacy_user.password_hash = bcrypt.generate_password_hash('legacypass', rounds=5).decode('utf-8')
+    db_session.add(legacy_user)
+    db_session.commit()
+
+    response = client.post(f"{BASE_URL}/login", json={"username": "legacyhash", "password": "legacypass"})
+    assert response.status_code == 200
+
+    user = User.query.filter_by(username='legacyhash').first()
+    assert hash_cost(user.password_hash) == app.config['BCRYPT_LOG_ROUNDS']
+    assert user.check_password('legacypass')
+
+
+def test_login_verification_timeout_returns_503(client, db_session, monkeypatch):
+    """A verification that outlives PASSWORD_VERIFY_TIMEOUT is reported as a busy pool, not a 500."""
+    import time
+    from app.extensions import bcrypt
+    from app.user_management.passwords import password_verifier
+
+    def slow_check(password_hash, password):
+        time.sleep(0.2)
+        return True
+
+    monkeypatch.setattr(password_verifier, 'timeout', 0.01)
+    monkeypatch.setattr(bcrypt, 'check_password_hash', slow_check)
+    response = client.post(f"{BASE_URL}/login", json={"username": "testadmin", "password": "testpassword"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+# --- Test Login Throttling ---
+
+def test_login_throttled_after_repeated_failures(app, client, db_session):
+    """After LOGIN_MAX_ATTEMPTS failures, even the right password is rejected with 429."""
+    throttled_user = User(username='throttleduser', full_name='Throttled User', email='throttled@test.com')
+    throttled_user.set_password('rightpassword')
+    db_session.add(throttled_user)
+    db_session.commit()
+
+    for _ in range(app.config['LOGIN_MAX_ATTEMPTS']):
+        response = client.post(f"{BASE_URL}/login", json={"username": "throttleduser", "password": "wrongpassword"})
+        assert response.status_code == 401
+
+    response = client.post(f"{BASE_URL}/login", json={"username": "throttleduser", "password": "rightpassword"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    data = json.loads(response.data)
+    assert "Too many failed login attempts" in data["msg"]
+
+
+def test_login_ip_throttle_is_opt_in(app, client, db_session, monkeypatch):
+    """Failures from one address only lock that address out when LOGIN_IP_THROTTLE is on."""
+    from app.apis.throttle import login_throttle
+    monkeypatch.setattr(login_throttle, 'ip_max_attempts', 2)
+    environ = {"REMOTE_ADDR": "10.9.8.7"}
+    for name in ("natuser1", "natuser2"):
+        client.post(f"{BASE_URL}/login", json={"username": name, "password": "wrong"}, environ_base=environ)
+    response = client.post(f"{BASE_URL}/login", json={"username": "testadmin", "password": "testpassword"}, environ_base=environ)
+    assert response.status_code == 200
+
+    monkeypatch.setattr(login_throttle, 'ip_enabled', True)
+    for name in ("natuser3", "natuser4"):
+        client.post(f"{BASE_URL}/login", json={"username": name, "password": "wrong"}, environ_base=environ)
+    response = client.post(f"{BASE_URL}/login", json={"username": "testadmin", "password": "testpassword"}, environ_base=environ)
+    assert response.status_code == 429
+
+
+# --- Test Token Revocation ---
+
+def test_logout_revokes_token(client, db_session):
+    """A token used to log out is rejected afterwards."""
+    login_payload = {"username": "testadmin", "password": "testpassword"}
+    login_response = client.post(f"{BASE_URL}/login", json=login_payload)
+    access_token = json.loads(login_response.data)["access_token"]
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    assert client.post(f"{BASE_URL}/logout", headers=headers).status_code == 200
+
+    response = client.get(f"{BASE_URL}/me", headers=headers)
+    assert response.status_code == 401
+    data = json.loads(response.data)
+    assert "Token has been revoked" in data["msg"]
+
+def test_deactivated_user_tokens_are_revoked(client, db_session):
+    """Deactivating a user invalidates the tokens they already hold."""
+    from app.user_management.services import user_service
+
+    doomed_user = User(username='doomeduser', full_name='Doomed User', email='doomed@test.com')
+    doomed_user.set_password('doomedpass')
+    db_session.add(doomed_user)
+    db_session.commit()
+
+    login_response = client.post(f"{BASE_URL}/login", json={"username": "doomeduser", "password": "doomedpass"})
+    headers = {"Authorization": f"Bearer {json.loads(login_response.data)['access_token']}"}
+    assert client.get(f"{BASE_URL}/me", headers=headers).status_code == 200
+
+    user_service.update_user(doomed_user.id, {"is_active": False})
+
+    assert client.get(f"{BASE_URL}/me", headers=headers).status_code == 401
+
+def test_rolled_back_revocation_leaves_tokens_valid(client, db_session):
+    """A revocation that is rolled back never reaches the in-memory watermarks."""
+    from app.apis.revocation import revocation_list
+
+    kept_user = User(username='keptuser', full_name='Kept User', email='kept@test.com')
+    kept_user.set_password('keptpass')
+    db_session.add(kept_user)
+    db_session.commit()
+
+    login_response = client.post(f"{BASE_URL}/login", json={"username": "keptuser", "password": "keptpass"})
+    headers = {"Authorization": f"Bearer {json.loads(login_response.data)['access_token']}"}
+    revocation_list.revoke_user_tokens(kept_user, commit=False)
+    db_session.rollback()
+
+    revocation_list.sync()
+    assert client.get(f"{BASE_URL}/me", headers=headers).status_code == 200
@@ -0,0 +1,77 @@
+# goji/tests/test_demand.py
+
+import io
+import json
+from app.master_data.models import Customer, Product
+from app.demand.models import ForecastSet, ForecastLine
+from app.extensions import db as app_db
+
+BASE_URL = "/api"
+
+# --- Test Forecast Upload ---
+
+def test_forecast_matrix_upload(client, db_session):
+    """A product x week CSV is unpivoted into forecast lines; part numbers resolve in one lookup."""
+    customer = Customer(code='FCST', name='Forecast Customer')
+    app_db.session.add(customer)
+    app_db.session.commit()
+    app_db.session.add_all([Product(cust_id=customer.id, cust_part_num=f'FCST-{i}') for i in range(2)])
+    app_db.session.commit()
+
+    matrix = "cust_part_num,2025-01-06,2025-01-13\nFCST-0,10,12.5\nFCST-1,,4\n"
+    response = client.post("/api/demand/forecasts/upload",
+                           data={'file': (io.BytesIO(matrix.encode('utf-8')), 'forecast.csv'),
+                                 'set_name': 'W01', 'submission_date': '2025-01-01',
+                                 'period_type': 'Weekly', 'cust_id': str(customer.id)},
+                           content_type='multipart/form-data')
+    assert response.status_code == 201
+    result = json.loads(response.data)
+    assert result['lines'] == 3
+    assert ForecastLine.query.filter_by(set_id=result['forecast_set']['id']).count() == 3
+
+def test_forecast_upload_rejects_repeated_part_number(client, db_session):
+    """A part number listed on two rows is a row error, and nothing is imported."""
+    customer = Customer(code='FCDUP', name='Forecast Duplicates')
+    app_db.session.add(customer)
+    app_db.session.commit()
+    app_db.session.add(Product(cust_id=customer.id, cust_part_num='FCDUP-0'))
+    app_db.session.commit()
+
+    matrix = "cust_part_num,2025-01-06\nFCDUP-0,10\nFCDUP-X,3\nFCDUP-0,7\n"
+    response = client.post(f"{BASE_URL}/demand/forecasts/upload",
+                           data={'file': (io.BytesIO(matrix.encode('utf-8')), 'forecast.csv'),
+                                 'set_name': 'FCDUP-W01', 'submission_date': '2025-01-01',
+                                 'period_type': 'Weekly', 'cust_id': str(customer.id)},
+                           content_type='multipart/form-data')
+    assert response.status_code == 400
+    errors = {error['row']: error['errors'] for error in json.loads(response.data)['errors']}
+    assert set(errors) == {3, 4}
+    assert 'row 2' in json.dumps(errors[4])
+    assert ForecastSet.query.filter_by(set_name='FCDUP-W01').count() == 0
+
+# --- Test Batch Sales Orders ---
+
+def test_batch_sales_orders(client, db_session):
+    """Batch orders resolve codes in bulk; an invalid order is reported without blocking the others."""
+    from app.master_data.models import Customer, CustomerLocation, Product
+    from app.demand.models import SalesOrder, SalesOrderLine
+    customer = Customer(code='EDI', name='EDI Customer')
+    app_db.session.add(customer)
+    app_db.session.commit()
+    app_db.session.add_all([CustomerLocation(cust_id=customer.id, loc_name='Dock', loc_code='DOCK'),
+                            Product(cust_id=customer.id, cust_part_num='EDI-P')])
+    app_db.session.commit()
+
+    header = {'cust_code': 'EDI', 'ship_to_loc_code': 'DOCK', 'order_date': '2025-03-01'}
+    orders = [
+        dict(header, order_num='EDI-1', lines=[{'cust_part_num': 'EDI-P', 'quantity': 5},
+                                               {'cust_part_num': 'EDI-P', 'quantity': 7}]),
+        dict(header, order_num='EDI-2', lines=[{'cust_part_num': 'UNKNOWN', 'quantity': 1}]),
+    ]
+    response = client.post("/api/demand/sales-orders/batch", json=orders)
+    assert response.status_code == 200
+    result = json.loads(response.data)
+    assert [r['status'] for r in result['results']] == ['created', 'failed']
+    assert 'cust_part_num' in result['results'][1]['errors']['lines']['0']
+    order = SalesOrder.query.filter_by(order_num='EDI-1').one()
+    assert SalesOrderLine.query.filter_by(order_id=order.id).count() == 2
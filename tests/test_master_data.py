@@ -0,0 +1,147 @@
+# goji/tests/test_master_data.py
+
+import pytest
+import json
+from app.master_data.models import Customer
+from app.extensions import db as app_db
+
+BASE_URL = "/api"
+
+def _login(client, username, password):
+    response = client.post(f"{BASE_URL}/auth/login", json={"username": username, "password": password})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {json.loads(response.data)['access_token']}"}
+
+# --- Test Conditional GET ---
+
+def test_customer_list_conditional_get(client, db_session):
+    """A matching ETag gets 304 until a row changes or is deleted; If-Modified-Since alone never does."""
+    doomed = Customer(code='ETAG1', name='ETag One')
+    app_db.session.add_all([doomed, Customer(code='ETAG2', name='ETag Two')])
+    app_db.session.commit()
+
+    first = client.get(f"{BASE_URL}/customers")
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert client.get(f"{BASE_URL}/customers", headers={'If-None-Match': etag}).status_code == 304
+
+    doomed.name = 'ETag Renamed'
+    app_db.session.commit()
+    changed = client.get(f"{BASE_URL}/customers", headers={'If-None-Match': etag})
+    assert changed.status_code == 200 and changed.headers['ETag'] != etag
+
+    etag, last_modified = changed.headers['ETag'], changed.headers['Last-Modified']
+    app_db.session.delete(doomed)
+    app_db.session.commit()
+    deleted = client.get(f"{BASE_URL}/customers", headers={'If-None-Match': etag})
+    assert deleted.status_code == 200
+    assert 'ETAG1' not in {customer['code'] for customer in json.loads(deleted.data)}
+    assert client.get(f"{BASE_URL}/customers", headers={'If-Modified-Since': last_modified}).status_code == 200
+
+# --- Test Fast Read Path ---
+
+def test_fast_read_path_matches_schema_output(app, client, db_session):
+    """The column-row material list is byte-identical to the marshmallow + jsonify output."""
+    import decimal
+    from flask import jsonify
+    from app.master_data.models import Material
+    from app.master_data.schemas import MaterialSchema
+    admin_headers = _login(client, "testadmin", "testpassword")
+    app_db.session.add_all([
+        Material(part_num='FAST-1', material_type='RAW', uom='EA', name='Stahl ü', length=decimal.Decimal('1.5')),
+        Material(part_num='FAST-2', material_type='RAW', uom='KG', thickness=decimal.Decimal('0.00001')),
+    ])
+    app_db.session.commit()
+
+    expected = jsonify(MaterialSchema(many=True).dump(Material.query.order_by(Material.id).all())).get_data()
+    response = client.get("/api/materials", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.get_data() == expected
+
+# --- Test Include Expansion ---
+
+def test_include_expansion_batches_related_rows(client, db_session):
+    """'?include=' embeds related objects, loading every referenced customer in one query."""
+    from sqlalchemy import event
+    from app.master_data.models import Customer, Product
+    admin_headers = _login(client, "testadmin", "testpassword")
+    owner, end = Customer(code='INC-A', name='Owner'), Customer(code='INC-B', name='End')
+    app_db.session.add_all([owner, end])
+    app_db.session.commit()
+    app_db.session.add_all([
+        Product(cust_id=owner.id, cust_part_num=f'INC-{i}', end_cust_id=end.id if i % 2 else None)
+        for i in range(4)
+    ])
+    app_db.session.commit()
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(app_db.engine, 'before_cursor_execute', listener)
+    try:
+        response = client.get(f"{BASE_URL}/products?filter=cust_part_num:startswith:INC-"
+                              "&include=customer,end_customer", headers=admin_headers)
+    finally:
+        event.remove(app_db.engine, 'before_cursor_execute', listener)
+    assert response.status_code == 200
+    products = json.loads(response.data)
+    assert [p['customer']['code'] for p in products] == ['INC-A'] * 4
+    assert [p['end_customer'] and p['end_customer']['code'] for p in products] == [None, 'INC-B'] * 2
+    assert len([s for s in statements if 'FROM gj_customers' in s]) == 1
+
+    response = client.get(f"{BASE_URL}/products?include=supplier", headers=admin_headers)
+    assert response.status_code == 400
+
+# --- Test Bulk Import ---
+
+def test_bulk_import_requires_permission(client, db_session):
+    """Bulk import needs a token carrying 'master_data:import'."""
+    import io
+    from app.user_management.models import User
+    clerk = User(username='importclerk', full_name='Import Clerk', email='importclerk@test.com')
+    clerk.set_password('clerkpass')
+    app_db.session.add(clerk)
+    app_db.session.commit()
+
+    def upload(headers=None):
+        data = {'file': (io.BytesIO(b"part_num,material_type,uom\nGUARD-1,RAW,EA\n"), 'materials.csv')}
+        return client.post(f"{BASE_URL}/materials/import", data=data, content_type='multipart/form-data', headers=headers)
+
+    assert upload().status_code == 401
+    assert upload(_login(client, "importclerk", "clerkpass")).status_code == 403
+
+def test_bulk_import_reports_invalid_rows(client, db_session):
+    """CSV import inserts the valid rows in one batch and lists the others with their errors."""
+    import io
+    from app.master_data.models import Material
+    csv_data = (
+        "part_num,material_type,uom,length\n"
+        "IMP-1,RAW,EA,1.5\n"
+        "IMP-2,,EA,\n"
+        "IMP-1,RAW,EA,\n"
+        "IMP-3,SEMI,KG,\n"
+    )
+    response = client.post(f"{BASE_URL}/materials/import",
+                           data={'file': (io.BytesIO(csv_data.encode('utf-8')), 'materials.csv')},
+                           content_type='multipart/form-data', headers=_login(client, "testadmin", "testpassword"))
+    assert response.status_code == 200
+    report = json.loads(response.data)
+    assert (report['total'], report['inserted'], report['failed']) == (4, 2, 2)
+    assert [error['row'] for error in report['errors']] == [3, 4]
+    assert Material.query.filter(Material.part_num.in_(['IMP-1', 'IMP-3'])).count() == 2
+
+# --- Test Natural-Key Upsert ---
+
+def test_customer_upsert_by_natural_key(client, db_session):
+    """Upserts keyed on Customer.code report inserted, updated and unchanged rows."""
+    from app.master_data.models import Customer
+    admin_headers = _login(client, "testadmin", "testpassword")
+    assert client.post(f"{BASE_URL}/customers/upsert", json=[]).status_code == 401
+    rows = [{'code': 'UPS-1', 'name': 'One'}, {'code': 'UPS-2', 'name': 'Two'}]
+    report = json.loads(client.post(f"{BASE_URL}/customers/upsert", json=rows, headers=admin_headers).data)
+    assert (report['inserted'], report['updated'], report['unchanged']) == (2, 0, 0)
+
+    rows[1]['name'] = 'Two (renamed)'
+    rows.append({'code': 'UPS-3', 'name': 'Three'})
+    report = json.loads(client.post(f"{BASE_URL}/customers/upsert", json=rows, headers=admin_headers).data)
+    assert (report['inserted'], report['updated'], report['unchanged']) == (1, 1, 1)
+    assert Customer.query.filter_by(code='UPS-2').one().name == 'Two (renamed)'
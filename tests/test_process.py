@@ -0,0 +1,136 @@
+# goji/tests/test_process.py
+
+import pytest
+import json
+from decimal import Decimal
+from sqlalchemy import event
+from marshmallow import ValidationError
+from app.extensions import db as app_db
+
+BASE_URL = "/api"
+
+
+def _build_routing(prefix, steps):
+    """Persists a routing with 'steps' operations, each with a resource, a BOM item and an alternate, plus layer structures."""
+    from app.master_data.models import Customer, Product, InternalProduct, Operation, WorkCenter, Material
+    from app.organization.models import BusinessUnit, LegalEntity, FactoryCluster, Plant
+    from app.process.models import (Routing, RoutingOperation, OperationResource, BomItem, AlternateMaterial,
+                                    LayerDefinition, LayerStructure)
+    bu, le = BusinessUnit(name=f'{prefix} BU'), LegalEntity(name=f'{prefix} LE')
+    app_db.session.add_all([bu, le])
+    app_db.session.flush()
+    cluster = FactoryCluster(bu_id=bu.id, legal_entity_id=le.id, name=f'{prefix} FC')
+    app_db.session.add(cluster)
+    app_db.session.flush()
+    plant = Plant(cluster_id=cluster.id, name=f'{prefix} Plant')
+    customer = Customer(code=prefix, name=f'{prefix} Customer')
+    app_db.session.add_all([plant, customer])
+    app_db.session.flush()
+    product = Product(cust_id=customer.id, cust_part_num=f'{prefix}-P')
+    operation = Operation(code=f'{prefix}-OP', name='Drill')
+    work_center = WorkCenter(plant_id=plant.id, name=f'{prefix} WC', daily_avail_sec=1, oee_pct=Decimal('0.5'))
+    materials = [Material(part_num=f'{prefix}-M{i}', material_type='RAW', uom='pcs') for i in range(2)]
+    layers = [LayerDefinition(layer_code=f'{prefix}-L{i}') for i in range(3)]
+    app_db.session.add_all([product, operation, work_center] + materials + layers)
+    app_db.session.flush()
+    internal = InternalProduct(product_id=product.id, plant_id=plant.id, int_part_num=f'{prefix}-IP')
+    app_db.session.add(internal)
+    app_db.session.flush()
+
+    routing = Routing(int_product_id=internal.id, int_ver='A')
+    for step in range(1, steps + 1):
+        routing_op = RoutingOperation(operation_id=operation.id, step_num=step, layer_def_id=layers[step % 3].id)
+        routing_op.resources.append(OperationResource(wc_id=work_center.id, run_time_sec_per_pc=Decimal(step)))
+        bom_item = BomItem(material_id=materials[0].id, quantity=Decimal(step), uom='pcs')
+        bom_item.alternates.append(AlternateMaterial(alt_material_id=materials[1].id, priority=step))
+        routing_op.bom_items.append(bom_item)
+        routing.operations.append(routing_op)
+    app_db.session.add(routing)
+    app_db.session.flush()
+    app_db.session.add_all([
+        LayerStructure(routing_id=routing.id, current_layer_id=None, next_layer_id=layers[0].id, hierarchy_level=0),
+        LayerStructure(routing_id=routing.id, current_layer_id=layers[0].id, next_layer_id=layers[1].id, hierarchy_level=1),
+        LayerStructure(routing_id=routing.id, current_layer_id=layers[1].id, next_layer_id=layers[2].id, hierarchy_level=2),
+    ])
+    app_db.session.commit()
+    return routing
+
+# --- Test Routing Tree ---
+
+def test_routing_tree_loads_in_constant_queries(db_session):
+    """Loading and serializing a routing tree costs five statements, however many steps it has."""
+    from app.process.routes import routing_schema
+    from app.process.services import process_service
+    routing_ids = [_build_routing('TREE3', 3).id, _build_routing('TREE12', 12).id]
+
+    statements = []
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    for routing_id, steps in zip(routing_ids, (3, 12)):
+        app_db.session.expunge_all()
+        statements.clear()
+        event.listen(app_db.engine, 'before_cursor_execute', count)
+        try:
+            dumped = routing_schema.dump(process_service.get_routing_tree(routing_id))
+        finally:
+            event.remove(app_db.engine, 'before_cursor_execute', count)
+        assert len(dumped['operations']) == steps
+        assert all(op['bom_items'][0]['alternates'] for op in dumped['operations'])
+        assert len(statements) == 5
+
+# --- Test Routing Clone ---
+
+def _routing_rows(routing_id):
+    """Returns {model name: rows} for every level of a routing's tree."""
+    from app.process.models import RoutingOperation, OperationResource, BomItem, AlternateMaterial, LayerStructure
+    operations = RoutingOperation.query.filter_by(routing_id=routing_id).order_by(RoutingOperation.step_num).all()
+    op_ids = [op.id for op in operations]
+    bom_items = BomItem.query.filter(BomItem.routing_op_id.in_(op_ids)).all()
+    return {
+        'operations': operations,
+        'resources': OperationResource.query.filter(OperationResource.routing_op_id.in_(op_ids)).all(),
+        'bom_items': bom_items,
+        'alternates': AlternateMaterial.query.filter(AlternateMaterial.bom_item_id.in_([b.id for b in bom_items])).all(),
+        'layer_structures': LayerStructure.query.filter_by(routing_id=routing_id).all(),
+    }
+
+def test_clone_routing_copies_tree(client, db_session):
+    """A cloned routing version carries the whole tree, every parent key re-pointed at the new rows."""
+    from app.process.services import process_service
+    source = _build_routing('CLONE', 3)
+    clone = process_service.clone_routing(source.id, {'int_ver': 'B'})
+    assert clone.id != source.id and clone.int_ver == 'B'
+    assert clone.int_product_id == source.int_product_id
+
+    before, after = _routing_rows(source.id), _routing_rows(clone.id)
+    assert {level: len(rows) for level, rows in after.items()} == {level: len(rows) for level, rows in before.items()}
+    assert {level: len(rows) for level, rows in after.items()} == {
+        'operations': 3, 'resources': 3, 'bom_items': 3, 'alternates': 3, 'layer_structures': 3}
+
+    op_ids = {op.id for op in after['operations']}
+    bom_item_ids = {bom_item.id for bom_item in after['bom_items']}
+    assert not op_ids & {op.id for op in before['operations']}
+    assert [op.step_num for op in after['operations']] == [1, 2, 3]
+    assert {resource.routing_op_id for resource in after['resources']} == op_ids
+    assert {bom_item.routing_op_id for bom_item in after['bom_items']} == op_ids
+    assert {alternate.bom_item_id for alternate in after['alternates']} == bom_item_ids
+    assert sorted(ls.hierarchy_level for ls in after['layer_structures']) == [0, 1, 2]
+
+    with pytest.raises(ValidationError) as error:
+        process_service.clone_routing(source.id, {'int_ver': 'B'})
+    assert 'int_ver' in error.value.messages
+    response = client.post(f"{BASE_URL}/process/routings/{source.id}/clone", json={"int_ver": "B"})
+    assert response.status_code == 400
+
+def test_clone_routing_as_default_unsets_previous_default(db_session):
+    """Cloning with 'is_default' leaves the new version as the product's only default routing."""
+    from app.process.models import Routing
+    from app.process.services import process_service
+    source = _build_routing('CLONEDEF', 1)
+    source.is_default = True
+    app_db.session.commit()
+
+    clone = process_service.clone_routing(source.id, {'int_ver': 'B', 'is_default': True})
+    defaults = Routing.query.filter_by(int_product_id=clone.int_product_id, is_default=True).all()
+    assert [routing.id for routing in defaults] == [clone.id]
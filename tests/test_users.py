@@ -1 +1,229 @@
-# goji/tests/test_users.py
\ No newline at end of file
+# goji/tests/test_users.py
+
+import pytest
+import json
+from app.user_management.models import User, Role, Permission, user_roles
+from app.user_management.permissions import permission_cache
+from app.extensions import db as app_db
+
+BASE_URL = "/api"
+
+def _login(client, username, password):
+    response = client.post(f"{BASE_URL}/auth/login", json={"username": username, "password": password})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {json.loads(response.data)['access_token']}"}
+
+# --- Test Permission Cache ---
+
+def test_permission_cache_reflects_role_updates(client, db_session):
+    """Granting and revoking a permission through the role API takes effect immediately."""
+    admin_headers = _login(client, "testadmin", "testpassword")
+
+    # 1. Create a user whose only role has no permissions yet
+    viewer = User(username='cacheviewer', full_name='Cache Viewer', email='cacheviewer@test.com')
+    viewer.set_password('viewerpass')
+    manage_perm = Permission.query.filter_by(name='user:manage').first() or Permission(name='user:manage')
+    viewer_role = Role(name='CacheViewer')
+    app_db.session.add_all([viewer, manage_perm, viewer_role])
+    app_db.session.commit()
+    app_db.session.execute(user_roles.insert().values(user_id=viewer.id, role_id=viewer_role.id))
+    app_db.session.commit()
+
+    viewer_headers = _login(client, "cacheviewer", "viewerpass")
+    assert client.get(f"{BASE_URL}/roles", headers=viewer_headers).status_code == 403
+
+    # 2. Grant the permission; the cached (empty) set must not be served anymore
+    response = client.put(f"{BASE_URL}/roles/{viewer_role.id}", json={"permission_ids": [manage_perm.id]}, headers=admin_headers)
+    assert response.status_code == 200
+    assert client.get(f"{BASE_URL}/roles", headers=viewer_headers).status_code == 200
+
+    # 3. Revoke it again
+    response = client.put(f"{BASE_URL}/roles/{viewer_role.id}", json={"permission_ids": []}, headers=admin_headers)
+    assert response.status_code == 200
+    assert client.get(f"{BASE_URL}/roles", headers=viewer_headers).status_code == 403
+
+def test_permission_cache_survives_unrelated_user_writes(db_session):
+    """Writes to other users keep a cached entry; the user's own deactivation drops it."""
+    holder = User(username='cacheholder', full_name='Cache Holder', email='cacheholder@test.com')
+    bystander = User(username='cachebystander', full_name='Cache Bystander', email='cachebystander@test.com')
+    holder.set_password('holderpass')
+    bystander.set_password('bystanderpass')
+    app_db.session.add_all([holder, bystander])
+    app_db.session.commit()
+    permission_cache.get(holder.id)
+
+    hits = permission_cache.stats()["hits"]
+    bystander.tokens_valid_after = bystander.updated_at
+    bystander.set_password('rehashed')
+    app_db.session.commit()
+    permission_cache.get(holder.id)
+    assert permission_cache.stats()["hits"] == hits + 1
+
+    holder.is_active = False
+    app_db.session.commit()
+    assert permission_cache._cache.get(holder.id) is None
+
+def test_permission_cache_unknown_user(db_session):
+    """Unknown users resolve to None instead of an empty permission set."""
+    assert permission_cache.get(987654) is None
+    assert permission_cache.get("not-an-id") is None
+
+# --- Test Data Scope ---
+
+def test_plant_list_is_scoped_and_requires_a_token(client, db_session):
+    """A plant-scoped user lists only their plant, an unscoped role lists all, no token gets 401."""
+    from app.organization.models import BusinessUnit, LegalEntity, FactoryCluster, Plant
+    bu, le = BusinessUnit(name='Scope BU'), LegalEntity(name='Scope LE')
+    app_db.session.add_all([bu, le])
+    app_db.session.flush()
+    cluster = FactoryCluster(name='Scope Cluster', bu_id=bu.id, legal_entity_id=le.id)
+    app_db.session.add(cluster)
+    app_db.session.flush()
+    plants = [Plant(name=f'SCOPE{i}', cluster_id=cluster.id) for i in range(2)]
+    role = Role(name='ScopeViewer')
+    users = [User(username=f'scopeuser{i}', full_name='Scope User', email=f'scopeuser{i}@test.com') for i in range(2)]
+    for user in users:
+        user.set_password('scopepass')
+    app_db.session.add_all(plants + [role] + users)
+    app_db.session.commit()
+    app_db.session.execute(user_roles.insert(), [
+        {"user_id": users[0].id, "role_id": role.id, "plant_id": plants[0].id},
+        {"user_id": users[1].id, "role_id": role.id, "plant_id": None},
+    ])
+    app_db.session.commit()
+
+    def plant_names(headers):
+        response = client.get(f"{BASE_URL}/organization/plants?limit=1000", headers=headers)
+        assert response.status_code == 200
+        return {plant["name"] for plant in json.loads(response.data)} & {"SCOPE0", "SCOPE1"}
+
+    assert plant_names(_login(client, "scopeuser0", "scopepass")) == {"SCOPE0"}
+    assert plant_names(_login(client, "scopeuser1", "scopepass")) == {"SCOPE0", "SCOPE1"}
+    assert client.get(f"{BASE_URL}/organization/plants").status_code == 401
+
+# --- Test Menu Tree ---
+
+def test_menu_tree_filters_by_permission_and_shares_cache(db_session):
+    """Children needing a missing permission are hidden; users with the same grants share one cached tree."""
+    from app.user_management.models import Menu
+    from app.user_management.permissions import EffectivePermissions
+    from app.user_management.services import menu_service
+    secret = Permission(name='menu:secret')
+    app_db.session.add(secret)
+    app_db.session.flush()
+    root = Menu(name='TreeRoot', order_num=900)
+    app_db.session.add(root)
+    app_db.session.flush()
+    app_db.session.add_all([Menu(name='TreeOpen', parent_id=root.id, order_num=2),
+                            Menu(name='TreeSecret', parent_id=root.id, order_num=1, required_permission_id=secret.id)])
+    app_db.session.commit()
+
+    def children(tree):
+        return [child['name'] for node in tree if node['name'] == 'TreeRoot' for child in node['children']]
+
+    plain = menu_service.get_menu_tree(1, EffectivePermissions(1, frozenset(), frozenset()))
+    granted = menu_service.get_menu_tree(1, EffectivePermissions(1, frozenset([secret.id]), frozenset(['menu:secret'])))
+    assert children(plain) == ['TreeOpen']
+    assert children(granted) == ['TreeSecret', 'TreeOpen']
+    assert menu_service.get_menu_tree(2, EffectivePermissions(2, frozenset(), frozenset())) is plain
+
+    app_db.session.add(Menu(name='TreeLate', parent_id=root.id, order_num=3))
+    app_db.session.commit()
+    assert children(menu_service.get_menu_tree(1, EffectivePermissions(1, frozenset(), frozenset()))) == ['TreeOpen', 'TreeLate']
+
+# --- Test Keyset Pagination ---
+
+def test_list_users_keyset_pagination(client, db_session):
+    """Walking 'X-Next-Cursor' returns every user exactly once, in id order."""
+    admin_headers = _login(client, "testadmin", "testpassword")
+    for i in range(5):
+        user = User(username=f'pageuser{i}', full_name=f'Page User {i}', email=f'pageuser{i}@test.com')
+        user.set_password('pagepass')
+        app_db.session.add(user)
+    app_db.session.commit()
+    expected_ids = [u.id for u in User.query.order_by(User.id)]
+
+    seen_ids, cursor = [], None
+    while True:
+        url = f"{BASE_URL}/users?limit=2" + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(url, headers=admin_headers)
+        assert response.status_code == 200
+        page = json.loads(response.data)
+        assert len(page) <= 2
+        seen_ids.extend(u['id'] for u in page)
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+    assert seen_ids == expected_ids
+
+    assert client.get(f"{BASE_URL}/users?cursor=not-a-cursor", headers=admin_headers).status_code == 400
+    assert client.get(f"{BASE_URL}/users?limit=0", headers=admin_headers).status_code == 400
+    assert client.get(f"{BASE_URL}/users?limit=abc", headers=admin_headers).status_code == 400
+
+    # Without '?limit=' or '?cursor=' the full list comes back, with no continuation
+    client.application.config['PAGINATION_DEFAULT_LIMIT'] = 2
+    try:
+        response = client.get(f"{BASE_URL}/users", headers=admin_headers)
+    finally:
+        client.application.config['PAGINATION_DEFAULT_LIMIT'] = 100
+    assert [u['id'] for u in json.loads(response.data)] == expected_ids
+    assert 'X-Next-Cursor' not in response.headers
+
+def test_list_users_streamed(client, db_session):
+    """'?stream=1' returns the full, uncapped list as one JSON array."""
+    admin_headers = _login(client, "testadmin", "testpassword")
+    client.application.config['STREAM_CHUNK_SIZE'] = 2
+    for i in range(5):
+        user = User(username=f'streamuser{i}', full_name=f'Stream User {i}', email=f'streamuser{i}@test.com')
+        user.set_password('streampass')
+        app_db.session.add(user)
+    app_db.session.commit()
+
+    response = client.get(f"{BASE_URL}/users?stream=1&limit=1", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert 'X-Next-Cursor' not in response.headers
+    assert [u['id'] for u in json.loads(response.data)] == [u.id for u in User.query.order_by(User.id)]
+
+def test_list_users_sparse_fieldset(client, db_session):
+    """'?fields=' trims every row to the requested fields and rejects unknown ones."""
+    admin_headers = _login(client, "testadmin", "testpassword")
+
+    response = client.get(f"{BASE_URL}/users?fields=id,username", headers=admin_headers)
+    assert response.status_code == 200
+    assert all(set(u) == {'id', 'username'} for u in json.loads(response.data))
+
+    response = client.get(f"{BASE_URL}/users?fields=id,no_such_field", headers=admin_headers)
+    assert response.status_code == 400
+
+def test_list_users_filter_and_sort(client, db_session):
+    """'?filter=' / '?sort=' compile against the model whitelist; other columns are rejected."""
+    admin_headers = _login(client, "testadmin", "testpassword")
+    for name in ('filter_b', 'filter_a', 'other_c'):
+        user = User(username=name, full_name=name, email=f'{name}@test.com')
+        user.set_password('filterpass')
+        app_db.session.add(user)
+    app_db.session.commit()
+
+    response = client.get(f"{BASE_URL}/users?filter=username:startswith:filter_&sort=-username", headers=admin_headers)
+    assert response.status_code == 200
+    assert [u['username'] for u in json.loads(response.data)] == ['filter_b', 'filter_a']
+
+    response = client.get(f"{BASE_URL}/users?filter=full_name:eq:filter_a", headers=admin_headers)
+    assert response.status_code == 400
+
+def test_permission_list_query_cache(client, db_session):
+    """The cached permission list is served from memory until the table changes."""
+    admin_headers = _login(client, "testadmin", "testpassword")
+    from app.utils.query_cache import query_cache
+    query_cache.clear()
+
+    first = json.loads(client.get(f"{BASE_URL}/permissions", headers=admin_headers).data)
+    hits = query_cache.stats()['hits']
+    assert json.loads(client.get(f"{BASE_URL}/permissions", headers=admin_headers).data) == first
+    assert query_cache.stats()['hits'] == hits + 1
+
+    app_db.session.add(Permission(name='cache:probe'))
+    app_db.session.commit()
+    names = [p['name'] for p in json.loads(client.get(f"{BASE_URL}/permissions", headers=admin_headers).data)]
+    assert 'cache:probe' in names
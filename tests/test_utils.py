@@ -0,0 +1,42 @@
+# goji/tests/test_utils.py
+
+from app.extensions import db as app_db
+
+# --- Test Id Blocks ---
+
+def test_id_blocks_assign_ids_before_flush(app, db_session, monkeypatch):
+    """With id blocks active, new rows get consecutive ids from the fetched blocks up front."""
+    from app.utils.id_blocks import id_blocks
+    from app.master_data.models import Customer
+    next_block = iter(range(5000, 10000, 10))
+    monkeypatch.setattr(id_blocks, 'enabled', True)
+    monkeypatch.setattr(id_blocks, '_blocks', {})
+    monkeypatch.setattr(id_blocks, 'active', lambda session: True)
+    monkeypatch.setattr(id_blocks, '_fetch', lambda session, table_name, needed, blocks: blocks.extend(
+        [start, start + 10] for start in [next(next_block) for _ in range(-(-needed // 10))]))
+
+    customers = [Customer(code=f'BLK{i}', name='Block Customer') for i in range(12)]
+    app_db.session.add_all(customers)
+    app_db.session.commit()
+    assert [customer.id for customer in customers] == list(range(5000, 5012))
+    assert id_blocks.assign(app_db.session, Customer.__table__, [{}])[0]['id'] == 5012
+
+# --- Test Synthetic Data ---
+
+def test_synthetic_data_generator(db_session):
+    """One scale unit is a customer with 20 products whose routings have 40-80 steps."""
+    from sqlalchemy import func
+    from app.master_data.models import Customer, Product, InternalProduct
+    from app.process.models import Routing, RoutingOperation
+    from app.utils.synthetic_data import SyntheticDataGenerator
+    counts = SyntheticDataGenerator(1, random_seed=7).run()
+
+    assert counts['gj_customers'] == 1 and counts['gj_products'] == 20 and counts['gj_sales_orders'] == 50
+    customer = Customer.query.filter_by(code='S00001').one()
+    steps = app_db.session.execute(
+        app_db.select(func.count()).select_from(RoutingOperation)
+        .join(Routing, Routing.id == RoutingOperation.routing_id)
+        .join(InternalProduct, InternalProduct.id == Routing.int_product_id)
+        .join(Product, Product.id == InternalProduct.product_id)
+        .where(Product.cust_id == customer.id).group_by(RoutingOperation.routing_id)).scalars().all()
+    assert len(steps) == 20 and all(40 <= count <= 80 for count in steps)
@@ -0,0 +1,67 @@
+# /goji/utils/oracle11g_switch_to_id_blocks_template.py
+
+# Revision identifiers, used by Alembic.
+revision = 'xxxx_oracle_id_blocks' # Replace with your actual revision ID
+down_revision = 'yyyy'  # Replace with the previous migration's revision ID
+branch_labels = None
+depends_on = None
+
+"""
+! Migration template switching the sequences created by
+! oracle11g_create_seqs_and_trigs_template.py to block allocation.
+! Paste the code below into a migration created with flask db revision -m "some message",
+! below the revision, down_revision, branch_labels, depends_on variables.
+!
+! After the upgrade, set ORACLE_ID_BLOCKS = True in the config: the application then
+! assigns primary keys itself (app/utils/id_blocks.py), one nextval per BLOCK_SIZE ids.
+! The triggers stay in place for inserts that leave the id NULL (SQL scripts, MERGE).
+"""
+
+
+import sys
+
+#! Change to the correct path
+project_path = r'F:\Lining\MyProjects\OnGitHub'
+sys.path.append(project_path)
+
+from alembic import op
+from sqlalchemy import text
+
+#! The imports below may not resolve in the editor; they do at run time
+from goji.app.models import ModelBase
+from goji.utils.oracle_utils import generate_id_block_sql
+
+# Ids reserved per nextval, and sequence values cached per instance
+BLOCK_SIZE = 100
+CACHE = 20
+
+
+def get_all_managed_tables():
+    """All table names of ModelBase subclasses, plus the association tables."""
+    managed_tables = [model.__tablename__ for model in ModelBase.__subclasses__() if 'alembic_version' not in model.__tablename__]
+    managed_tables.append('gj_user_roles')
+    managed_tables.append('gj_role_permissions')
+    return managed_tables
+
+def upgrade():
+    if op.get_context().dialect.name != 'oracle':
+        print("Skipping Oracle-specific migration as the dialect is not 'oracle'.")
+        return
+
+    # ALTER SEQUENCE is DDL and commits on its own; each table is switched independently.
+    for table_name in get_all_managed_tables():
+        print(f"Switching sequence of {table_name} to blocks of {BLOCK_SIZE}")
+        op.execute(text(generate_id_block_sql(table_name, BLOCK_SIZE, CACHE)))
+
+def downgrade():
+    """
+    Restores 'INCREMENT BY 1 NOCACHE'. Set ORACLE_ID_BLOCKS = False first: an application
+    still allocating blocks would hand out ids the triggers issue as well.
+    """
+    if op.get_context().dialect.name != 'oracle':
+        print("Skipping Oracle-specific migration.")
+        return
+
+    for table_name in get_all_managed_tables():
+        print(f"Restoring single-step sequence of {table_name}")
+        op.execute(text(generate_id_block_sql(table_name, 1, None)))
@@ -16,19 +16,30 @@ def get_short_name(table_name):
         return table_name[:(ORACLE_MAX_NAME_LENGTH - 4)] + "_sn"
     return table_name
 
-def generate_sequence_and_trigger_sql(table_name):
+def sequence_name(table_name):
+    """Name of the sequence feeding a table's 'id' column (no _id suffix)."""
+    return f"seq_{get_short_name(table_name)}"
+
+def _cache_clause(cache):
+    return f"CACHE {cache}" if cache and cache > 1 else "NOCACHE"
+
+def generate_sequence_and_trigger_sql(table_name, increment=1, cache=None):
     """
     Generates SQL statements for creating a sequence and a trigger
     for a table's 'id' column in Oracle.
+
+    With 'increment' > 1 every nextval reserves a block of ids for the application's
+    block allocator (app/utils/id_blocks.py); the trigger only fills in ids that
+    an insert leaves NULL, taking the first id of a fresh block.
     """
     # Use a short name for long tables
     short_table_name = get_short_name(table_name)
     # The sequence and trigger names do not include _id suffix
-    seq_name = f"seq_{short_table_name}"
+    seq_name = sequence_name(table_name)
     trg_name = f"trg_{short_table_name}"
 
     # The SQL for the sequence is wrapped in sa.text()
-    sequence_sql = f"""CREATE SEQUENCE "{seq_name}" START WITH 1 INCREMENT BY 1 NOCACHE"""
+    sequence_sql = f"""CREATE SEQUENCE "{seq_name}" START WITH 1 INCREMENT BY {increment} {_cache_clause(cache)}"""
     
     # The SQL for the trigger MUST be wrapped in sa.text() to prevent bind parameter errors
     trigger_sql = f"""  
@@ -44,6 +55,18 @@ def generate_sequence_and_trigger_sql(table_name):
 
     return (sequence_sql, trigger_sql)
 
+def generate_id_block_sql(table_name, block_size, cache=20):
+    """
+    Generates the SQL switching an existing table's sequence to block allocation:
+    each nextval then reserves 'block_size' ids, and 'cache' values are kept
+    in the SGA instead of a dictionary update per nextval.
+    block_size=1, cache=None switches back to the original 'INCREMENT BY 1 NOCACHE'.
+
+    The ids already handed out stay below the next value, so no restart is needed;
+    the unused rest of the last block is skipped.
+    """
+    return f"""ALTER SEQUENCE "{sequence_name(table_name)}" INCREMENT BY {block_size} {_cache_clause(cache)}"""
+
 def generate_drop_sql(table_name):
     """
     Generates SQL statements for dropping a sequence and a trigger
@@ -52,7 +75,7 @@ def generate_drop_sql(table_name):
     # Use a short name for long tables
     short_table_name = get_short_name(table_name)
     # The sequence and trigger names do not include _id suffix
-    seq_name = f"seq_{short_table_name}"
+    seq_name = sequence_name(table_name)
     trg_name = f"trg_{short_table_name}"
 
     # Use sa.text() for both drop statements to prevent errors